@@ -0,0 +1,114 @@
+# benchmarks/bench_constraints.py
+
+'''
+Benchmark for "at least one of each character class" generation in PassGen.
+
+Compares three ways to get N valid HARD passwords:
+- regenerate-until-valid: generate_password() in a loop, retry invalid ones
+- batch rejection: generate_passwords() batches, throw away invalid ones
+- require_all_classes: generate_passwords(..., require_all_classes=True), which
+  builds passwords constructively (nothing thrown away) while fewer than half
+  of all random passwords are valid, and filters random batches above that
+
+Every length is measured separately, and the strategy require_all_classes
+picked is printed: the constructive generator wastes nothing, which matters
+at short lengths where most random passwords miss a class; at long lengths
+almost every random password is valid and a filtered batch is cheaper. For
+the filtered strategy, the number of generated passwords is the expected one.
+
+Run from the project root (with the package installed):
+    python benchmarks/bench_constraints.py --count 20000 --length 8 16 32 64
+'''
+
+
+import argparse
+import time
+from typing import Callable, List, Tuple
+
+from passgen.password_generator import (
+    _REJECTION_MIN_ACCEPTANCE,
+    Difficulty,
+    count_possible_passwords,
+    generate_password,
+    generate_passwords,
+    get_policy,
+)
+
+
+def _is_valid(password: str, groups: Tuple[str, ...]) -> bool:
+    '''
+    True if the password contains at least one character of every group.
+    '''
+    return all(any(ch in group for ch in password) for group in groups)
+
+
+def _regenerate_until_valid(count: int, length: int, level: str) -> Tuple[List[str], int]:
+    groups = get_policy(level).groups
+    passwords: List[str] = []
+    attempts = 0
+    while len(passwords) < count:
+        attempts += 1
+        pwd = generate_password(length, level)
+        if _is_valid(pwd, groups):
+            passwords.append(pwd)
+    return passwords, attempts
+
+
+def _batch_rejection(count: int, length: int, level: str) -> Tuple[List[str], int]:
+    groups = get_policy(level).groups
+    passwords: List[str] = []
+    attempts = 0
+    while len(passwords) < count:
+        batch = generate_passwords(count - len(passwords), length, level)
+        attempts += len(batch)
+        passwords.extend(pwd for pwd in batch if _is_valid(pwd, groups))
+    return passwords, attempts
+
+
+def _acceptance(length: int, level: str) -> float:
+    '''
+    Fraction of random passwords that contain every class.
+    '''
+    return count_possible_passwords(length, level, True) / count_possible_passwords(length, level)
+
+
+def _require_all_classes(count: int, length: int, level: str) -> Tuple[List[str], int]:
+    passwords = generate_passwords(count, length, level, require_all_classes=True)
+    acceptance = _acceptance(length, level)
+    if acceptance < _REJECTION_MIN_ACCEPTANCE:
+        return passwords, count
+    return passwords, round(count / acceptance)
+
+
+def _measure(label: str, func: Callable[[], Tuple[List[str], int]], count: int) -> None:
+    start = time.perf_counter()
+    passwords, attempts = func()
+    elapsed = time.perf_counter() - start
+
+    assert len(passwords) == count
+    wasted = attempts - count
+    print(f'{label:<26} {elapsed:8.3f} s {count / elapsed:12,.0f} passwords/s'
+          f'   generated {attempts:>10,} ({wasted / attempts:6.1%} thrown away)')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark class-constrained generation.')
+    parser.add_argument('--count', type=int, default=20_000)
+    parser.add_argument('--length', type=int, nargs='+', default=[8, 16, 32, 64])
+    parser.add_argument('--level', default=Difficulty.HARD, choices=['1', '2', '3'])
+    args = parser.parse_args()
+
+    count, level = args.count, args.level
+
+    for length in args.length:
+        print(f'{count:,} valid passwords of length {length} (level {level})\n')
+
+        _measure('regenerate-until-valid', lambda: _regenerate_until_valid(count, length, level), count)
+        _measure('batch rejection', lambda: _batch_rejection(count, length, level), count)
+        strategy = 'constructive' if _acceptance(length, level) < _REJECTION_MIN_ACCEPTANCE else 'filter'
+        _measure(f'all_classes ({strategy})', lambda: _require_all_classes(count, length, level), count)
+        print()
+
+
+if __name__ == '__main__':
+    main()
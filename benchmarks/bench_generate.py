@@ -0,0 +1,82 @@
+# benchmarks/bench_generate.py
+
+'''
+Benchmark for bulk password generation in PassGen.
+
+Compares:
+- The old approach: random.choice() once per character, one password per call
+- generate_password() called in a loop
+- generate_passwords() producing the whole batch at once
+
+Run from the project root (with the package installed):
+    python benchmarks/bench_generate.py --count 200000 --length 16
+'''
+
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from passgen.password_generator import (
+    Difficulty,
+    generate_password,
+    generate_passwords,
+    get_charset_by_difficulty,
+)
+
+
+def _legacy_generate_password(length: int, level: str) -> str:
+    '''
+    Copy of the original per-character implementation, kept as a baseline.
+    '''
+    charset = get_charset_by_difficulty(level)
+    return ''.join(random.choice(charset) for _ in range(length))
+
+
+def _measure(label: str, func: Callable[[], List[str]], count: int) -> float:
+    '''
+    Run func once, print the throughput and return passwords per second.
+    '''
+    start = time.perf_counter()
+    passwords = func()
+    elapsed = time.perf_counter() - start
+
+    assert len(passwords) == count
+    rate = count / elapsed if elapsed > 0 else float('inf')
+    print(f'{label:<32} {elapsed:8.3f} s {rate:14,.0f} passwords/s')
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark bulk password generation.')
+    parser.add_argument('--count', type=int, default=200_000)
+    parser.add_argument('--length', type=int, default=16)
+    parser.add_argument('--level', default=Difficulty.HARD, choices=['1', '2', '3'])
+    args = parser.parse_args()
+
+    count, length, level = args.count, args.length, args.level
+    print(f'Generating {count:,} passwords of length {length} (level {level})\n')
+
+    legacy = _measure(
+        'random.choice per character',
+        lambda: [_legacy_generate_password(length, level) for _ in range(count)],
+        count,
+    )
+    looped = _measure(
+        'generate_password() in a loop',
+        lambda: [generate_password(length, level) for _ in range(count)],
+        count,
+    )
+    bulk = _measure(
+        'generate_passwords() batch',
+        lambda: generate_passwords(count, length, level),
+        count,
+    )
+
+    print(f'\nBatch speed-up vs random.choice:         {bulk / legacy:6.1f}x')
+    print(f'Batch speed-up vs generate_password loop: {bulk / looped:6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
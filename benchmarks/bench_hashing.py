@@ -0,0 +1,67 @@
+# benchmarks/bench_hashing.py
+
+'''
+Benchmark for batch password hashing in PassGen.
+
+Hashes the same passwords with 1, 2, 4, ... threads (or processes) up to
+the number of CPU cores and prints throughput and scaling. PBKDF2 releases
+the GIL, so threads should scale almost linearly with the number of cores.
+
+Run from the project root (with the package installed):
+    python benchmarks/bench_hashing.py --count 200 --iterations 100000
+    python benchmarks/bench_hashing.py --processes
+'''
+
+
+import argparse
+import os
+import time
+
+from passgen.password_generator import Difficulty, generate_passwords
+from passgen.security import hash_passwords
+
+
+def _worker_counts(max_workers: int) -> list:
+    '''
+    1, 2, 4, 8, ... up to and including max_workers.
+    '''
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark parallel password hashing.')
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--iterations', type=int, default=100_000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--processes', action='store_true', help='use a process pool instead of threads')
+    args = parser.parse_args()
+
+    passwords = generate_passwords(args.count, 16, Difficulty.HARD)
+    pool = 'processes' if args.processes else 'threads'
+
+    print(f'Hashing {args.count:,} passwords with {args.iterations:,} PBKDF2 iterations ({pool})\n')
+    print(f'{"workers":>8} {"seconds":>9} {"hashes/s":>10} {"speed-up":>9} {"efficiency":>11}')
+
+    baseline = None
+    for workers in _worker_counts(args.max_workers):
+        start = time.perf_counter()
+        hashes = hash_passwords(passwords, args.iterations, workers=workers, use_processes=args.processes)
+        elapsed = time.perf_counter() - start
+
+        assert len(hashes) == args.count
+
+        if baseline is None:
+            baseline = elapsed
+        speed_up = baseline / elapsed
+        print(f'{workers:>8} {elapsed:>9.2f} {args.count / elapsed:>10,.1f} '
+              f'{speed_up:>8.2f}x {speed_up / workers:>10.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/bench_iter.py
+
+'''
+Benchmark for reading a large vault in PassGen.
+
+Writes a temporary JSON Lines vault of --size records, then reads it once
+with list_passwords() (all records in one list) and once with
+iter_passwords() (one record at a time), each in a fresh process, and
+reports the time and the peak memory (RSS) of that process. The peak of
+list_passwords() grows with the vault; that of iter_passwords() stays flat.
+
+Run from the project root (with the package installed, Unix only):
+    python benchmarks/bench_iter.py --size 200000
+'''
+
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from passgen import storage
+from passgen.io.module_io import write_jsonl_file
+
+
+def _measure(mode: str, vault: Path) -> None:
+    '''
+    Child process: read the vault once and print "seconds peak_kb".
+    '''
+    storage.PASSWORD_FILE = vault
+    storage.VAULT_CACHE = False
+
+    start = time.perf_counter()
+    if mode == 'list':
+        count = len(storage.list_passwords())
+    else:
+        count = sum(1 for _ in storage.iter_passwords())
+    seconds = time.perf_counter() - start
+
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS).
+    print(count, seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark reading a large vault: list vs stream.')
+    parser.add_argument('--size', type=int, default=200_000, help='records in the vault')
+    parser.add_argument('--measure', choices=['list', 'iter'], help=argparse.SUPPRESS)
+    parser.add_argument('--vault', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        _measure(args.measure, args.vault)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vault = Path(tmp) / 'passwords.jsonl'
+        write_jsonl_file(vault, (
+            {'service': f'service{i}', 'username': f'user{i}@example.com', 'password': f'password-{i}',
+             'password_hash': 'pbkdf2_sha256$600000$' + 'x' * 80, 'created_at': '2025-12-10T22:30:00'}
+            for i in range(args.size)
+        ))
+        size_mb = vault.stat().st_size / 1024 / 1024
+
+        results = []
+        for mode, name in (('list', 'list_passwords()'), ('iter', 'iter_passwords()')):
+            output = subprocess.run(
+                [sys.executable, __file__, '--measure', mode, '--vault', str(vault)],
+                check=True, capture_output=True, text=True,
+            ).stdout.split()
+            count, seconds, peak_kb = int(output[0]), float(output[1]), int(output[2])
+            assert count == args.size
+            results.append((name, seconds, peak_kb / 1024))
+
+    print(f'Reading a vault of {args.size:,} records ({size_mb:.0f} MB)\n')
+    print(f'{"method":>18} {"seconds":>9} {"peak RSS (MB)":>14}')
+    for name, seconds, peak_mb in results:
+        print(f'{name:>18} {seconds:>9.3f} {peak_mb:>14.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_parallel.py
+
+'''
+Benchmark for multi-core password generation in PassGen.
+
+Generates the same number of passwords with 1, 2, 4, ... worker processes
+(up to the number of CPU cores) and prints throughput and scaling.
+
+Run from the project root (with the package installed):
+    python benchmarks/bench_parallel.py --count 5000000 --length 16
+'''
+
+
+import argparse
+import os
+import time
+
+from passgen.parallel import iter_parallel_chunks
+from passgen.password_generator import Difficulty
+
+
+def _worker_counts(max_workers: int) -> list:
+    '''
+    1, 2, 4, 8, ... up to and including max_workers.
+    '''
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark parallel password generation.')
+    parser.add_argument('--count', type=int, default=5_000_000)
+    parser.add_argument('--length', type=int, default=16)
+    parser.add_argument('--level', default=Difficulty.HARD, choices=['1', '2', '3'])
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--unordered', action='store_true')
+    args = parser.parse_args()
+
+    print(f'Generating {args.count:,} passwords of length {args.length} '
+          f'(level {args.level}, chunk size {args.chunk_size:,})\n')
+    print(f'{"workers":>8} {"seconds":>9} {"passwords/s":>14} {"speed-up":>9} {"efficiency":>11}')
+
+    baseline = None
+    for workers in _worker_counts(args.max_workers):
+        start = time.perf_counter()
+        produced = 0
+        for chunk in iter_parallel_chunks(
+            args.count, args.length, args.level,
+            workers=workers, chunk_size=args.chunk_size, ordered=not args.unordered,
+        ):
+            produced += len(chunk)
+        elapsed = time.perf_counter() - start
+
+        assert produced == args.count
+        rate = produced / elapsed
+        baseline = baseline or rate
+        speed_up = rate / baseline
+        print(f'{workers:>8} {elapsed:>9.3f} {rate:>14,.0f} {speed_up:>8.2f}x {speed_up / workers:>10.0%}')
+
+
+if __name__ == '__main__':
+    main()
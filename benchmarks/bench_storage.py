@@ -0,0 +1,91 @@
+# benchmarks/bench_storage.py
+
+'''
+Benchmark for saving password records in PassGen.
+
+Fills a temporary vault with --size records, then times how long it takes
+to save --count more records one at a time. With the append-only JSON Lines
+file and the SQLite backend the cost per save stays the same however large
+the vault is; the old JSON array file had to be read and rewritten
+completely for every save.
+
+Hashing is replaced by a constant, so only the storage cost is measured.
+
+Run from the project root (with the package installed):
+    python benchmarks/bench_storage.py --size 10000 --count 200
+'''
+
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from passgen import backends, security, storage
+from passgen.io.module_io import read_json_file, write_json_file
+
+
+def _records(count: int, offset: int = 0) -> list:
+    return [
+        storage._build_record(f'service{i}', f'user{i}@example.com', f'password-{i}', 'hash')
+        for i in range(offset, offset + count)
+    ]
+
+
+def _time_json_array(path: Path, records: list) -> float:
+    '''
+    The old format: read, append and rewrite the whole array per save.
+    '''
+    start = time.perf_counter()
+    for record in records:
+        data = read_json_file(path) or []
+        data.append(record)
+        write_json_file(path, data)
+    return time.perf_counter() - start
+
+
+def _time_backend(records: list) -> float:
+    start = time.perf_counter()
+    for record in records:
+        storage._append_records([record])
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark saving records to the password file.')
+    parser.add_argument('--size', type=int, default=10_000, help='records already in the vault')
+    parser.add_argument('--count', type=int, default=200, help='records saved one at a time')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+
+        # building records creates the fingerprint key; keep it out of data/.
+        security.FINGERPRINT_KEY_FILE = tmp_path / 'fingerprint.key'
+        existing = _records(args.size)
+        new = _records(args.count, args.size)
+
+        json_file = tmp_path / 'passwords.json'
+        write_json_file(json_file, existing)
+        json_seconds = _time_json_array(json_file, new)
+
+        results = [('JSON array', json_seconds)]
+        storage.PASSWORD_FILE = tmp_path / 'passwords.jsonl'
+        storage.SQLITE_FILE = tmp_path / 'passwords.db'
+
+        for backend, name in (('jsonl', 'JSON Lines'), ('sqlite', 'SQLite')):
+            storage.STORAGE_BACKEND = backend
+            storage._save_raw(existing)
+            results.append((name, _time_backend(new)))
+            assert len(storage.list_passwords()) == args.size + args.count
+
+        backends.close_backends()
+
+    print(f'Saving {args.count:,} records one by one into a vault of {args.size:,} records\n')
+    print(f'{"format":>12} {"seconds":>9} {"ms/save":>9} {"speed-up":>9}')
+    for name, seconds in results:
+        print(f'{name:>12} {seconds:>9.3f} {seconds / args.count * 1000:>9.3f} {json_seconds / seconds:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
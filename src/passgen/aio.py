@@ -0,0 +1,193 @@
+# src/passgen/aio.py
+
+"""
+asyncio API for PassGen, for use inside event-loop based services (aiohttp, FastAPI, ...).
+
+Responsibility:
+- Offer async versions of hash_password, verify_password, add_password and list_passwords
+- Run all blocking work (KDFs, file I/O) in a bounded thread pool, never on the event loop
+- Apply backpressure: when too much work is queued, callers wait instead of piling up jobs
+- Coalesce concurrent add_password() calls into a single append to the vault
+
+Usage:
+    from passgen import aio
+
+    async def handler(request):
+        await aio.add_password('Gmail', 'me@example.com', password)
+        ok = await aio.verify_password(password, stored_hash)
+
+Demonstrates:
+- loop.run_in_executor() to call blocking code from coroutines
+- asyncio.Semaphore as a simple admission limit (backpressure)
+- Write coalescing: one writer task drains everything that arrived while
+  the previous write was running, so N concurrent saves become one append
+  (or one SQLite transaction) per round instead of N
+"""
+
+
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from . import security, storage
+from .config import AIO_MAX_PENDING, AIO_WORKERS
+from .parallel import resolve_workers
+
+
+T = TypeVar('T')
+
+_executor: Optional[ThreadPoolExecutor] = None
+_max_pending = 0
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    '''
+    The shared worker pool, created on first use.
+
+    The hashlib KDFs release the GIL, so threads run them in parallel.
+    '''
+    global _executor, _max_pending
+    if _executor is None:
+        workers = resolve_workers(AIO_WORKERS)
+        _max_pending = AIO_MAX_PENDING or workers * 4
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='passgen-aio')
+    return _executor
+
+
+class _LoopState:
+    '''
+    Per-event-loop state: the admission semaphore and the write queue.
+
+    asyncio primitives belong to one event loop, so every loop gets its own.
+    '''
+
+    def __init__(self, max_pending: int) -> None:
+        self.slots = asyncio.Semaphore(max_pending)
+        self.waiting = 0                # coroutines blocked by backpressure right now
+        self.active = 0                 # jobs queued or running in the worker pool
+        self.writes: List[Tuple[Tuple[str, str, str, str], asyncio.Future]] = []
+        self.writer: Optional[asyncio.Task] = None
+        self.file_writes = 0            # number of actual writes of the password file
+
+
+_states: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]' = weakref.WeakKeyDictionary()
+
+
+def _state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    state = _states.get(loop)
+    if state is None:
+        _get_executor()
+        state = _states[loop] = _LoopState(_max_pending)
+    return state
+
+
+async def _run(func: Callable[..., T], *args: Any) -> T:
+    '''
+    Run a blocking function in the worker pool.
+
+    At most AIO_MAX_PENDING jobs (default: 4 per worker) are queued or
+    running at any time; further callers wait here until a slot is free.
+    '''
+    state = _state()
+    loop = asyncio.get_running_loop()
+
+    state.waiting += 1
+    try:
+        await state.slots.acquire()
+    finally:
+        state.waiting -= 1
+
+    state.active += 1
+    try:
+        return await loop.run_in_executor(_get_executor(), partial(func, *args))
+    finally:
+        state.active -= 1
+        state.slots.release()
+
+
+async def hash_password(password: str, iterations: Optional[int] = None, algorithm: Optional[str] = None) -> str:
+    '''
+    Async version of security.hash_password().
+    '''
+    return await _run(security.hash_password, password, iterations, algorithm)
+
+
+async def verify_password(password: str, stored_hash: str) -> bool:
+    '''
+    Async version of security.verify_password().
+    '''
+    return await _run(security.verify_password, password, stored_hash)
+
+
+async def list_passwords() -> List[Dict[str, Any]]:
+    '''
+    Async version of storage.list_passwords().
+    '''
+    return await _run(storage.list_passwords)
+
+
+async def _drain_writes(state: _LoopState) -> None:
+    '''
+    Writer task: append every queued entry, one file write per round.
+
+    Entries that arrive while a write is running are collected and written
+    together in the next round.
+    '''
+    while state.writes:
+        batch, state.writes = state.writes, []
+        entries = [entry for entry, _ in batch]
+
+        try:
+            await _run(storage.append_hashed_passwords, entries)
+        except Exception as exc:
+            for _, waiter in batch:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+        else:
+            state.file_writes += 1
+            for _, waiter in batch:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+
+async def add_password(service: str, username: str, password: str) -> None:
+    '''
+    Async version of storage.add_password().
+
+    The hash is computed in the worker pool; the record is then queued and
+    written together with all other records saved at about the same time.
+    Returns once the record is on disk.
+    '''
+    password_hash = await hash_password(password)
+
+    state = _state()
+    waiter = asyncio.get_running_loop().create_future()
+    state.writes.append(((service, username, password, password_hash), waiter))
+
+    if state.writer is None or state.writer.done():
+        state.writer = asyncio.create_task(_drain_writes(state))
+
+    await waiter
+
+
+def stats() -> Dict[str, int]:
+    '''
+    Counters for the current event loop (call from inside the loop).
+
+    - max_pending:   admission limit of the worker pool
+    - active:        jobs queued or running in the worker pool
+    - waiting:       coroutines currently held back by backpressure
+    - queued_writes: records waiting for the next file write
+    - file_writes:   password file writes done by add_password()
+    '''
+    state = _state()
+    return {
+        'max_pending': _max_pending,
+        'active': state.active,
+        'waiting': state.waiting,
+        'queued_writes': len(state.writes),
+        'file_writes': state.file_writes,
+    }
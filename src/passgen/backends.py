@@ -0,0 +1,418 @@
+# src/passgen/backends.py
+
+"""
+Storage backends for the PassGen password vault.
+
+Responsibility:
+- Define the small interface storage.py needs from a vault (StorageBackend)
+- Implement it for a JSON Lines file (the default) and for SQLite
+- Keep a registry of backends, selected by name with config.STORAGE_BACKEND
+
+Backends:
+    jsonl   data/passwords.jsonl, one JSON record per line (append-only writes)
+    sqlite  data/passwords.db, one row per record, with indexes on service,
+            username and created_at (and on id and password_hash, used to
+            update single records)
+
+Records are plain dictionaries in both backends. SQLite keeps the known
+fields in their own columns and any other fields as JSON in an "extra"
+column, so a record reads back exactly as it was written.
+
+Demonstrates:
+- A small plugin registry: new backends are added with register_backend()
+- SQLite in WAL mode (readers never block the writer), one connection per
+  thread, and parameterized statements that sqlite3 prepares once and caches
+- Bulk inserts with executemany() inside a single transaction
+- Filters and pagination pushed down into SQL (WHERE ... LIMIT ... OFFSET)
+"""
+
+
+import json
+import shutil
+import sqlite3
+import threading
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from .io.module_io import append_jsonl_file, iter_jsonl_file, write_jsonl_file
+
+
+Record = Dict[str, Any]
+
+
+class StorageBackend:
+    '''
+    Base class for a password vault.
+
+    Subclasses set `name` and `suffix` (file extension of the vault and its
+    backups) and implement the methods below. A backend instance belongs
+    to one vault path; use open_backend() to get a shared instance.
+
+    `generation` counts the writes made through this instance; every write
+    method calls _changed(). Together with signature(), which notices
+    writes by other processes, caches of the records (the parsed vault and
+    the lookup indexes in storage.py) can tell whether they are still up to date.
+    '''
+
+    name: str = ''
+    suffix: str = ''
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.generation = 0
+
+    def _changed(self) -> None:
+        self.generation += 1
+
+    def exists(self) -> bool:
+        '''
+        True if the vault has been created.
+        '''
+        return self.path.exists()
+
+    def files(self) -> List[Path]:
+        '''
+        The files on disk that hold the vault.
+        '''
+        return [self.path]
+
+    def signature(self) -> Tuple[Optional[Tuple[int, int, int]], ...]:
+        '''
+        (inode, size, mtime in ns) of every vault file, None for missing files.
+
+        Appends change the size, rewrites (temp file + rename) the inode and
+        any write the mtime, so an equal signature means an unchanged vault.
+        '''
+        result: List[Optional[Tuple[int, int, int]]] = []
+        for path in self.files():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                result.append(None)
+            else:
+                result.append((st.st_ino, st.st_size, st.st_mtime_ns))
+        return tuple(result)
+
+    def iter_records(self) -> Iterator[Record]:
+        '''
+        Stream all records, in the order they were added.
+        '''
+        raise NotImplementedError
+
+    def query(self, where: Dict[str, Any], offset: int = 0, limit: Optional[int] = None) -> Iterator[Record]:
+        '''
+        Stream the records whose fields equal all values in `where`.
+
+        A missing field counts as None. The default implementation filters
+        iter_records(); backends that can filter faster override it.
+
+        :param where: Field -> required value (empty: all records).
+        :param offset: Number of matching records to skip.
+        :param limit: Maximum number of records to yield (None: no limit).
+        '''
+        records = (record for record in self.iter_records() if _matches(record, where))
+        return islice(records, offset, None if limit is None else offset + limit)
+
+    def append(self, records: List[Record]) -> None:
+        '''
+        Add records at the end of the vault, all in one write.
+        '''
+        raise NotImplementedError
+
+    def update_hashes(self, by: str, new_hashes: Dict[str, str], current: Optional[str] = None) -> int:
+        '''
+        Set a new password_hash on the records selected by a field.
+
+        :param by: Field that selects the records, "id" or "password_hash".
+        :param new_hashes: Value of that field -> new password hash.
+        :param current: Only update records whose password_hash equals this.
+        :return: Number of records updated.
+        '''
+        raise NotImplementedError
+
+    def replace_all(self, records: List[Record]) -> None:
+        '''
+        Replace the whole content of the vault.
+        '''
+        raise NotImplementedError
+
+    def backup(self, target: Path) -> None:
+        '''
+        Write a consistent copy of the vault to target (same format).
+        '''
+        raise NotImplementedError
+
+    def close(self) -> None:
+        '''
+        Release open files or connections (the backend can still be used).
+        '''
+
+
+def _matches(record: Record, where: Dict[str, Any]) -> bool:
+    return all(record.get(field) == value for field, value in where.items())
+
+
+_UPDATE_FIELDS = ('id', 'password_hash')
+
+
+def _check_update_field(by: str) -> None:
+    if by not in _UPDATE_FIELDS:
+        raise ValueError(f'Records can only be selected by {", ".join(_UPDATE_FIELDS)}, not {by!r}.')
+
+
+class JsonLinesBackend(StorageBackend):
+    '''
+    One JSON record per line; adding records appends to the file.
+    '''
+
+    name = 'jsonl'
+    suffix = '.jsonl'
+
+    def iter_records(self) -> Iterator[Record]:
+        return iter_jsonl_file(self.path)
+
+    def append(self, records: List[Record]) -> None:
+        append_jsonl_file(self.path, records)
+        self._changed()
+
+    def update_hashes(self, by: str, new_hashes: Dict[str, str], current: Optional[str] = None) -> int:
+        _check_update_field(by)
+
+        # a text file cannot be changed in place: read, patch, write back once.
+        data = list(self.iter_records())
+        updated = 0
+        for record in data:
+            new_hash = new_hashes.get(record.get(by))
+            if new_hash is not None and (current is None or record.get('password_hash') == current):
+                record['password_hash'] = new_hash
+                updated += 1
+
+        if updated:
+            write_jsonl_file(self.path, data)
+            self._changed()
+        return updated
+
+    def replace_all(self, records: List[Record]) -> None:
+        write_jsonl_file(self.path, records)
+        self._changed()
+
+    def backup(self, target: Path) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            # copy the file byte for byte, no need to parse it.
+            shutil.copyfile(self.path, target)
+        else:
+            write_jsonl_file(target, [])
+
+
+# columns with a fixed meaning; every other field goes into "extra" (as JSON).
+_COLUMNS: Tuple[str, ...] = ('id', 'service', 'username', 'password', 'password_hash', 'created_at', 'fingerprint')
+
+_SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS passwords (
+    seq INTEGER PRIMARY KEY,
+    {", ".join(f"{column} TEXT" for column in _COLUMNS)},
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_passwords_service ON passwords (service);
+CREATE INDEX IF NOT EXISTS idx_passwords_username ON passwords (username);
+CREATE INDEX IF NOT EXISTS idx_passwords_created_at ON passwords (created_at);
+CREATE INDEX IF NOT EXISTS idx_passwords_id ON passwords (id);
+CREATE INDEX IF NOT EXISTS idx_passwords_password_hash ON passwords (password_hash);
+'''
+
+# every statement is a constant string with ? placeholders, so sqlite3
+# compiles it once per connection and reuses it from its statement cache.
+_SELECT_ALL = f'SELECT {", ".join(_COLUMNS)}, extra FROM passwords ORDER BY seq'
+_INSERT = f'INSERT INTO passwords ({", ".join(_COLUMNS)}, extra) VALUES ({", ".join("?" * (len(_COLUMNS) + 1))})'
+_UPDATE = {
+    (by, checked): f'UPDATE passwords SET password_hash = ? WHERE {by} = ?' + (' AND password_hash = ?' if checked else '')
+    for by in _UPDATE_FIELDS
+    for checked in (False, True)
+}
+_DELETE_ALL = 'DELETE FROM passwords'
+
+
+def _select_where(fields: Tuple[str, ...]) -> str:
+    # "IS ?" instead of "= ?" so that None matches NULL (a missing field).
+    conditions = ' AND '.join(f'{field} IS ?' for field in fields) or '1'
+    return f'SELECT {", ".join(_COLUMNS)}, extra FROM passwords WHERE {conditions} ORDER BY seq LIMIT ? OFFSET ?'
+
+
+def _record_to_row(record: Record) -> Tuple[Any, ...]:
+    extra = {key: value for key, value in record.items() if key not in _COLUMNS}
+    return (
+        *(record.get(column) for column in _COLUMNS),
+        json.dumps(extra, ensure_ascii=False) if extra else None,
+    )
+
+
+def _row_to_record(row: Tuple[Any, ...]) -> Record:
+    # fields that were never set stay missing, like in the JSON Lines file.
+    record = {column: value for column, value in zip(_COLUMNS, row) if value is not None}
+    if row[-1]:
+        record.update(json.loads(row[-1]))
+    return record
+
+
+class SqliteBackend(StorageBackend):
+    '''
+    SQLite database with indexes, for large vaults and fast lookups.
+
+    Each thread gets its own connection (sqlite3 connections must not be
+    shared between threads without locking). The database runs in WAL
+    mode, so reading threads never block the thread that writes.
+    '''
+
+    name = 'sqlite'
+    suffix = '.db'
+
+    def files(self) -> List[Path]:
+        # in WAL mode, committed changes live in the -wal file until a checkpoint.
+        return [self.path, self.path.with_name(self.path.name + '-wal')]
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        '''
+        The connection of the calling thread, opened (and set up) on first use.
+        '''
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # check_same_thread=False only so that close() may run in another thread.
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # with WAL, NORMAL only syncs at checkpoints and is still crash safe.
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def iter_records(self) -> Iterator[Record]:
+        if not self.exists():
+            return iter(())
+        # the cursor fetches rows lazily, so large vaults are streamed.
+        return (_row_to_record(row) for row in self._connect().execute(_SELECT_ALL))
+
+    def query(self, where: Dict[str, Any], offset: int = 0, limit: Optional[int] = None) -> Iterator[Record]:
+        fields = tuple(sorted(where))
+        if any(field not in _COLUMNS for field in fields):
+            # fields stored in "extra" cannot be filtered in SQL.
+            return super().query(where, offset, limit)
+        if not self.exists():
+            return iter(())
+
+        # only the matching rows of the requested page are read (LIMIT -1: no limit);
+        # conditions on service, username, id, ... use their indexes.
+        params = (*(where[field] for field in fields), -1 if limit is None else limit, offset)
+        return (_row_to_record(row) for row in self._connect().execute(_select_where(fields), params))
+
+    def append(self, records: List[Record]) -> None:
+        conn = self._connect()
+        # one transaction for the whole batch: a single commit (and fsync).
+        with conn:
+            conn.executemany(_INSERT, [_record_to_row(record) for record in records])
+        self._changed()
+
+    def update_hashes(self, by: str, new_hashes: Dict[str, str], current: Optional[str] = None) -> int:
+        _check_update_field(by)
+        if current is None:
+            rows = [(new_hash, key) for key, new_hash in new_hashes.items()]
+        else:
+            rows = [(new_hash, key, current) for key, new_hash in new_hashes.items()]
+
+        conn = self._connect()
+        with conn:
+            # executemany() adds up the rowcount of all updates.
+            updated = conn.executemany(_UPDATE[by, current is not None], rows).rowcount
+        if updated:
+            self._changed()
+        return updated
+
+    def replace_all(self, records: List[Record]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute(_DELETE_ALL)
+            conn.executemany(_INSERT, [_record_to_row(record) for record in records])
+        self._changed()
+
+    def backup(self, target: Path) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # the online backup API copies a consistent snapshot, even while writing.
+        destination = sqlite3.connect(str(target))
+        try:
+            self._connect().backup(destination)
+        finally:
+            destination.close()
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        # threads that still hold a closed connection open a new one.
+        self._local = threading.local()
+
+
+_REGISTRY: Dict[str, Type[StorageBackend]] = {}
+_OPEN: Dict[Tuple[str, Path], StorageBackend] = {}
+_OPEN_LOCK = threading.Lock()
+
+
+def register_backend(backend: Type[StorageBackend]) -> None:
+    '''
+    Make a storage backend available under its name.
+
+    :raises ValueError: If the name is empty.
+    '''
+    if not backend.name:
+        raise ValueError('A storage backend needs a name.')
+    _REGISTRY[backend.name] = backend
+
+
+def available_backends() -> List[str]:
+    '''
+    Names of all registered storage backends.
+    '''
+    return sorted(_REGISTRY)
+
+
+def open_backend(name: str, path: Path) -> StorageBackend:
+    '''
+    Return the shared backend instance for this name and vault path.
+
+    :raises ValueError: If no backend with this name is registered.
+    '''
+    with _OPEN_LOCK:
+        backend = _OPEN.get((name, path))
+        if backend is None:
+            try:
+                backend_class = _REGISTRY[name]
+            except KeyError:
+                raise ValueError(f'Unsupported storage backend: {name}') from None
+            backend = _OPEN[name, path] = backend_class(path)
+        return backend
+
+
+def close_backends() -> None:
+    '''
+    Close all open backends (e.g. before the vault files are moved or deleted).
+    '''
+    with _OPEN_LOCK:
+        backends = list(_OPEN.values())
+        _OPEN.clear()
+    for backend in backends:
+        backend.close()
+
+
+register_backend(JsonLinesBackend)
+register_backend(SqliteBackend)
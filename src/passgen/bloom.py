@@ -0,0 +1,129 @@
+# src/passgen/bloom.py
+
+"""
+Bloom filter used to keep bulk-generated passwords unique.
+
+Responsibility:
+- Remember which passwords were already produced, using a fixed amount of memory
+- Answer "definitely new" or "probably seen before" for every candidate
+
+A Bloom filter never forgets an item (no false negatives), but it may claim
+that a new item was seen before (a false positive). The generator treats
+every "probably seen" answer as a duplicate and draws a replacement, so the
+output is always unique; the only cost of a false positive is one extra
+draw. A Python set of all passwords would need roughly 60-80 bytes per
+password, the filter needs error_rate=1e-6 -> ~29 bits (3.6 bytes) per password.
+
+Demonstrates:
+- Sizing a probabilistic data structure from a target error rate
+- Double hashing (h1 + i * h2) to derive k bit positions from one digest
+- Enforcing a configurable memory limit up front instead of failing later
+"""
+
+
+import hashlib
+import math
+import secrets
+
+from .config import UNIQUE_ERROR_RATE, UNIQUE_MAX_MEMORY
+
+
+class BloomFilter:
+    '''
+    Fixed-size Bloom filter for strings.
+
+    Usage:
+        seen = BloomFilter(capacity=1_000_000)
+        if seen.add(password):
+            ...  # definitely new
+    '''
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float = UNIQUE_ERROR_RATE,
+        max_memory: int = UNIQUE_MAX_MEMORY,
+    ) -> None:
+        '''
+        :param capacity: Number of items the filter is sized for (must be > 0).
+        :param error_rate: Target false-positive rate at full capacity (0 < rate < 1).
+        :param max_memory: Maximum size of the bit array in bytes.
+        :raises ValueError: If the arguments are invalid or the filter would
+                            need more memory than max_memory.
+        '''
+        if capacity <= 0:
+            raise ValueError('Bloom filter capacity must be greater than zero.')
+
+        if not 0 < error_rate < 1:
+            raise ValueError('Bloom filter error rate must be between 0 and 1.')
+
+        # optimal number of bits (m) and hash functions (k) for n items:
+        #   m = -n * ln(p) / ln(2)^2      k = m / n * ln(2)
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        size = (bits + 7) // 8
+
+        if size > max_memory:
+            raise ValueError(
+                f'A Bloom filter for {capacity:,} items at error rate {error_rate:g} '
+                f'needs {size:,} bytes, more than the limit of {max_memory:,} bytes.'
+            )
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = size * 8
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+
+        self._bits = bytearray(size)
+        # a random key per filter, so nobody can craft colliding inputs in advance.
+        self._key = secrets.token_bytes(16)
+
+        self.count = 0              # items added
+        self.probable_hits = 0      # add() calls answered with "probably seen"
+
+    @property
+    def memory_bytes(self) -> int:
+        '''
+        Size of the bit array in bytes.
+        '''
+        return len(self._bits)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16, key=self._key).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1   # odd step, so positions differ
+        num_bits = self.num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, item: str) -> bool:
+        '''
+        True if the item was probably added before, False if it definitely was not.
+        '''
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def add(self, item: str) -> bool:
+        '''
+        Add an item to the filter.
+
+        :return: True if the item is definitely new (and was added),
+                 False if it was probably seen before (nothing is changed).
+        '''
+        bits = self._bits
+        is_new = False
+
+        # setting a bit that is already set changes nothing, so checking and
+        # setting can share one loop: if every bit was set, the item was
+        # probably seen and the filter is unchanged.
+        for pos in self._positions(item):
+            index, mask = pos >> 3, 1 << (pos & 7)
+            byte = bits[index]
+            if not byte & mask:
+                bits[index] = byte | mask
+                is_new = True
+
+        if is_new:
+            self.count += 1
+        else:
+            self.probable_hits += 1
+
+        return is_new
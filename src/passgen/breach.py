@@ -0,0 +1,304 @@
+# src/passgen/breach.py
+
+"""
+Offline check of passwords against a breached-password corpus.
+
+Responsibility:
+- Convert a "Have I Been Pwned"-style SHA-1 list ("HASH:COUNT" per line)
+  into a compact, sorted binary file of fixed-width hash prefixes
+- Open that file with mmap and look passwords up with a binary search
+- Tell the generator which passwords must be rejected
+
+Binary format (all integers little-endian):
+    header   magic b'PGBR', version (uint16), prefix width in bytes (uint16), count (uint64)
+    entries  count x prefix width bytes, the first bytes of each SHA-1 digest,
+             sorted ascending and without duplicates
+
+With the default width of 8 bytes (64 bits), one billion entries need 8 GB
+instead of ~45 GB of text, and the chance that a password which is not in the
+corpus collides with a stored prefix is about count / 2**64 (~5e-11 for one
+billion entries). A lookup touches ~30 entries, so only a few pages of the
+file are ever read into memory.
+
+Demonstrates:
+- External merge sort (sorted runs on disk + heapq.merge) for inputs far
+  larger than memory
+- Binary search directly on a memory-mapped file
+"""
+
+
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Union
+
+from .config import BREACH_FILE, BREACH_PREFIX_BYTES, BREACH_SORT_CHUNK
+
+
+_MAGIC = b'PGBR'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHHQ')   # magic, version, prefix width, count
+
+# size of the blocks in which sorted runs are read back during the merge.
+_READ_BLOCK = 1024 * 1024
+
+
+def _parse_line(line: str, width: int) -> Optional[bytes]:
+    '''
+    Turn one line of the corpus into a prefix of `width` bytes.
+
+    Accepts "HASH:COUNT" (HIBP format) and plain "HASH" lines; anything that
+    is not a 40 character hex SHA-1 digest is skipped.
+    '''
+    digest = line.split(':', 1)[0].strip()
+    if len(digest) != 40:
+        return None
+
+    try:
+        return bytes.fromhex(digest)[:width]
+    except ValueError:
+        return None
+
+
+def _write_run(prefixes: List[bytes], directory: str) -> str:
+    '''
+    Sort one chunk of prefixes and write it to a temporary file.
+    '''
+    prefixes.sort()
+    fd, name = tempfile.mkstemp(prefix='breach-run-', dir=directory)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(b''.join(prefixes))
+    return name
+
+
+def _read_run(f: BinaryIO, width: int) -> Iterator[bytes]:
+    '''
+    Yield the fixed-width entries of a sorted run, reading large blocks.
+    '''
+    block_size = _READ_BLOCK - _READ_BLOCK % width
+    while True:
+        block = f.read(block_size)
+        if not block:
+            return
+        for start in range(0, len(block), width):
+            yield block[start:start + width]
+
+
+def build_breach_index(
+    sources: Iterable[Path],
+    target: Path = BREACH_FILE,
+    width: int = BREACH_PREFIX_BYTES,
+    chunk_size: int = BREACH_SORT_CHUNK,
+) -> int:
+    '''
+    Convert SHA-1 corpus files into the sorted binary prefix file.
+
+    The input does not have to be sorted: it is read in chunks of
+    chunk_size entries, every chunk is sorted and written to a temporary
+    run, and the runs are merged (dropping duplicates) into the target.
+    Memory use is bounded by chunk_size, not by the size of the corpus.
+
+    :param sources: Text files with one SHA-1 hex digest per line ("HASH:COUNT").
+    :param target: Path of the binary file to write.
+    :param width: Bytes of every digest to keep (4-20).
+    :param chunk_size: Number of entries sorted in memory at once.
+    :return: Number of unique entries written.
+    :raises ValueError: If width or chunk_size is invalid.
+    '''
+    if not 4 <= width <= 20:
+        raise ValueError('Prefix width must be between 4 and 20 bytes.')
+
+    if chunk_size <= 0:
+        raise ValueError('Chunk size must be greater than zero.')
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = target.with_name(target.name + '.tmp')
+
+    with tempfile.TemporaryDirectory(prefix='passgen-breach-', dir=target.parent) as work_dir:
+        runs: List[str] = []
+        chunk: List[bytes] = []
+
+        for source in sources:
+            with open(source, 'r', encoding='ascii', errors='replace') as f:
+                for line in f:
+                    prefix = _parse_line(line, width)
+                    if prefix is None:
+                        continue
+                    chunk.append(prefix)
+                    if len(chunk) >= chunk_size:
+                        runs.append(_write_run(chunk, work_dir))
+                        chunk = []
+
+        if chunk:
+            runs.append(_write_run(chunk, work_dir))
+
+        count = 0
+        files = [open(run, 'rb') for run in runs]
+        try:
+            with temp_path.open('wb') as out:
+                # the count is only known at the end, so the header is written twice.
+                out.write(_HEADER.pack(_MAGIC, _VERSION, width, 0))
+
+                previous = None
+                buffer: List[bytes] = []
+                for prefix in heapq.merge(*(_read_run(f, width) for f in files)):
+                    if prefix == previous:
+                        continue
+                    previous = prefix
+                    buffer.append(prefix)
+                    count += 1
+                    if len(buffer) >= 65536:
+                        out.write(b''.join(buffer))
+                        buffer = []
+                out.write(b''.join(buffer))
+
+                out.seek(0)
+                out.write(_HEADER.pack(_MAGIC, _VERSION, width, count))
+        finally:
+            for f in files:
+                f.close()
+
+    os.replace(temp_path, target)
+    return count
+
+
+class BreachIndex:
+    '''
+    Read-only, memory-mapped view of a compiled breach file.
+
+    Usage:
+        with BreachIndex(path) as breached:
+            if 'password123' in breached:
+                ...
+
+    Instances returned by open_breach_index() are shared by the whole
+    process: close() (and leaving a with block) does nothing for them.
+    '''
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._shared = False
+
+        with path.open('rb') as f:
+            # mmap refuses empty files, but even an empty index has a header.
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, width, count = _HEADER.unpack_from(self._mmap, 0)
+        except struct.error as exc:
+            self._mmap.close()
+            raise ValueError(f'{path} is not a breach index (file too short).') from exc
+
+        if magic != _MAGIC or version != _VERSION or not 4 <= width <= 20:
+            self._mmap.close()
+            raise ValueError(f'{path} is not a breach index (bad header).')
+
+        if _HEADER.size + count * width != len(self._mmap):
+            self._mmap.close()
+            raise ValueError(f'{path} is truncated or corrupt.')
+
+        self.width = width
+        self._count = count
+
+        if hasattr(mmap, 'MADV_RANDOM'):
+            # lookups jump around the file, read-ahead would only waste memory.
+            self._mmap.madvise(mmap.MADV_RANDOM)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def contains_digest(self, digest: bytes) -> bool:
+        '''
+        Check a raw SHA-1 digest (or any prefix at least `width` bytes long).
+        '''
+        key = digest[:self.width]
+        width, data = self.width, self._mmap
+        lo, hi = 0, self._count
+
+        # classic binary search over fixed-width entries.
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = _HEADER.size + mid * width
+            entry = data[start:start + width]
+            if entry < key:
+                lo = mid + 1
+            elif entry > key:
+                hi = mid
+            else:
+                return True
+
+        return False
+
+    def __contains__(self, password: str) -> bool:
+        '''
+        True if the password (probably) appears in the breach corpus.
+        '''
+        return self.contains_digest(hashlib.sha1(password.encode('utf-8')).digest())
+
+    def close(self) -> None:
+        '''
+        Unmap the file (not for shared instances, which other callers still use).
+        '''
+        if not self._shared:
+            self._mmap.close()
+
+    def __enter__(self) -> 'BreachIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+@lru_cache(maxsize=8)
+def _open_shared(path: Path, inode: int, mtime_ns: int) -> BreachIndex:
+    # inode and mtime are only part of the cache key: a rebuilt file
+    # (written to a temp file and renamed) is a new inode, so it is mapped again.
+    index = BreachIndex(path)
+    index._shared = True
+    return index
+
+
+def open_breach_index(path: Path = BREACH_FILE) -> BreachIndex:
+    '''
+    Open (and keep open) a compiled breach file.
+
+    The instance is shared and cannot be closed by callers. It is reused
+    as long as the file is unchanged; after a rebuild the new file is opened.
+
+    :raises FileNotFoundError: If the file has not been built yet.
+    '''
+    st = path.stat()
+    return _open_shared(path, st.st_ino, st.st_mtime_ns)
+
+
+def resolve_breach_index(reject_breached: Union[bool, BreachIndex]) -> Optional[BreachIndex]:
+    '''
+    Turn an opt-in `reject_breached` argument into the index to check against.
+
+    :param reject_breached: False (no check), True (the shared index of
+                            config.BREACH_FILE) or a BreachIndex to use.
+    :return: The BreachIndex, or None if no check was asked for.
+    :raises FileNotFoundError: If True is passed and no breach file has been built.
+    '''
+    if isinstance(reject_breached, BreachIndex):
+        return reject_breached
+    return open_breach_index() if reject_breached else None
+
+
+def is_breached(password: str, path: Path = BREACH_FILE) -> bool:
+    '''
+    Check a password against the default breach file.
+
+    :return: True if the password is in the corpus, False if it is not or
+             no breach file has been built (the check is optional).
+    '''
+    try:
+        index = open_breach_index(path)
+    except FileNotFoundError:
+        return False
+    return password in index
@@ -31,9 +31,24 @@ DATA_DIR: Path = BASE_DIR / 'data'
 # exist_ok=True means "do nothing if the directory already exists".
 DATA_DIR.mkdir(exist_ok=True)
 
-# Path to the JSON file where passwords will be stored.
+# Path to the JSON Lines file where passwords will be stored (one record per line).
 # We will use this later in the storage module.
-PASSWORD_FILE: Path = DATA_DIR / 'passwords.json'
+# A passwords.json file from older versions (one JSON array) is migrated
+# to this file automatically the first time the vault is used.
+PASSWORD_FILE: Path = DATA_DIR / 'passwords.jsonl'
+
+# Where the vault is kept (see backends.py):
+#   'jsonl'  - PASSWORD_FILE, a plain text file (default)
+#   'sqlite' - SQLITE_FILE, a database with indexes, better for large vaults
+# When the SQLite database is created, the records of PASSWORD_FILE are copied into it.
+STORAGE_BACKEND: str = 'jsonl'
+
+# Path to the SQLite database used by the 'sqlite' backend.
+SQLITE_FILE: Path = DATA_DIR / 'passwords.db'
+
+# Keep the parsed vault in memory and only parse it again when the file
+# changes (checked with its inode, size and mtime).
+VAULT_CACHE: bool = True
 
 # =====================
 # Reports / logging
@@ -56,4 +71,120 @@ LOG_FILE: Path = REPORTS_DIR / 'passgen_log.txt'
 # These values will be used later when we ask the user for a password length.
 DEFAULT_LENGTH: int = 12    # A reasonable default password length
 MIN_LENGTH: int = 4         # Minimum allowed lenth for a password
-MAX_LENGTH: int = 64        # MAximum allowed lenth for a password
\ No newline at end of file
+MAX_LENGTH: int = 64        # MAximum allowed lenth for a password
+
+# =====================
+# Streaming / bulk generation
+# =====================
+
+# Number of passwords generated and written per chunk in streaming mode.
+# Memory use in streaming mode depends on this value, not on the total count.
+STREAM_CHUNK_SIZE: int = 10_000
+
+# Size (in bytes) of the write buffer used when streaming to a file.
+STREAM_BUFFER_SIZE: int = 1024 * 1024
+
+# Default number of worker processes for parallel generation.
+# 0 means "one worker per CPU core".
+PARALLEL_WORKERS: int = 0
+
+# Default number of threads used by security.hash_passwords().
+# 0 means "one thread per CPU core".
+HASH_WORKERS: int = 0
+
+# Maximum number of parsed hash records kept by security.verify_password().
+HASH_CACHE_SIZE: int = 1024
+
+# =====================
+# Password hashing (KDF)
+# =====================
+
+# Algorithm used for new hashes: "pbkdf2_sha256" or "scrypt" (see kdf.py).
+KDF_ALGORITHM: str = 'pbkdf2_sha256'
+
+# Target time for hashing one password. The cost parameters are calibrated
+# to this value on every host, once, and stored in KDF_PARAMS_FILE.
+KDF_TARGET_MS: float = 100.0
+KDF_PARAMS_FILE: Path = DATA_DIR / 'kdf_params.json'
+
+# Calibrate automatically the first time a password is hashed on a new host.
+# If False, the defaults below are used until `passgen calibrate` is run.
+KDF_AUTO_CALIBRATE: bool = True
+
+# PBKDF2 never uses fewer iterations than this, even on slow hardware.
+PBKDF2_MIN_ITERATIONS: int = 100_000
+
+# Upper limit for the memory one scrypt hash may use (bytes).
+SCRYPT_MAX_MEMORY: int = 64 * 1024 * 1024
+
+# Rehash-on-verify (storage.enable_rehash_on_verify()): outdated hashes are
+# collected for up to REHASH_BATCH_DELAY seconds (or REHASH_BATCH_SIZE hashes)
+# and then written to the password file in a single write.
+REHASH_BATCH_SIZE: int = 500
+REHASH_BATCH_DELAY: float = 0.5
+
+# Opt-in: save passwords from the interactive menu right away and compute the hash
+# in a background thread (storage.add_password(..., defer_hash=True)).
+DEFERRED_HASHING: bool = False
+
+# Store a keyed fingerprint (HMAC-SHA256) with every record, so reused
+# passwords can be found in one pass (`passgen audit --reuse`).
+STORE_FINGERPRINTS: bool = True
+
+# Local secret key for the fingerprints, created on first use.
+FINGERPRINT_KEY_FILE: Path = DATA_DIR / 'fingerprint.key'
+
+# =====================
+# Breached passwords (breach.py)
+# =====================
+
+# Compiled, sorted breach file. Build it from a HIBP-style SHA-1 list with:
+#     passgen breach-index pwned-passwords-sha1.txt
+BREACH_FILE: Path = DATA_DIR / 'breached.idx'
+
+# Bytes of every SHA-1 digest kept in the breach file (8 = 64 bits).
+BREACH_PREFIX_BYTES: int = 8
+
+# Number of entries sorted in memory at once while building the breach file.
+BREACH_SORT_CHUNK: int = 5_000_000
+
+# Reject generated passwords that appear in the breach file (if it exists).
+BREACH_CHECK: bool = True
+
+# =====================
+# asyncio API (aio.py)
+# =====================
+
+# Threads that run hashing and file I/O for the async API (0 = one per CPU core).
+AIO_WORKERS: int = 0
+
+# Maximum number of jobs queued or running in that pool; further coroutines
+# wait (backpressure). 0 means 4 jobs per worker thread.
+AIO_MAX_PENDING: int = 0
+
+# =====================
+# Passphrases
+# =====================
+
+# Compiled (binary, memory-mapped) wordlist used for passphrases.
+# Create it with: passgen wordlist path/to/words.txt
+WORDLIST_FILE: Path = DATA_DIR / 'wordlist.idx'
+
+# Default number of words in a generated passphrase.
+DEFAULT_PASSPHRASE_WORDS: int = 6
+
+# Uniqueness in bulk mode (unique=True / --unique) is tracked with a Bloom filter.
+# Target false-positive rate of the filter and the maximum memory it may use.
+UNIQUE_ERROR_RATE: float = 1e-6
+UNIQUE_MAX_MEMORY: int = 256 * 1024 * 1024
+
+# Size (in bytes) of the block the entropy pool reads from os.urandom at once.
+ENTROPY_POOL_SIZE: int = 64 * 1024
+
+# =====================
+# Pronounceable passwords
+# =====================
+
+# Precompiled Markov transition table, shipped with the package.
+# Rebuild it from tools/markov_corpus.txt with: python tools/build_markov_model.py
+MARKOV_MODEL_FILE: Path = BASE_DIR / 'models' / 'markov_en.bin'
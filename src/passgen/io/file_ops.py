@@ -4,8 +4,8 @@
 File operations module for PassGen.
 
 Responsibility:
-- Create timestamped backups of the password storage file (passwords.json)
-- Reset the password storage file to an empty list
+- Create timestamped backups of the password vault (passwords.jsonl or passwords.db)
+- Reset the password storage file to an empty vault
 - Create timestamped backups of the main log file (passgen_log.txt)
 
 Demonstrates:
@@ -19,10 +19,10 @@ from __future__ import annotations
 
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import Optional
 
-from ..config import PASSWORD_FILE, REPORTS_DIR, LOG_FILE
-from .module_io import read_json_file, write_json_file
+from .. import storage
+from ..config import REPORTS_DIR, LOG_FILE
 
 
 def generate_timestamp(format_str: str = '%Y%m%d_%H%M%S') -> str:
@@ -37,44 +37,40 @@ def generate_timestamp(format_str: str = '%Y%m%d_%H%M%S') -> str:
 
 def backup_password_file() -> Path:
     '''
-    Create a backup of the current passwords.json file.
+    Create a backup of the current password vault.
     
-    - Reads the current password data (or uses an empty list if missing/invalid).
-    - Writes a backup file with a timestamped name in a 'backups' directory next to the original passwords.json file.
+    - Copies the vault as it is (passwords.jsonl, or passwords.db for SQLite).
+    - If there is no vault yet, the backup is an empty vault.
+    - Writes a backup file with a timestamped name in a 'backups' directory next to the vault file.
     
     Returns:
         Path to the created backup file.
     '''
-    # load current data (may be None if file is missing or invalid)
-    data: Any = read_json_file(PASSWORD_FILE)
-    
-    if data is None:
-        # if there is no valid data, we still create a backup,
-        # but the file will contain an empty list.
-        data = []
-        
-    # define a backups directory under the same parent as PASSWORD_FILE
-    backup_dir: Path = PASSWORD_FILE.parent / 'backups'
+    # storage selects the backend (and migrates older files) in one place,
+    # so a backup never creates an empty vault next to unmigrated records.
+    vault = storage.get_backend()
+
+    # define a backups directory under the same parent as the vault file
+    backup_dir: Path = vault.path.parent / 'backups'
     backup_dir.mkdir(parents=True, exist_ok=True)
     
-    # build a filename: passwords_YYYYMMDD_HHMMSS.json
+    # build a filename: passwords_YYYYMMDD_HHMMSS.jsonl (or .db)
     timestamp = generate_timestamp()
-    backup_filename = f'passwords_{timestamp}.json'
+    backup_filename = f'passwords_{timestamp}{vault.suffix}'
     backup_path = backup_dir / backup_filename
     
-    # write JSON data to the backup file
-    write_json_file(backup_path, data)
+    vault.backup(backup_path)
     
     return backup_path
 
 
 def reset_password_file() -> None:
     '''
-    Reset the password storage file to an empty list.
+    Reset the password vault to an empty vault (no records).
     
     This is useful for testing or if you want to clear all stored passwords.
     '''
-    write_json_file(PASSWORD_FILE, [])
+    storage.get_backend().replace_all([])
     
     
 def backup_log_file() -> Optional[Path]:
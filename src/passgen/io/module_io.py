@@ -7,19 +7,29 @@ Responsibility:
 - Read JSON data safely from disk
 - Write JSON data to disk with proper encoding and indentation
 - Append lines of text to a file (used by the logging module)
+- Read, append and rewrite JSON Lines files (one JSON object per line)
+- Stream the items of a large JSON array file without loading it at once
 
 Demonstrates:
 - A dedicated I/O layer separate from business logic and CLI
 - Robust handling of missing or invalid JSON files
 - Using pathlib for file operations across platforms
+- Append-only files: adding a record writes one line instead of the whole file
+- Incremental parsing with json.JSONDecoder.raw_decode() over a sliding buffer
 """
 
 
 import json
+import os
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Iterable, Iterator, Optional
 
 
+# characters read at a time by iter_json_array().
+_READ_CHUNK = 64 * 1024
+
+_WHITESPACE = json.decoder.WHITESPACE
+
 def read_json_file(path: Path) -> Optional[Any]:
     '''
     Read JSON from a file.
@@ -82,4 +92,170 @@ def append_text_line(path: Path, line: str) -> None:
         f.write(line)
         # ensure there is exactly one newline at the end.
         if not line.endswith('\n'):
-            f.write('\n')
\ No newline at end of file
+            f.write('\n')
+
+
+def iter_jsonl_file(path: Path) -> Iterator[Dict[str, Any]]:
+    '''
+    Stream the objects of a JSON Lines file, one line at a time.
+
+    - Yields nothing if the file does not exist.
+    - Skips empty lines and lines that are not a JSON object, e.g. a last
+      line that was only half written when the program crashed.
+
+    Args:
+        path: Path to the JSON Lines file.
+
+    Yields:
+        One dictionary per valid line, in file order.
+    '''
+    try:
+        f = path.open('r', encoding='utf-8')
+    except FileNotFoundError:
+        return
+
+    with f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(data, dict):
+                yield data
+
+
+def iter_json_array(path: Path, chunk_size: int = _READ_CHUNK) -> Iterator[Any]:
+    '''
+    Stream the items of a file that holds one JSON array, one item at a time.
+
+    - Yields nothing if the file does not exist.
+    - Only the item being parsed (and one chunk of the file) is kept in
+      memory, never the whole text or the whole list.
+
+    Args:
+        path: Path to the JSON file.
+        chunk_size: Number of characters read from the file at a time.
+
+    Yields:
+        The items of the array, in file order.
+
+    Raises:
+        ValueError: If the file is not a valid JSON array.
+    '''
+    try:
+        f = path.open('r', encoding='utf-8')
+    except FileNotFoundError:
+        return
+
+    decoder = json.JSONDecoder()
+    buffer, pos = '', 0
+
+    def read_more() -> bool:
+        nonlocal buffer, pos
+        chunk = f.read(chunk_size)
+        # drop what has been parsed already, keep the unparsed tail.
+        buffer, pos = buffer[pos:] + chunk, 0
+        return bool(chunk)
+
+    with f:
+        expect = '['
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                if not read_more():
+                    raise ValueError(f'{path}: unexpected end of file, the JSON array is not closed.')
+                continue
+
+            if expect == '[':
+                if buffer[pos] != '[':
+                    raise ValueError(f'{path} does not contain a JSON array.')
+                pos += 1
+                expect = 'first'
+
+            elif expect == 'separator':
+                char = buffer[pos]
+                pos += 1
+                if char == ']':
+                    return
+                if char != ',':
+                    raise ValueError(f'{path}: expected "," or "]" in the JSON array.')
+                expect = 'item'
+
+            elif expect == 'first' and buffer[pos] == ']':
+                return
+
+            else:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # the item may continue in the next chunk.
+                    if read_more():
+                        continue
+                    raise
+                # a number at the very end of the buffer may have more digits.
+                if end == len(buffer) and read_more():
+                    continue
+                pos = end
+                expect = 'separator'
+                yield item
+
+
+def _jsonl_line(record: Dict[str, Any]) -> str:
+    # compact separators: one record per line, no indentation.
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def _jsonl_lines(records: Iterable[Dict[str, Any]]) -> str:
+    return ''.join(_jsonl_line(record) for record in records)
+
+
+def append_jsonl_file(path: Path, records: Iterable[Dict[str, Any]]) -> None:
+    '''
+    Append objects to a JSON Lines file with a single write.
+
+    - Creates the file (and its parent directory) if needed.
+    - The existing content is never read or rewritten, so the cost does not
+      depend on the size of the file.
+
+    Args:
+        path: Path to the JSON Lines file.
+        records: JSON-serializable dictionaries, one per line.
+    '''
+    data = _jsonl_lines(records).encode('utf-8')
+    if not data:
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with path.open('a+b') as f:
+        # a crash in the middle of a previous append can leave a last line
+        # without newline; start on a fresh line so that only it is lost.
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                data = b'\n' + data
+        f.write(data)
+
+
+def write_jsonl_file(path: Path, records: Iterable[Dict[str, Any]]) -> None:
+    '''
+    Replace the content of a JSON Lines file.
+
+    The new content is written to a temporary file first and then renamed,
+    so readers see either the old or the new file, never a partial one.
+    Records are written one line at a time, so `records` may be a generator
+    over more data than fits in memory.
+
+    Args:
+        path: Path to the JSON Lines file.
+        records: JSON-serializable dictionaries, one per line.
+    '''
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+
+    with temp_path.open('w', encoding='utf-8') as f:
+        f.writelines(_jsonl_line(record) for record in records)
+
+    os.replace(temp_path, path)
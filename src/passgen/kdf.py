@@ -0,0 +1,345 @@
+# src/passgen/kdf.py
+
+"""
+Key derivation functions (KDFs) used to hash passwords in PassGen.
+
+Responsibility:
+- Keep a registry of supported KDFs (PBKDF2-HMAC-SHA256, scrypt), looked up
+  by the algorithm prefix of a stored hash ("pbkdf2_sha256$...", "scrypt$...")
+- Calibrate the cost parameters of a KDF to a target latency on this host
+- Persist the calibrated parameters, so calibration runs once per host
+
+Stored hash format (see security.py):
+    algorithm$params$salt_b64$hash_b64
+
+    params is a comma separated list of integers:
+        pbkdf2_sha256$600000$...        iterations
+        scrypt$32768,8,1$...            N (CPU/memory cost), r (block size), p (parallelism)
+
+Calibration file (config.KDF_PARAMS_FILE), one entry per host name:
+    {"my-laptop": {"pbkdf2_sha256": {"params": [600000], "target_ms": 100, "calibrated_at": "..."}}}
+
+Demonstrates:
+- A small plugin registry: new algorithms are added with register_kdf()
+- Measuring instead of guessing: the cost is derived from a timed probe
+- Caching an expensive result on disk and in memory
+"""
+
+
+import hashlib
+import platform
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import (
+    KDF_ALGORITHM,
+    KDF_AUTO_CALIBRATE,
+    KDF_PARAMS_FILE,
+    KDF_TARGET_MS,
+    PBKDF2_MIN_ITERATIONS,
+    SCRYPT_MAX_MEMORY,
+)
+from .io.module_io import read_json_file, write_json_file
+
+
+Params = Tuple[int, ...]
+
+
+class KdfBackend:
+    '''
+    Base class for a password hashing algorithm.
+
+    Subclasses set `name` and `param_count` and implement derive(),
+    default_params() and calibrate(). Parameters are always a tuple of ints,
+    so they can be stored in the hash string and in JSON.
+    '''
+
+    name: str = ''
+    param_count: int = 1
+
+    def derive(self, password: bytes, salt: bytes, params: Params) -> bytes:
+        '''
+        Derive the key (the stored hash) for a password.
+        '''
+        raise NotImplementedError
+
+    def default_params(self) -> Params:
+        '''
+        Parameters used when calibration is disabled.
+        '''
+        raise NotImplementedError
+
+    def calibrate(self, target: float) -> Params:
+        '''
+        Measure this host and return parameters that take about `target` seconds.
+        '''
+        raise NotImplementedError
+
+    def cost(self, params: Params) -> int:
+        '''
+        Relative amount of work for the parameters (higher is stronger).
+        '''
+        result = 1
+        for value in params:
+            result *= value
+        return result
+
+    def format_params(self, params: Params) -> str:
+        return ','.join(str(value) for value in params)
+
+    def parse_params(self, text: str) -> Params:
+        '''
+        Parse the params field of a stored hash.
+
+        :raises ValueError: If the field is malformed.
+        '''
+        params = tuple(int(value) for value in text.split(','))
+        if len(params) != self.param_count or any(value <= 0 for value in params):
+            raise ValueError(f'Invalid parameters for {self.name}: {text!r}')
+        return params
+
+
+def _best_time(func: Callable[[], object], repeat: int = 3) -> float:
+    '''
+    Run func a few times and return the fastest run in seconds.
+
+    The fastest run is the one least disturbed by other processes.
+    '''
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class Pbkdf2Sha256(KdfBackend):
+    '''
+    PBKDF2-HMAC-SHA256, params = (iterations,).
+    '''
+
+    name = 'pbkdf2_sha256'
+    param_count = 1
+
+    def derive(self, password: bytes, salt: bytes, params: Params) -> bytes:
+        return hashlib.pbkdf2_hmac('sha256', password, salt, params[0])
+
+    def default_params(self) -> Params:
+        return (PBKDF2_MIN_ITERATIONS,)
+
+    def calibrate(self, target: float) -> Params:
+        # PBKDF2 time grows linearly with the iteration count,
+        # so one timed probe is enough to scale to the target.
+        probe = 20_000
+        elapsed = _best_time(lambda: self.derive(b'calibration', b'0123456789abcdef', (probe,)))
+        iterations = int(probe * target / max(elapsed, 1e-9))
+
+        # round to thousands, and never go below the old hard-coded default.
+        iterations = max(PBKDF2_MIN_ITERATIONS, iterations // 1000 * 1000)
+        return (iterations,)
+
+
+class Scrypt(KdfBackend):
+    '''
+    scrypt (memory-hard), params = (n, r, p).
+    '''
+
+    name = 'scrypt'
+    param_count = 3
+
+    _MIN_N = 1 << 14
+    _R = 8
+    _P = 1
+
+    @staticmethod
+    def _memory(n: int, r: int) -> int:
+        '''
+        Bytes of memory scrypt needs for the given N and r.
+        '''
+        return 128 * n * r
+
+    def derive(self, password: bytes, salt: bytes, params: Params) -> bytes:
+        n, r, p = params
+        # hashlib refuses to use more than 32 MiB unless maxmem is raised.
+        maxmem = self._memory(n, r) * (p + 1) + 1024 * 1024
+        return hashlib.scrypt(password, salt=salt, n=n, r=r, p=p, maxmem=maxmem, dklen=32)
+
+    def default_params(self) -> Params:
+        return (self._MIN_N, self._R, self._P)
+
+    def parse_params(self, text: str) -> Params:
+        params = super().parse_params(text)
+        n = params[0]
+        if n < 2 or n & (n - 1):
+            raise ValueError(f'Invalid parameters for {self.name}: N must be a power of two.')
+        return params
+
+    def calibrate(self, target: float) -> Params:
+        # scrypt time also grows linearly with N. N must be a power of two,
+        # and is limited by config.SCRYPT_MAX_MEMORY.
+        elapsed = _best_time(lambda: self.derive(b'calibration', b'0123456789abcdef', self.default_params()))
+        wanted = self._MIN_N * target / max(elapsed, 1e-9)
+
+        n = self._MIN_N
+        while n * 2 <= wanted and self._memory(n * 2, self._R) <= SCRYPT_MAX_MEMORY:
+            n *= 2
+
+        return (n, self._R, self._P)
+
+
+_REGISTRY: Dict[str, KdfBackend] = {}
+
+
+def register_kdf(backend: KdfBackend) -> None:
+    '''
+    Make a KDF available for hashing and for verifying stored hashes.
+
+    :raises ValueError: If the name is empty or contains "$".
+    '''
+    if not backend.name or '$' in backend.name:
+        raise ValueError(f'Invalid KDF name: {backend.name!r}')
+    _REGISTRY[backend.name] = backend
+
+
+def get_kdf(name: str) -> KdfBackend:
+    '''
+    Return the registered KDF with this name.
+
+    :raises ValueError: If no KDF with this name is registered.
+    '''
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f'Unsupported algorithm: {name}') from None
+
+
+def available_kdfs() -> List[str]:
+    '''
+    Names of all registered KDFs.
+    '''
+    return sorted(_REGISTRY)
+
+
+register_kdf(Pbkdf2Sha256())
+if hasattr(hashlib, 'scrypt'):
+    # only available when Python is built against OpenSSL 1.1+.
+    register_kdf(Scrypt())
+
+
+# ---------------------
+# Calibration
+# ---------------------
+
+_PARAMS_LOCK = threading.Lock()
+_PARAMS_CACHE: Dict[str, Params] = {}
+
+
+def _host_name() -> str:
+    return platform.node() or 'unknown-host'
+
+
+def _load_saved_params(name: str) -> Optional[Params]:
+    '''
+    Read the calibrated parameters of this host from the calibration file.
+    '''
+    data = read_json_file(KDF_PARAMS_FILE)
+    if not isinstance(data, dict):
+        return None
+
+    host_entry = data.get(_host_name())
+    if not isinstance(host_entry, dict):
+        return None
+
+    entry = host_entry.get(name)
+    if not isinstance(entry, dict):
+        return None
+
+    try:
+        return get_kdf(name).parse_params(','.join(str(value) for value in entry['params']))
+    except (KeyError, TypeError, ValueError):
+        # a broken entry is simply calibrated again.
+        return None
+
+
+def calibrate_kdf(name: Optional[str] = None, target_ms: float = KDF_TARGET_MS, save: bool = True) -> Params:
+    '''
+    Measure this host and pick parameters that take about target_ms per hash.
+
+    :param name: KDF to calibrate (default: config.KDF_ALGORITHM).
+    :param target_ms: Target time per hash in milliseconds (must be > 0).
+    :param save: Store the result in the calibration file (config.KDF_PARAMS_FILE).
+    :return: The calibrated parameters.
+    :raises ValueError: If the KDF is unknown or target_ms is not positive.
+    '''
+    name = name or KDF_ALGORITHM
+    backend = get_kdf(name)
+
+    if target_ms <= 0:
+        raise ValueError('Calibration target must be greater than zero.')
+
+    params = backend.calibrate(target_ms / 1000)
+
+    with _PARAMS_LOCK:
+        _PARAMS_CACHE[name] = params
+
+        if save:
+            data = read_json_file(KDF_PARAMS_FILE)
+            if not isinstance(data, dict):
+                data = {}
+            host_entry = data.get(_host_name())
+            if not isinstance(host_entry, dict):
+                # a broken entry for this host is replaced, not patched.
+                host_entry = data[_host_name()] = {}
+            host_entry[name] = {
+                'params': list(params),
+                'target_ms': target_ms,
+                'calibrated_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            write_json_file(KDF_PARAMS_FILE, data)
+
+    return params
+
+
+def get_kdf_params(name: Optional[str] = None) -> Tuple[str, Params]:
+    '''
+    Return the algorithm and parameters new hashes should use.
+
+    Order of preference:
+    1) parameters already used in this process
+    2) parameters calibrated earlier on this host (calibration file)
+    3) a fresh calibration, saved for next time (if config.KDF_AUTO_CALIBRATE)
+    4) the KDF defaults
+
+    :param name: KDF name (default: config.KDF_ALGORITHM).
+    :return: Tuple of (algorithm name, parameters).
+    :raises ValueError: If the KDF is unknown.
+    '''
+    name = name or KDF_ALGORITHM
+    backend = get_kdf(name)
+
+    with _PARAMS_LOCK:
+        params = _PARAMS_CACHE.get(name)
+        if params is None:
+            params = _load_saved_params(name)
+            if params is not None:
+                _PARAMS_CACHE[name] = params
+
+    if params is None:
+        if KDF_AUTO_CALIBRATE:
+            params = calibrate_kdf(name)
+        else:
+            params = backend.default_params()
+            with _PARAMS_LOCK:
+                _PARAMS_CACHE[name] = params
+
+    return name, params
+
+
+def reset_kdf_params() -> None:
+    '''
+    Forget the parameters cached in this process (the calibration file is kept).
+    '''
+    with _PARAMS_LOCK:
+        _PARAMS_CACHE.clear()
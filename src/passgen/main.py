@@ -9,11 +9,20 @@ Demonstrates:
 - Clean separation between CLI/UI code and core logic modules
 - Using the Rich library for colored terminal output
 - Integrating logging and JSON storage in a user-facing application
+- A non-interactive `passgen generate --count N` mode for scripts and bulk provisioning
 '''
 
 
+import argparse                         # parsing of command line arguments (non-interactive mode)
+import csv
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
 from rich.console import Console        # for colored / styled output
 from rich.panel import Panel            # for a nice box around the header
+from rich.progress import Progress      # progress bar for long imports
 from rich.table import Table            # for a nice table when showing saved passwords
 
 from . import config                    # import configuration (min/max/default length, paths, etc.)
@@ -21,12 +30,22 @@ from . import password_generator as pg  # import the password generator module
 from . import storage                   # for saving/loading passwords
 from . import utils                     # input helper functions
 from . import logger                    # logging module
+from . import streaming                 # streaming (bulk) password generation
+from . import passphrase                # diceware-style passphrases from a compiled wordlist
+from . import markov                    # pronounceable passwords (Markov chain)
+from . import kdf                       # password hashing algorithms and calibration
+from . import breach                    # offline breached-password corpus
 from .security import mask_password     # import security
+from .strength import score_passwords   # entropy / strength estimates
 from .io.file_ops import backup_password_file, reset_password_file   # import backup / reset function to the menu
+from .io.module_io import iter_json_array, iter_jsonl_file
 
 # create a global Console instance that we can use throughout this module.
 console = Console()
 
+# status messages in non-interactive mode go to stderr, so stdout only contains passwords.
+err_console = Console(stderr=True)
+
 def print_header() -> None:
     '''
     Print a colorful header for the CLI application using Rich.
@@ -61,21 +80,22 @@ def print_menu() -> None:
 def choose_difficulty() -> str:
     '''
     Ask the user to choose a difficulty level for the password.
-    Returns one of: '1', '2', '3'.
+    Returns one of: '1', '2', '3', '4'.
     '''
     console.print('\n[bold underline]Choose difficulty level:[/bold underline]', style='cyan')
     console.print('[green]1)[/green] Easy      (letters + digits)')
     console.print('[green]2)[/green] Medium    (letters + digits + some special characters)')
     console.print('[green]3)[/green] Hard      (letters + digits + many special characters)')
+    console.print('[green]4)[/green] Pronounceable (lowercase, easy to say and type)')
     
     while True:
-        choice = input('Difficulty (1-3): ').strip()
+        choice = input('Difficulty (1-4): ').strip()
         
-        if choice in ('1', '2', '3'):
+        if choice in ('1', '2', '3', '4'):
             return choice   # valid choice, return it to the caller
         
         # if we reach this line, the input was invalid.
-        console.print('❌ [red]Invalid difficulty choice, please enter 1, 2 or 3.[/red]')
+        console.print('❌ [red]Invalid difficulty choice, please enter 1, 2, 3 or 4.[/red]')
         
         
 def ask_password_length() -> int:
@@ -117,7 +137,12 @@ def handle_generate_password() -> None:
     
     # 3) try to generate the password using the password_generator module.
     try:
-        password = pg.generate_password(length, level)
+        # hard passwords always contain lower, upper, digit and symbol.
+        password = pg.generate_password(
+            length, level, require_all_classes=(level == pg.Difficulty.HARD),
+            # skip passwords from the local breach corpus, if one has been built.
+            reject_breached=config.BREACH_CHECK and config.BREACH_FILE.exists(),
+        )
     except ValueError as error:
         # if something goes wrong (e.g. invalid length or level),
         # we show an error message instead of crashing.
@@ -132,6 +157,9 @@ def handle_generate_password() -> None:
     # 4) show the generated password to the user.
     console.print('\nYour new password is:', style='bold green')
     console.print(f'[bold]{password}[/bold]')
+    if level == pg.Difficulty.PRONOUNCEABLE:
+        # the exact entropy under the Markov model, lower than length * log2(26).
+        console.print(f'Entropy: {markov.pronounceable_entropy(password):.1f} bits', style='dim')
     print()     # print an extra blank line for readability
     
     # 5) ask if the user wants to save the password.
@@ -144,7 +172,9 @@ def handle_generate_password() -> None:
         
         try:
             # call the storage modul to save the new record
-            storage.add_password(service, username, password)
+            # with deferred hashing the record is written at once and
+            # the (slow) hash is computed in the background.
+            storage.add_password(service, username, password, defer_hash=config.DEFERRED_HASHING)
         except Exception as exc:
             logger.log_event(f"Error while saving password: {exc!r}", level="ERROR")
             console.print("❌ Failed to save password. See log for details.", style="red")
@@ -184,10 +214,14 @@ def handle_show_saved_passwords() -> None:
     table.add_column('Service')
     table.add_column('Username')
     table.add_column('Password (masked)')
+    table.add_column('Strength')
     table.add_column('Created', style='cyan')
     
+    # score all passwords in one batch (vectorized when NumPy is installed).
+    scores = score_passwords([record.get('password', '') for record in records])
+    
     # loop over saved password records and print them nicely.
-    for index, record in enumerate(records, start=1):
+    for index, (record, score) in enumerate(zip(records, scores), start=1):
         service = record.get('service', '-')
         username = record.get('username', '-')
         password = record.get('password', '-')
@@ -201,6 +235,7 @@ def handle_show_saved_passwords() -> None:
             service,
             username,
             masked,
+            f'{score.score:.0f} bits ({score.label})',
             created_at,
         )
         
@@ -234,7 +269,7 @@ def handle_reset_passwords() -> None:
     Menu option 4: reset the password storage file.
     '''
     console.print('\n--- Reset passwords file ---', style='bold red')
-    console.print('[yellow]Warning: This will permanently delete all saved passwords from passwords.json.[/yellow]')
+    console.print('[yellow]Warning: This will permanently delete all saved passwords from the vault.[/yellow]')
 
     console.print('Type [bold red]YES[/bold red] to confirm, or press Enter to cancel:')
     confirm = utils.ask_menu_choice('> ')
@@ -254,17 +289,381 @@ def handle_reset_passwords() -> None:
 
     logger.log_passwords_reset()
 
-    console.print('✅ Password storage has been reset. passwords.json is now empty.', style='green')
+    console.print('✅ Password storage has been reset. The vault is now empty.', style='green')
     console.print()
     
     
-def run_app() -> None:
+def build_arg_parser() -> argparse.ArgumentParser:
+    '''
+    Build the parser for the command line arguments.
+
+    Without a sub-command PassGen starts the interactive menu.
+    '''
+    parser = argparse.ArgumentParser(
+        prog='passgen',
+        description='PassGen - password generator CLI. Run without arguments for the interactive menu.',
+    )
+    subparsers = parser.add_subparsers(dest='command')
+
+    generate = subparsers.add_parser(
+        'generate',
+        help='generate passwords non-interactively and stream them to stdout or a file',
+    )
+    generate.add_argument('--count', '-n', type=int, default=1,
+                          help='number of passwords to generate (default: 1)')
+    generate.add_argument('--length', '-l', type=int, default=config.DEFAULT_LENGTH,
+                          help=f'password length (default: {config.DEFAULT_LENGTH})')
+    generate.add_argument('--level', choices=['1', '2', '3', '4'], default=pg.Difficulty.HARD,
+                          help='difficulty: 1=easy, 2=medium, 3=hard, 4=pronounceable (default: 3)')
+    generate.add_argument('--output', '-o', type=Path, default=None,
+                          help='write passwords to this file instead of stdout')
+    generate.add_argument('--chunk-size', type=int, default=config.STREAM_CHUNK_SIZE,
+                          help=f'passwords generated per chunk (default: {config.STREAM_CHUNK_SIZE})')
+    generate.add_argument('--all-classes', action='store_true',
+                          help='every password contains at least one character of each class')
+    generate.add_argument('--unique', action='store_true',
+                          help='never output the same password twice (uses a Bloom filter)')
+    generate.add_argument('--unique-error-rate', type=float, default=config.UNIQUE_ERROR_RATE,
+                          help=f'false-positive rate of the Bloom filter (default: {config.UNIQUE_ERROR_RATE:g})')
+    generate.add_argument('--unique-max-memory', type=int,
+                          default=config.UNIQUE_MAX_MEMORY // (1024 * 1024),
+                          help='memory limit for the Bloom filter in MiB '
+                               f'(default: {config.UNIQUE_MAX_MEMORY // (1024 * 1024)})')
+    generate.add_argument('--reject-breached', action='store_true',
+                          help='replace passwords found in the breach file (build it with breach-index)')
+    generate.add_argument('--with-strength', action='store_true',
+                          help='append the strength score in bits to every line (tab separated)')
+    generate.add_argument('--workers', '-w', type=int, default=1,
+                          help='worker processes for generation, 0 = one per CPU core (default: 1)')
+    generate.add_argument('--unordered', action='store_true',
+                          help='with several workers, write chunks as soon as they are ready')
+    generate.add_argument('--quiet', '-q', action='store_true',
+                          help='do not print the throughput summary')
+
+    phrase = subparsers.add_parser(
+        'passphrase',
+        help='generate diceware-style passphrases from the compiled wordlist',
+    )
+    phrase.add_argument('--words', type=int, default=config.DEFAULT_PASSPHRASE_WORDS,
+                        help=f'words per passphrase (default: {config.DEFAULT_PASSPHRASE_WORDS})')
+    phrase.add_argument('--count', '-n', type=int, default=1,
+                        help='number of passphrases to generate (default: 1)')
+    phrase.add_argument('--separator', default='-',
+                        help='separator between words (default: "-")')
+    phrase.add_argument('--capitalize', action='store_true',
+                        help='capitalize every word')
+    phrase.add_argument('--wordlist', type=Path, default=config.WORDLIST_FILE,
+                        help='compiled wordlist to use')
+
+    wordlist = subparsers.add_parser(
+        'wordlist',
+        help='compile a plain text wordlist (one word per line) for passphrases',
+    )
+    wordlist.add_argument('source', type=Path, help='plain text wordlist')
+    wordlist.add_argument('--output', '-o', type=Path, default=config.WORDLIST_FILE,
+                          help='compiled index file (default: data/wordlist.idx)')
+
+    calibrate = subparsers.add_parser(
+        'calibrate',
+        help='measure this host and store password hashing parameters for a target latency',
+    )
+    calibrate.add_argument('--algorithm', choices=kdf.available_kdfs(), default=config.KDF_ALGORITHM,
+                           help=f'KDF to calibrate (default: {config.KDF_ALGORITHM})')
+    calibrate.add_argument('--target-ms', type=float, default=config.KDF_TARGET_MS,
+                           help=f'target time per hash in milliseconds (default: {config.KDF_TARGET_MS:g})')
+
+    breach_index = subparsers.add_parser(
+        'breach-index',
+        help='build the offline breached-password file from HIBP-style SHA-1 lists',
+    )
+    breach_index.add_argument('sources', type=Path, nargs='+',
+                              help='text files with one "SHA1:COUNT" entry per line')
+    breach_index.add_argument('--output', '-o', type=Path, default=config.BREACH_FILE,
+                              help='breach file to write (default: data/breached.idx)')
+    breach_index.add_argument('--prefix-bytes', type=int, default=config.BREACH_PREFIX_BYTES,
+                              help=f'bytes of every hash to keep (default: {config.BREACH_PREFIX_BYTES})')
+
+    importer = subparsers.add_parser(
+        'import',
+        help='add many passwords at once from a CSV, JSON or JSON Lines file',
+    )
+    importer.add_argument('source', type=Path,
+                          help='.csv with service,username,password columns, a .json list or a .jsonl file')
+    importer.add_argument('--workers', '-w', type=int, default=None,
+                          help='hashing threads, 0 = one per CPU core (default: config.HASH_WORKERS)')
+    importer.add_argument('--reject-breached', action='store_true',
+                          help='refuse the import if a password is in the breach file')
+
+    audit = subparsers.add_parser(
+        'audit',
+        help='check the saved passwords (e.g. for passwords used more than once)',
+    )
+    audit.add_argument('--reuse', action='store_true',
+                       help='list services that share the same password')
+
+    return parser
+
+
+def handle_breach_index_command(args: argparse.Namespace) -> int:
+    '''
+    Handle `passgen breach-index`: convert SHA-1 lists into the sorted breach file.
+    '''
+    try:
+        count = breach.build_breach_index(args.sources, args.output, args.prefix_bytes)
+    except (OSError, ValueError) as error:
+        err_console.print(f'❌ [red]Could not build breach file:[/red] {error}')
+        return 2
+
+    logger.log_event(f'Built breach file entries={count} path={args.output}', level='INFO')
+    err_console.print(f'✅ Wrote {count:,} breached password hashes to {args.output}', style='green')
+    return 0
+
+
+def _read_import_file(path: Path) -> List[Dict[str, Any]]:
+    '''
+    Read the records to import: CSV (with a header row), a JSON list or JSON Lines.
+
+    :raises ValueError: If a .json file does not contain a list.
+    '''
+    suffix = path.suffix.lower()
+
+    if suffix == '.csv':
+        with path.open('r', encoding='utf-8', newline='') as f:
+            return list(csv.DictReader(f))
+
+    if suffix == '.json':
+        try:
+            # parsed item by item, the file text is never held in memory at once.
+            return list(iter_json_array(path))
+        except ValueError as exc:
+            raise ValueError(f'{path} does not contain a JSON list of records.') from exc
+
+    return list(iter_jsonl_file(path))
+
+
+def handle_import_command(args: argparse.Namespace) -> int:
+    '''
+    Handle `passgen import`: validate, hash (in parallel) and save a whole file of records.
+    '''
+    try:
+        records = _read_import_file(args.source)
+
+        with Progress(console=err_console, transient=True) as progress:
+            task = progress.add_task('Hashing passwords', total=len(records))
+            count = storage.add_passwords(
+                records, workers=args.workers,
+                progress=lambda done, total: progress.update(task, completed=done),
+                reject_breached=args.reject_breached,
+            )
+    except (OSError, ValueError) as error:
+        err_console.print(f'❌ [red]Import failed, nothing was saved:[/red] {error}')
+        return 2
+
+    logger.log_event(f'Imported passwords count={count} source={args.source}', level='INFO')
+    err_console.print(f'✅ Imported {count:,} passwords from {args.source}', style='green')
+    return 0
+
+
+def handle_audit_command(args: argparse.Namespace) -> int:
+    '''
+    Handle `passgen audit`: report reused passwords (never the passwords themselves).
+
+    Returns 1 if a problem was found, so the command can be used in scripts.
+    '''
+    if not args.reuse:
+        err_console.print('Nothing to audit, choose a check such as --reuse.', style='yellow')
+        return 2
+
+    groups = storage.find_reused_passwords()
+    logger.log_event(f'Audit for reused passwords groups={len(groups)}', level='INFO')
+
+    if not groups:
+        console.print('✅ No reused passwords found.', style='green')
+        return 0
+
+    table = Table(title='Reused passwords', show_lines=True)
+    table.add_column('#', justify='right')
+    table.add_column('Services (username)')
+
+    for number, records in enumerate(groups, start=1):
+        accounts = '\n'.join(
+            f"{record.get('service', '?')} ({record.get('username', '?')})" for record in records
+        )
+        table.add_row(str(number), accounts)
+
+    console.print(table)
+    console.print(f'⚠️  {len(groups)} password(s) are used for more than one account.', style='yellow')
+    return 1
+
+
+def handle_passphrase_command(args: argparse.Namespace) -> int:
+    '''
+    Handle `passgen passphrase`: print one passphrase per line.
+    '''
+    try:
+        index = passphrase.open_wordlist(args.wordlist)
+        phrases = [
+            passphrase.generate_passphrase(args.words, args.separator, index, args.capitalize)
+            for _ in range(args.count)
+        ]
+    except FileNotFoundError:
+        err_console.print(
+            f'❌ [red]No compiled wordlist at {args.wordlist}.[/red] '
+            'Create one with: passgen wordlist path/to/words.txt'
+        )
+        return 2
+    except ValueError as error:
+        err_console.print(f'❌ [red]Error while generating passphrase:[/red] {error}')
+        return 2
+
+    print('\n'.join(phrases))
+    logger.log_event(f'Generated passphrases count={args.count} words={args.words}', level='INFO')
+
+    bits = index.bits_per_word * args.words
+    err_console.print(f'{len(index):,} words in list, ~{bits:.1f} bits of entropy per passphrase', style='dim')
+    return 0
+
+
+def handle_wordlist_command(args: argparse.Namespace) -> int:
+    '''
+    Handle `passgen wordlist`: compile a plain text wordlist into the binary index.
+    '''
+    try:
+        count = passphrase.compile_wordlist(args.source, args.output)
+    except (OSError, ValueError) as error:
+        err_console.print(f'❌ [red]Could not compile wordlist:[/red] {error}')
+        return 2
+
+    logger.log_event(f'Compiled wordlist words={count} path={args.output}', level='INFO')
+    err_console.print(f'✅ Compiled {count:,} words into {args.output}', style='green')
+    return 0
+
+
+def handle_calibrate_command(args: argparse.Namespace) -> int:
+    '''
+    Handle `passgen calibrate`: pick and store KDF parameters for this host.
+    '''
+    try:
+        params = kdf.calibrate_kdf(args.algorithm, args.target_ms)
+    except ValueError as error:
+        err_console.print(f'❌ [red]Calibration failed:[/red] {error}')
+        return 2
+
+    shown = kdf.get_kdf(args.algorithm).format_params(params)
+    logger.log_event(f'Calibrated KDF algorithm={args.algorithm} params={shown}', level='INFO')
+    err_console.print(
+        f'✅ {args.algorithm} parameters {shown} (~{args.target_ms:g} ms per hash) '
+        f'saved to {config.KDF_PARAMS_FILE}',
+        style='green',
+    )
+    return 0
+
+
+def handle_generate_command(args: argparse.Namespace) -> int:
+    '''
+    Handle `passgen generate`: stream passwords without any prompts.
+
+    Returns the process exit code (0 on success).
+    '''
+    if not config.MIN_LENGTH <= args.length <= config.MAX_LENGTH:
+        err_console.print(
+            f'❌ [red]Length must be between {config.MIN_LENGTH} and {config.MAX_LENGTH}.[/red]'
+        )
+        return 2
+
+    if args.reject_breached and not config.BREACH_FILE.exists():
+        err_console.print(
+            f'❌ [red]No breach file at {config.BREACH_FILE}, build it with `passgen breach-index`.[/red]'
+        )
+        return 2
+
+    try:
+        stats = streaming.stream_passwords(
+            count=args.count,
+            length=args.length,
+            level=args.level,
+            output=args.output,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            ordered=not args.unordered,
+            require_all_classes=args.all_classes,
+            with_strength=args.with_strength,
+            unique=args.unique,
+            unique_error_rate=args.unique_error_rate,
+            unique_max_memory=args.unique_max_memory * 1024 * 1024,
+            reject_breached=args.reject_breached,
+        )
+    except ValueError as error:
+        err_console.print(f'❌ [red]Error while generating passwords:[/red] {error}')
+        logger.log_event(f'Error streaming passwords: {error}', level='ERROR')
+        return 2
+    except BrokenPipeError:
+        # the reader went away (e.g. `passgen generate -n 1000000 | head`).
+        # point stdout at devnull so Python does not complain again at exit.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+
+    logger.log_event(
+        f'Streamed passwords count={stats.count} length={args.length} '
+        f'difficulty={args.level!r} elapsed={stats.elapsed:.3f}s',
+        level='INFO',
+    )
+
+    if not args.quiet:
+        target = args.output if args.output is not None else 'stdout'
+        err_console.print(
+            f'✅ {stats.count:,} passwords written to {target} '
+            f'in {stats.elapsed:.2f} s ({stats.rate:,.0f} passwords/s)',
+            style='green',
+        )
+
+    return 0
+
+
+def run_app(argv: Optional[List[str]] = None) -> None:
+    '''
+    Application entry point.
+    - With a sub-command (e.g. `passgen generate --count 1000`) it runs non-interactively
+    - Without arguments it starts the interactive menu
+    '''
+    args = build_arg_parser().parse_args(argv)
+
+    commands = {
+        'generate': handle_generate_command,
+        'passphrase': handle_passphrase_command,
+        'wordlist': handle_wordlist_command,
+        'calibrate': handle_calibrate_command,
+        'audit': handle_audit_command,
+        'import': handle_import_command,
+        'breach-index': handle_breach_index_command,
+    }
+
+    if args.command in commands:
+        exit_code = commands[args.command](args)
+        if exit_code:
+            sys.exit(exit_code)
+        return
+
+    run_menu()
+
+
+def run_menu() -> None:
     '''
     Main application loop.
     - Shows the header once
     - Repeats the menu until the user chooses to exit
     '''
     print_header()      # show the title when the program starts
+
+    # hash records that were left pending when the program last stopped.
+    try:
+        recovered = storage.recover_pending_hashes()
+    except Exception as exc:
+        logger.log_event(f'Error while recovering pending hashes: {exc!r}', level='ERROR')
+    else:
+        if recovered:
+            logger.log_event(f'Recovered pending password hashes count={recovered}', level='INFO')
     
     while True:     #infinite loop until we break out of it
         print_menu()    # shows the menu options
@@ -0,0 +1,341 @@
+# src/passgen/markov.py
+
+"""
+Pronounceable passwords for PassGen, based on a character-level Markov chain.
+
+Responsibility:
+- Compile a list of training words into a compact transition table file
+- Load the shipped table lazily, the first time a pronounceable password is needed
+- Generate pronounceable passwords and report their exact entropy
+- Count exactly how many different passwords the model can produce
+
+Model:
+    The next letter depends on the two letters before it (an order-2 chain).
+    A context is a pair of symbols, where symbol 0 ("^") means "start of
+    password" and symbols 1-26 are the letters a-z, so there are 27 * 27
+    contexts with 26 possible next letters each.
+
+    Every row of the table is quantized to exactly 2**16 units. A letter is
+    picked by drawing 16 random bits and binary-searching the row of
+    cumulative starts - no rejection sampling, no floating point. Because we
+    sample exactly from the quantized table, the entropy of a password is
+    exact as well:
+
+        entropy = sum over all letters of  16 - log2(width of the chosen cell)
+
+    This is the surprisal of the password under the model, i.e. how many
+    bits an attacker who knows the model has to guess on average for
+    passwords of this probability.
+
+Binary format (all integers little-endian):
+    header   magic b'PGMK', version (uint16), order (uint8), letters (uint8)
+    letters  the alphabet, one ASCII byte per letter
+    starts   contexts x letters uint32, cumulative start of each cell in its row
+             (a start can be 2**16 itself when the last letters of a row are
+             impossible, so 16 bits are not enough)
+
+Demonstrates:
+- Precomputing a model at build time so nothing is trained at runtime
+- array.array for compact, typed storage without extra dependencies
+- Cumulative-distribution sampling with bisect
+"""
+
+
+import math
+import os
+import string
+import struct
+import threading
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import MARKOV_MODEL_FILE
+from .password_generator import get_entropy_pool
+
+
+_MAGIC = b'PGMK'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHBB')   # magic, version, order, number of letters
+
+_ORDER = 2
+_LETTERS = string.ascii_lowercase
+_SYMBOLS = len(_LETTERS) + 1        # the letters plus the start symbol "^"
+_CONTEXTS = _SYMBOLS ** _ORDER
+_ROW_BITS = 16
+_ROW_TOTAL = 1 << _ROW_BITS         # every row sums to exactly 2**16
+_START = struct.Struct('<I')
+
+
+class MarkovModel:
+    '''
+    Read-only order-2 transition table.
+
+    Usage:
+        model = load_model()
+        password, bits = model.generate(12)
+    '''
+
+    def __init__(self, letters: str, starts: array) -> None:
+        self.letters = letters
+        self._starts = starts
+        self._width = len(letters)
+
+        # surprisal (in bits) of every cell, computed once at load time.
+        # cells with zero width are never chosen, so their value does not matter.
+        # _next lists, per context, the contexts its possible letters lead to.
+        bits: List[float] = []
+        self._next: List[List[int]] = []
+        for row in range(_CONTEXTS):
+            base = row * self._width
+            following: List[int] = []
+            for i in range(self._width):
+                end = starts[base + i + 1] if i + 1 < self._width else _ROW_TOTAL
+                width = end - starts[base + i]
+                bits.append(_ROW_BITS - math.log2(width) if width else 0.0)
+                if width:
+                    following.append((row % _SYMBOLS) * _SYMBOLS + i + 1)
+            self._next.append(following)
+        self._bits = bits
+        self._counts: Dict[int, int] = {}
+        self._counts_lock = threading.Lock()
+
+    def generate_many(self, count: int, length: int) -> List[Tuple[str, float]]:
+        '''
+        Generate `count` pronounceable passwords of `length` letters.
+
+        All random numbers for the batch are read from the entropy pool at
+        once, two bytes per letter.
+
+        :return: List of (password, entropy in bits) tuples.
+        '''
+        needed = count * length
+        draws = array('H', get_entropy_pool().take_bytes(needed * 2))
+
+        starts, cell_bits, letters, width = self._starts, self._bits, self.letters, self._width
+        results: List[Tuple[str, float]] = []
+        position = 0
+
+        for _ in range(count):
+            context = 0
+            entropy = 0.0
+            chars: List[str] = []
+
+            for _ in range(length):
+                base = context * width
+                # the chosen cell is the last one whose start is <= the draw.
+                index = bisect_right(starts, draws[position], base, base + width) - 1
+                position += 1
+
+                entropy += cell_bits[index]
+                cell = index - base
+                chars.append(letters[cell])
+                context = (context % _SYMBOLS) * _SYMBOLS + cell + 1
+
+            results.append((''.join(chars), entropy))
+
+        return results
+
+    def generate(self, length: int) -> Tuple[str, float]:
+        '''
+        Generate one pronounceable password and its entropy in bits.
+        '''
+        return self.generate_many(1, length)[0]
+
+    def count_passwords(self, length: int) -> int:
+        '''
+        Exact number of different passwords of `length` letters the model can produce.
+
+        Only cells with a nonzero width are ever chosen, so this is the
+        number of paths of `length` steps through those transitions,
+        counted per context (dynamic programming, exact integers). It is
+        usually far below 26 ** length.
+        '''
+        with self._counts_lock:
+            total = self._counts.get(length)
+            if total is None:
+                # ways[context] = number of prefixes that end in this context.
+                ways = {0: 1}
+                for _ in range(length):
+                    following: Dict[int, int] = {}
+                    for context, paths in ways.items():
+                        for target in self._next[context]:
+                            following[target] = following.get(target, 0) + paths
+                    ways = following
+                total = self._counts[length] = sum(ways.values())
+            return total
+
+    def entropy(self, password: str) -> Optional[float]:
+        '''
+        Return the entropy (surprisal) of a password under this model.
+
+        :return: Entropy in bits, or None if the model can never produce the
+                 password (wrong characters or an impossible transition).
+        '''
+        starts, width = self._starts, self._width
+        context = 0
+        total = 0.0
+
+        for ch in password:
+            cell = self.letters.find(ch)
+            if cell < 0:
+                return None
+
+            index = context * width + cell
+            end = starts[index + 1] if cell + 1 < width else _ROW_TOTAL
+            if end == starts[index]:
+                return None
+
+            total += self._bits[index]
+            context = (context % _SYMBOLS) * _SYMBOLS + cell + 1
+
+        return total
+
+
+def _count_transitions(words: Iterable[str]) -> List[List[int]]:
+    '''
+    Count how often every letter follows every context in the training words.
+
+    Only the letters a-z are used; words are lowercased and other characters
+    split a word into separate parts.
+    '''
+    counts = [[0] * len(_LETTERS) for _ in range(_CONTEXTS)]
+
+    for word in words:
+        for part in ''.join(ch if ch in _LETTERS else ' ' for ch in word.lower()).split():
+            context = 0
+            for ch in part:
+                cell = _LETTERS.index(ch)
+                counts[context][cell] += 1
+                context = (context % _SYMBOLS) * _SYMBOLS + cell + 1
+
+    return counts
+
+
+def _quantize_row(row: List[int]) -> List[int]:
+    '''
+    Scale one row of counts so that it sums to exactly 2**16.
+
+    Every letter seen at least once keeps a width of at least 1, so the
+    quantized model can still produce everything the training data contains.
+    Contexts that never occur in the training data (e.g. reached only at the
+    end of a word) fall back to a uniform row.
+    '''
+    total = sum(row)
+    if total == 0:
+        row = [1] * len(row)
+        total = len(row)
+
+    widths = [max(1, count * _ROW_TOTAL // total) if count else 0 for count in row]
+
+    # hand the rounding difference to (or take it from) the most likely letter.
+    largest = max(range(len(widths)), key=widths.__getitem__)
+    widths[largest] += _ROW_TOTAL - sum(widths)
+    return widths
+
+
+def compile_model(words: Iterable[str], target: Path = MARKOV_MODEL_FILE) -> int:
+    '''
+    Train the model on a list of words and write the binary table file.
+
+    This runs at build time (see tools/build_markov_model.py); the package
+    ships the compiled file. The file is written to a temporary name first
+    and then renamed, so readers never see a half-written table.
+
+    :param words: Training words, e.g. a list of common English words.
+    :param target: Path of the compiled model file.
+    :return: Number of contexts that occur in the training data.
+    :raises ValueError: If the training words contain no letters a-z.
+    '''
+    counts = _count_transitions(words)
+    seen = sum(1 for row in counts if any(row))
+    if not seen:
+        raise ValueError('Training words do not contain any letters a-z.')
+
+    starts = array('I')
+    for row in counts:
+        position = 0
+        for width in _quantize_row(row):
+            starts.append(position)
+            position += width
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = target.with_name(target.name + '.tmp')
+
+    with temp_path.open('wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, _ORDER, len(_LETTERS)))
+        f.write(_LETTERS.encode('ascii'))
+        f.write(b''.join(_START.pack(start) for start in starts))
+
+    os.replace(temp_path, target)
+    return seen
+
+
+def _read_model(path: Path) -> MarkovModel:
+    '''
+    Read and validate a compiled model file.
+    '''
+    data = path.read_bytes()
+
+    try:
+        magic, version, order, size = _HEADER.unpack_from(data, 0)
+    except struct.error as exc:
+        raise ValueError(f'{path} is not a compiled Markov model (file too short).') from exc
+
+    if magic != _MAGIC or version != _VERSION or order != _ORDER or size != len(_LETTERS):
+        raise ValueError(f'{path} is not a compiled Markov model (bad header).')
+
+    letters = data[_HEADER.size:_HEADER.size + size].decode('ascii')
+    table = data[_HEADER.size + size:]
+    if letters != _LETTERS or len(table) != _CONTEXTS * size * _START.size:
+        raise ValueError(f'{path} is truncated or corrupt.')
+
+    # struct decodes the little-endian file on every platform; the array
+    # keeps the values as compact machine integers for bisect.
+    starts = array('I', (value for (value,) in _START.iter_unpack(table)))
+
+    return MarkovModel(letters, starts)
+
+
+_MODELS: Dict[Path, MarkovModel] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def load_model(path: Path = MARKOV_MODEL_FILE) -> MarkovModel:
+    '''
+    Return the model stored in `path`, reading the file on first use only.
+
+    :raises FileNotFoundError: If the model file does not exist.
+    :raises ValueError: If the file is not a valid model.
+    '''
+    with _MODELS_LOCK:
+        model = _MODELS.get(path)
+        if model is None:
+            model = _MODELS[path] = _read_model(path)
+        return model
+
+
+def generate_pronounceable(count: int, length: int) -> List[Tuple[str, float]]:
+    '''
+    Generate `count` pronounceable passwords with the shipped model.
+
+    :param count: Number of passwords (must be >= 0).
+    :param length: Number of letters per password (must be > 0).
+    :return: List of (password, entropy in bits) tuples.
+    :raises ValueError: If count or length is invalid.
+    '''
+    if count < 0:
+        raise ValueError('Password count cannot be negative.')
+
+    if length <= 0:
+        raise ValueError('Password lenth must be greater that zero.')
+
+    return load_model().generate_many(count, length)
+
+
+def pronounceable_entropy(password: str) -> Optional[float]:
+    '''
+    Entropy of a password under the shipped model (None if it cannot be produced).
+    '''
+    return load_model().entropy(password)
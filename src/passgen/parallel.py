@@ -0,0 +1,171 @@
+# src/passgen/parallel.py
+
+"""
+Multi-core password generation for PassGen.
+
+Responsibility:
+- Split a large batch into fixed-size chunks
+- Generate the chunks in a pool of worker processes
+- Hand the chunks back in order, or as soon as they are ready (unordered)
+
+Demonstrates:
+- Using concurrent.futures.ProcessPoolExecutor to use several CPU cores
+- A bounded "sliding window" of in-flight tasks, so results never pile up
+  in memory when the consumer (e.g. a file or a pipe) is slower than the workers
+- Every worker draws its own randomness from the operating system CSPRNG,
+  so no random state is ever shared between processes
+"""
+
+
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Deque, Iterator, List, Optional, Set, Union
+
+from .config import PARALLEL_WORKERS, STREAM_CHUNK_SIZE
+from .password_generator import CharsetPolicy, generate_passwords
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    '''
+    Turn a requested worker count into an actual number of processes.
+
+    None means "use config.PARALLEL_WORKERS", 0 means "one worker per CPU core".
+
+    :param workers: Requested number of workers.
+    :return: Number of worker processes to use (always >= 1).
+    :raises ValueError: If workers is negative.
+    '''
+    if workers is None:
+        workers = PARALLEL_WORKERS
+
+    if workers < 0:
+        raise ValueError('Number of workers cannot be negative.')
+
+    if workers == 0:
+        return os.cpu_count() or 1
+
+    return workers
+
+
+def _generate_chunk(
+    size: int,
+    length: int,
+    level: Union[str, CharsetPolicy],
+    require_all_classes: bool,
+) -> List[str]:
+    '''
+    Worker entry point: generate one chunk of passwords.
+
+    Defined at module level so it can be pickled and sent to worker processes.
+    '''
+    return generate_passwords(size, length, level, require_all_classes)
+
+
+def iter_parallel_chunks(
+    count: int,
+    length: int,
+    level: Union[str, CharsetPolicy],
+    workers: Optional[int] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    ordered: bool = True,
+    require_all_classes: bool = False,
+) -> Iterator[List[str]]:
+    '''
+    Generate passwords in worker processes and yield them chunk by chunk.
+
+    At most 2 * workers chunks are in flight at any time, so memory stays
+    bounded even if the consumer is slow.
+
+    :param count: Total number of passwords to produce (must be >= 0).
+    :param length: Length of each password (must be > 0).
+    :param level: Difficulty level ("1"-"4") or a CharsetPolicy.
+    :param workers: Number of worker processes (None = config default, 0 = one per CPU core).
+    :param chunk_size: Number of passwords per chunk (must be > 0).
+    :param ordered: True to yield chunks in submission order,
+                    False to yield each chunk as soon as it is done.
+    :param require_all_classes: Include at least one character of each class.
+    :raises ValueError: If any of the arguments is invalid.
+    '''
+    if count < 0:
+        raise ValueError('Password count cannot be negative.')
+
+    if chunk_size <= 0:
+        raise ValueError('Chunk size must be greater than zero.')
+
+    # validate length and level up front, in this process, instead of
+    # getting the error back from a worker.
+    generate_passwords(0, length, level)
+    if require_all_classes:
+        generate_passwords(1, length, level, require_all_classes)
+
+    worker_count = resolve_workers(workers)
+    max_in_flight = worker_count * 2
+
+    # sizes of all chunks, e.g. count=25, chunk_size=10 -> 10, 10, 5
+    sizes = (min(chunk_size, count - start) for start in range(0, count, chunk_size))
+
+    with ProcessPoolExecutor(max_workers=worker_count) as executor:
+
+        def submit_next() -> Optional[Future]:
+            size = next(sizes, None)
+            if size is None:
+                return None
+            return executor.submit(_generate_chunk, size, length, level, require_all_classes)
+
+        if ordered:
+            pending: Deque[Future] = deque()
+
+            # fill the window, then replace every finished chunk with a new one.
+            for _ in range(max_in_flight):
+                future = submit_next()
+                if future is None:
+                    break
+                pending.append(future)
+
+            while pending:
+                chunk = pending.popleft().result()
+                future = submit_next()
+                if future is not None:
+                    pending.append(future)
+                yield chunk
+
+        else:
+            running: Set[Future] = set()
+
+            for _ in range(max_in_flight):
+                future = submit_next()
+                if future is None:
+                    break
+                running.add(future)
+
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for finished in done:
+                    future = submit_next()
+                    if future is not None:
+                        running.add(future)
+                    yield finished.result()
+
+
+def generate_passwords_parallel(
+    count: int,
+    length: int,
+    level: Union[str, CharsetPolicy],
+    workers: Optional[int] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    ordered: bool = True,
+    require_all_classes: bool = False,
+) -> List[str]:
+    '''
+    Generate `count` passwords using several processes and return them as one list.
+
+    See iter_parallel_chunks() for the meaning of the arguments.
+    '''
+    passwords: List[str] = []
+    chunks = iter_parallel_chunks(
+        count, length, level, workers, chunk_size, ordered, require_all_classes,
+    )
+    for chunk in chunks:
+        passwords.extend(chunk)
+    return passwords
@@ -0,0 +1,212 @@
+# src/passgen/passphrase.py
+
+"""
+Diceware-style passphrase generation for PassGen.
+
+Responsibility:
+- Compile a plain text wordlist into a compact, offset-indexed binary file
+- Open the compiled file with mmap and look up the n-th word in O(1)
+- Generate passphrases such as "correct-horse-battery-staple"
+
+Binary format (all integers little-endian):
+    header   magic b'PGWL', version (uint16), reserved (uint16), word count (uint32)
+    offsets  (count + 1) x uint32, start of each word inside the word data
+    words    UTF-8 encoded words, back to back, no separators
+
+Demonstrates:
+- Memory-mapped files: only the pages that are actually touched are read,
+  so startup time and memory use do not grow with the size of the wordlist
+- Fixed-width offset tables for constant-time random access
+- Using struct for simple, portable binary formats
+"""
+
+
+import math
+import mmap
+import os
+import struct
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+from .config import DEFAULT_PASSPHRASE_WORDS, WORDLIST_FILE
+from .password_generator import get_entropy_pool
+
+
+_MAGIC = b'PGWL'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHHI')   # magic, version, reserved, count
+_OFFSET = struct.Struct('<I')
+_OFFSET_PAIR = struct.Struct('<II')
+
+
+def _read_words(source: Path) -> List[str]:
+    '''
+    Read words from a plain text wordlist.
+
+    - One word per line; empty lines and lines starting with "#" are skipped.
+    - Diceware lists ("11111<TAB>abacus") are supported: the last column is used.
+    - Duplicates are removed, otherwise some words would be more likely than others.
+    '''
+    words = {}
+    with source.open('r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            words[line.split()[-1]] = None
+
+    return list(words)
+
+
+def compile_wordlist(source: Path, target: Path = WORDLIST_FILE) -> int:
+    '''
+    Compile a plain text wordlist into the binary, mmap-able index format.
+
+    The file is written to a temporary name first and then renamed,
+    so readers never see a half-written index.
+
+    :param source: Path to the plain text wordlist.
+    :param target: Path of the compiled index file.
+    :return: Number of words in the compiled index.
+    :raises ValueError: If the wordlist is empty or too large for the format.
+    '''
+    words = _read_words(source)
+    if not words:
+        raise ValueError(f'Wordlist {source} does not contain any words.')
+
+    encoded = [word.encode('utf-8') for word in words]
+
+    offsets = [0]
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+
+    if offsets[-1] > 0xFFFFFFFF:
+        raise ValueError('Wordlist is too large (word data must be below 4 GiB).')
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = target.with_name(target.name + '.tmp')
+
+    with temp_path.open('wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, 0, len(encoded)))
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        f.write(b''.join(encoded))
+
+    os.replace(temp_path, target)
+    return len(encoded)
+
+
+class WordlistIndex:
+    '''
+    Read-only, memory-mapped view of a compiled wordlist.
+
+    Looking up a word reads two offsets and one slice of the mapping;
+    the wordlist is never loaded into memory as a whole.
+
+    Usage:
+        with WordlistIndex(path) as words:
+            print(len(words), words[0])
+    '''
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+        with path.open('rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, _, count = _HEADER.unpack_from(self._mmap, 0)
+        except struct.error as exc:
+            self._mmap.close()
+            raise ValueError(f'{path} is not a compiled wordlist (file too short).') from exc
+
+        if magic != _MAGIC or version != _VERSION:
+            self._mmap.close()
+            raise ValueError(f'{path} is not a compiled wordlist (bad header).')
+
+        self._count = count
+        self._offsets_start = _HEADER.size
+        self._words_start = _HEADER.size + (count + 1) * _OFFSET.size
+
+        # the last offset tells us how much word data there must be.
+        data_size = _OFFSET.unpack_from(self._mmap, self._offsets_start + count * _OFFSET.size)[0]
+        if self._words_start + data_size != len(self._mmap):
+            self._mmap.close()
+            raise ValueError(f'{path} is truncated or corrupt.')
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('Word index out of range.')
+
+        start, end = _OFFSET_PAIR.unpack_from(self._mmap, self._offsets_start + index * _OFFSET.size)
+        return self._mmap[self._words_start + start:self._words_start + end].decode('utf-8')
+
+    @property
+    def bits_per_word(self) -> float:
+        '''
+        Entropy contributed by one uniformly chosen word, in bits.
+        '''
+        return math.log2(self._count) if self._count else 0.0
+
+    def random_word(self) -> str:
+        '''
+        Return one uniformly chosen word.
+        '''
+        return self[get_entropy_pool().randbelow(self._count)]
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> 'WordlistIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+@lru_cache(maxsize=8)
+def open_wordlist(path: Path = WORDLIST_FILE) -> WordlistIndex:
+    '''
+    Open (and keep open) a compiled wordlist.
+
+    The mapping is cached per path, so repeated passphrase generation does
+    not reopen the file.
+
+    :raises FileNotFoundError: If the index has not been compiled yet.
+    '''
+    return WordlistIndex(path)
+
+
+def generate_passphrase(
+    words: int = DEFAULT_PASSPHRASE_WORDS,
+    separator: str = '-',
+    wordlist: Optional[WordlistIndex] = None,
+    capitalize: bool = False,
+) -> str:
+    '''
+    Generate a passphrase of randomly chosen words.
+
+    :param words: Number of words (must be > 0, default: config.DEFAULT_PASSPHRASE_WORDS).
+    :param separator: String placed between the words.
+    :param wordlist: Compiled wordlist to use (default: config.WORDLIST_FILE).
+    :param capitalize: Capitalize the first letter of every word.
+    :return: The passphrase, e.g. "orbit-velvet-canal-mosaic-tundra-quill".
+    :raises ValueError: If words is not positive or the wordlist is empty.
+    '''
+    if words <= 0:
+        raise ValueError('Number of words must be greater than zero.')
+
+    index = wordlist if wordlist is not None else open_wordlist()
+    if len(index) == 0:
+        raise ValueError('Wordlist is empty.')
+
+    chosen = [index.random_word() for _ in range(words)]
+    if capitalize:
+        chosen = [word[:1].upper() + word[1:] for word in chosen]
+
+    return separator.join(chosen)
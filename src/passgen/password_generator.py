@@ -4,100 +4,733 @@
 Password generation logic for PassGen.
 
 Responsibility:
-- Define difficulty levels (easy/medium/hard)
-- Build character sets based on difficulty
+- Define difficulty levels (easy/medium/hard/pronounceable)
+- Build character sets based on difficulty, compiled once into CharsetPolicy objects
 - Generate random passwords using letters, digits and special characters
+- Generate large batches of passwords from a single pull of random bytes
 
 Demonstrates:
 - Separation of business logic from CLI and storage concerns
-- Use of Python's `random` and `string` modules
+- Use of a cryptographically secure random source (`os.urandom`) and the `string` module
+- A buffered, thread- and fork-safe entropy pool to avoid one system call per password
+- Unbiased rejection sampling when mapping random bytes to characters
+- Constructive, uniformly distributed "at least one of each class" passwords
+- Optionally rejecting passwords that appear in a breached-password corpus
 - Defensive programming with basic input validation and ValueError
 """
 
 
-import random       # used to randomly choose characters for the password
+import os           # os.urandom gives us cryptographically secure random bytes
 import string       # provides ready-made sets of characters (letters, digits, etc.)
+import threading    # the shared entropy pool is protected by a lock
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from functools import lru_cache
+from math import comb
+from typing import Dict, Iterator, List, Tuple, Union
+
+from .bloom import BloomFilter     # remembers generated passwords in unique mode
+from .breach import BreachIndex, resolve_breach_index
+from .config import ENTROPY_POOL_SIZE
 
 
 class Difficulty:
     '''
     Simple container for our difficulty levels.
-    We will use string values "1", "2", "3" to match the menu choices later.
+    We will use string values "1", "2", "3", "4" to match the menu choices later.
     '''
     
     EASY = '1'
     MEDIUM = '2'
     HARD = '3'
-    
+    PRONOUNCEABLE = '4'     # lowercase letters picked by a Markov chain (see markov.py)
+
+
+# we define our set of special characters.
+# you can adjust this list if you want more or fewer symbols.
+SPECIAL_CHARS: str = '!@#$%^&*()-_=+[]{};:,.?/'
+
+# characters that are easy to mix up when a password is read or typed by hand.
+AMBIGUOUS_CHARS: str = 'Il1|O0o'
+
+
+@dataclass(frozen=True)
+class CharsetPolicy:
+    '''
+    Compiled, immutable description of the characters a password may use.
+
+    Everything the generator needs is computed once when the policy is
+    compiled, so generating passwords does no per-call charset work:
+    - alphabet:  the allowed characters, in a fixed order
+    - table:     256-byte translation table, byte value b -> alphabet[b % n]
+    - rejected:  byte values >= threshold, deleted to avoid modulo bias
+    - threshold: largest multiple of len(alphabet) that fits in a byte
+    - groups:    the alphabet split into character classes
+                 (lowercase, uppercase, digits, symbols), used when every
+                 class must appear at least once
+
+    Policies are hashable and compare equal when name and alphabet match.
+    Create them with compile_policy() or custom_policy(), not directly.
+    '''
+
+    name: str
+    alphabet: str
+    table: bytes = field(repr=False, compare=False)
+    rejected: bytes = field(repr=False, compare=False)
+    threshold: int = field(repr=False, compare=False)
+    groups: Tuple[str, ...] = field(repr=False, compare=False, default=())
+
+    @property
+    def size(self) -> int:
+        '''
+        Number of distinct characters in the alphabet.
+        '''
+        return len(self.alphabet)
+
+
+def _split_into_groups(alphabet: str) -> Tuple[str, ...]:
+    '''
+    Split an alphabet into its non-empty character classes.
+
+    Order: lowercase letters, uppercase letters, digits, everything else (symbols).
+    '''
+    lower = ''.join(ch for ch in alphabet if ch in string.ascii_lowercase)
+    upper = ''.join(ch for ch in alphabet if ch in string.ascii_uppercase)
+    digits = ''.join(ch for ch in alphabet if ch in string.digits)
+    symbols = ''.join(ch for ch in alphabet if ch not in lower + upper + digits)
+
+    return tuple(group for group in (lower, upper, digits, symbols) if group)
+
+
+@lru_cache(maxsize=128)
+def compile_policy(alphabet: str, name: str = 'custom') -> CharsetPolicy:
+    '''
+    Compile an alphabet into a CharsetPolicy.
+
+    Duplicate characters are dropped (keeping the first occurrence) so that
+    no character is more likely than another. Results are cached, so compiling
+    the same alphabet twice returns the same object.
+
+    :param alphabet: String with the allowed characters (ASCII only).
+    :param name: Human readable name of the policy.
+    :return: The compiled policy.
+    :raises ValueError: If the alphabet is empty, too large or not ASCII.
+    '''
+    # dict.fromkeys() keeps insertion order and removes duplicates.
+    unique = ''.join(dict.fromkeys(alphabet))
+    size = len(unique)
+
+    if size == 0 or size > 256:
+        raise ValueError(f'Character set must contain 1-256 characters, got {size}.')
+
+    if not unique.isascii():
+        raise ValueError('Character set must only contain ASCII characters.')
+
+    encoded = unique.encode('ascii')
+    threshold = 256 - (256 % size)
+
+    return CharsetPolicy(
+        name=name,
+        alphabet=unique,
+        table=bytes(encoded[value % size] for value in range(256)),
+        rejected=bytes(range(threshold, 256)),
+        threshold=threshold,
+        groups=_split_into_groups(unique),
+    )
+
+
+# the built-in policies are compiled once, when the module is imported.
+_LETTERS_AND_DIGITS = string.ascii_lowercase + string.ascii_uppercase + string.digits
+
+_POLICIES: Dict[str, CharsetPolicy] = {
+    # Easy: letters (lower + upper) and digits only
+    Difficulty.EASY: compile_policy(_LETTERS_AND_DIGITS, 'easy'),
+    # Medium: letters + digits + some special characters (first part of the list)
+    Difficulty.MEDIUM: compile_policy(_LETTERS_AND_DIGITS + SPECIAL_CHARS[:10], 'medium'),
+    # Hard: letters + digits + all defined special characters
+    Difficulty.HARD: compile_policy(_LETTERS_AND_DIGITS + SPECIAL_CHARS, 'hard'),
+    # Pronounceable: lowercase letters; the generator uses the Markov model instead of
+    # drawing every letter uniformly, so this policy only describes the alphabet.
+    Difficulty.PRONOUNCEABLE: compile_policy(string.ascii_lowercase, 'pronounceable'),
+}
+
+
+def get_policy(level: Union[str, CharsetPolicy]) -> CharsetPolicy:
+    '''
+    Return the compiled policy for a difficulty level.
+
+    A CharsetPolicy passed in is returned unchanged, so every generation
+    function accepts either a level string or a custom policy.
+
+    :param level: One of "1", "2", "3", "4" (EASY, MEDIUM, HARD, PRONOUNCEABLE)
+                  or a CharsetPolicy.
+    :return: The matching CharsetPolicy.
+    :raises ValueError: If the difficulty level is invalid.
+    '''
+    if isinstance(level, CharsetPolicy):
+        return level
+
+    try:
+        return _POLICIES[level]
+    except (KeyError, TypeError):
+        # if the caller passes something unexpected, we raise an error.
+        # this will help us catch bugs early.
+        raise ValueError(f'Invailid difficulty level: {level!r}') from None
+
+
+def custom_policy(
+    level: Union[str, CharsetPolicy] = Difficulty.HARD,
+    exclude_ambiguous: bool = False,
+    extra_symbols: str = '',
+    exclude: str = '',
+) -> CharsetPolicy:
+    '''
+    Build a policy based on a difficulty level, with adjustments.
+
+    Example:
+        custom_policy(Difficulty.MEDIUM, exclude_ambiguous=True, extra_symbols='~')
+
+    :param level: Base difficulty level (or policy) to start from.
+    :param exclude_ambiguous: Remove look-alike characters such as "l", "1", "O", "0".
+    :param extra_symbols: Additional characters to allow.
+    :param exclude: Characters that should never be used.
+    :return: A compiled (and cached) CharsetPolicy.
+    :raises ValueError: If the level is invalid or no characters are left.
+    '''
+    base = get_policy(level)
+
+    removed = set(exclude)
+    if exclude_ambiguous:
+        removed.update(AMBIGUOUS_CHARS)
+
+    alphabet = ''.join(ch for ch in base.alphabet + extra_symbols if ch not in removed)
+    return compile_policy(alphabet, f'{base.name}-custom')
+
 
 def get_charset_by_difficulty(level: str) -> str:
     '''
     Return a string containing all allowed characters
     for the given difficulty.
     
-    :param level: One of "1", "2", "3" (EASY, MEDIUM, HARD)
+    :param level: One of "1", "2", "3", "4" (EASY, MEDIUM, HARD, PRONOUNCEABLE)
     :return: A string with all characters that may be used.
     :raises ValueError: If the difficulty level is invalid.
     '''
-    
-    # basic character groups from the string module
-    lower = string.ascii_lowercase  # "abcdefghijklmnopqrstuvwxyz"
-    upper = string.ascii_uppercase  # "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    digits = string.digits          # "0123456789"
-    
-    # we define our set of special characters.
-    # you can adjust this list if you want more or fewer symbols.
-    specials = '!@#$%^&*()-_=+[]{};:,.?/'
-    
-    if level == Difficulty.EASY:
-        # Easy: letters (lower + upper) and digits only
-        return lower + upper + digits
-    
-    elif level == Difficulty.MEDIUM:
-        # Medium: letters + digits + some special characters (first part of the list)
-        return lower + upper + digits + specials[:10]
-    
-    elif level == Difficulty.HARD:
-        # Hard: letters + digits + all defined special characters
-        return lower + upper + digits + specials
-    
-    else:
-        # if the caller passes something unexpected, we raise an error.
-        # this will help us catch bugs early.
-        raise ValueError(f'Invailid difficulty level: {level!r}')
-    
-    
-def generate_password(length: int, level: str) -> str:
+    return get_policy(level).alphabet
+
+
+class EntropyPool:
     '''
-    Generate a random password with the given length and difficulty level.
-    
-    :param lenth: Desired lenth of the password (must be > 0).
-    :param level: Difficulty level ("1", "2" or "3").
-    :return: The generated password as a string.
-    :raised ValueError: If lenth is invalid or the character set is empty.
+    Thread-safe, buffered source of cryptographically secure random bytes.
+
+    os.urandom() is a system call. Calling it for every password (or every
+    character) costs far more than the random bytes themselves, so the pool
+    reads a large block (64 KiB by default) at once and hands out slices of
+    it through a memoryview cursor - no bytes are copied until a caller asks
+    for them. Requests larger than the block bypass the buffer and go
+    straight to os.urandom().
+
+    Fork safety: a child process must never hand out the same bytes as its
+    parent. The buffer is thrown away in the child right after a fork
+    (os.register_at_fork), and as a second line of defense whenever the
+    process id changes.
+
+    Counters (see stats()):
+    - refills:        number of blocks read into the buffer
+    - direct_reads:   large requests that bypassed the buffer
+    - bytes_consumed: total number of random bytes handed out
     '''
-    
+
+    def __init__(self, block_size: int = ENTROPY_POOL_SIZE) -> None:
+        if block_size <= 0:
+            raise ValueError('Entropy pool block size must be greater than zero.')
+
+        self.block_size = block_size
+        self._reset()
+
+    def _reset(self) -> None:
+        '''
+        Forget the buffer and all counters (also used in a freshly forked child).
+        '''
+        self._lock = threading.Lock()
+        self._buffer = memoryview(b'')
+        self._position = 0
+        self._pid = os.getpid()
+
+        self.refills = 0
+        self.direct_reads = 0
+        self.bytes_consumed = 0
+
+    def take(self, size: int) -> memoryview:
+        '''
+        Return `size` random bytes as a read-only memoryview (no copy).
+
+        Every byte is handed out exactly once.
+        '''
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+
+            self.bytes_consumed += size
+
+            if size > self.block_size:
+                self.direct_reads += 1
+                return memoryview(os.urandom(size))
+
+            if self._position + size > len(self._buffer):
+                self._buffer = memoryview(os.urandom(self.block_size))
+                self._position = 0
+                self.refills += 1
+
+            start = self._position
+            self._position += size
+            return self._buffer[start:self._position]
+
+    def take_bytes(self, size: int) -> bytes:
+        '''
+        Return `size` random bytes as a bytes object.
+        '''
+        return self.take(size).tobytes()
+
+    def randbelow(self, bound: int) -> int:
+        '''
+        Return a uniformly distributed random integer in the range [0, bound).
+
+        Uses rejection sampling on the bit length of the bound, so the result
+        is exactly uniform (no modulo bias) and at least half of all draws
+        are accepted.
+        '''
+        if bound <= 1:
+            return 0
+
+        bits = (bound - 1).bit_length()
+        size = (bits + 7) // 8
+        surplus = size * 8 - bits
+
+        while True:
+            value = int.from_bytes(self.take(size), 'big') >> surplus
+            if value < bound:
+                return value
+
+    def stats(self) -> Dict[str, int]:
+        '''
+        Return a snapshot of the pool counters.
+        '''
+        with self._lock:
+            return {
+                'refills': self.refills,
+                'direct_reads': self.direct_reads,
+                'bytes_consumed': self.bytes_consumed,
+                'block_size': self.block_size,
+            }
+
+
+# the shared pool used by all generation functions in PassGen.
+_ENTROPY_POOL = EntropyPool()
+
+if hasattr(os, 'register_at_fork'):
+    # not available on Windows, where child processes never inherit memory anyway.
+    os.register_at_fork(after_in_child=_ENTROPY_POOL._reset)
+
+
+def get_entropy_pool() -> EntropyPool:
+    '''
+    Return the process-wide EntropyPool (e.g. to read its counters).
+    '''
+    return _ENTROPY_POOL
+
+
+def _random_chars(policy: CharsetPolicy, needed: int) -> str:
+    '''
+    Return `needed` uniformly random characters from the policy alphabet.
+
+    Random bytes come from the shared EntropyPool. bytes.translate() maps
+    every byte to a character and deletes the rejected bytes in one C-level
+    pass, so there is no Python work per character.
+    '''
+    table, rejected, threshold = policy.table, policy.rejected, policy.threshold
+    pool = _ENTROPY_POOL
+
+    chunks: List[bytes] = []
+    collected = 0
+
+    while collected < needed:
+        missing = needed - collected
+
+        # ask for a little more than the expected amount so that one round
+        # is almost always enough, even after rejected bytes are removed.
+        request = (missing * 256) // threshold + missing // 32 + 16
+        accepted = pool.take_bytes(request).translate(table, rejected)
+
+        chunks.append(accepted)
+        collected += len(accepted)
+
+    return b''.join(chunks)[:needed].decode('ascii')
+
+
+@lru_cache(maxsize=64)
+def _class_count_tables(
+    sizes: Tuple[int, ...],
+    length: int,
+) -> Tuple[int, Tuple[Tuple[Tuple[int, ...], ...], ...], Tuple[Tuple[Tuple[int, ...], ...], ...]]:
+    '''
+    Precompute how to pick "how many characters of each class" exactly.
+
+    totals[j][r] is the number of strings of length r that use only the
+    classes j, j+1, ... and contain every one of them at least once:
+
+        totals[j][r] = sum over m >= 1 of  factor(r, m) * totals[j+1][r-m]
+        factor(r, m) = C(r, m) * size_j ** m
+
+    cumulative[j][r] holds the running sums of that formula for m = 1, 2, ...
+    and factors[j][r] the factor for every m. Python integers never
+    overflow, so all weights are exact.
+
+    :param sizes: Number of characters in each class.
+    :param length: Password length.
+    :return: Tuple of (number of valid passwords, cumulative weights, factors).
+    '''
+    k = len(sizes)
+
+    # totals[k] describes "no classes left": only the empty string is valid.
+    totals: List[List[int]] = [[0] * (length + 1) for _ in range(k + 1)]
+    totals[k][0] = 1
+    cumulative: List[List[Tuple[int, ...]]] = [[()] * (length + 1) for _ in range(k)]
+    factors: List[List[Tuple[int, ...]]] = [[()] * (length + 1) for _ in range(k)]
+
+    for j in range(k - 1, -1, -1):
+        for r in range(length + 1):
+            running = 0
+            steps = []
+            step_factors = []
+            for m in range(1, r + 1):
+                factor = comb(r, m) * sizes[j] ** m
+                running += factor * totals[j + 1][r - m]
+                steps.append(running)
+                step_factors.append(factor)
+            totals[j][r] = running
+            cumulative[j][r] = tuple(steps)
+            factors[j][r] = tuple(step_factors)
+
+    return (
+        totals[0][length],
+        tuple(tuple(row) for row in cumulative),
+        tuple(tuple(row) for row in factors),
+    )
+
+
+def _shuffle_draws(count: int, length: int) -> Iterator[int]:
+    '''
+    Yield the swap positions of `count` Fisher-Yates shuffles of `length` items.
+
+    For every shuffle, one position in [0, i) for i = length, ..., 2. The
+    random numbers are 16-bit values cut from large blocks of the entropy
+    pool; a value is only skipped in the rare case that it falls into the
+    incomplete last multiple of i (at most i / 65536 of all values), so
+    every position is exactly uniform.
+    '''
+    bounds = range(length, 1, -1)
+    limits = [65536 - 65536 % i for i in bounds]
+    draws = array('H')
+    position = 0
+
+    for _ in range(count):
+        for i, limit in zip(bounds, limits):
+            while True:
+                if position == len(draws):
+                    # enough for the rest of the batch, plus a little for skipped values.
+                    draws = array('H', _ENTROPY_POOL.take_bytes(2 * (count * length + 16)))
+                    position = 0
+                value = draws[position]
+                position += 1
+                if value < limit:
+                    break
+            yield value % i
+
+
+# the constructive generator is only used while fewer random passwords are valid.
+_REJECTION_MIN_ACCEPTANCE = 0.5
+
+
+def _filter_all_classes(count: int, length: int, policy: CharsetPolicy, acceptance: float) -> List[str]:
+    '''
+    Generate random passwords in batches and keep those that contain every class.
+
+    Only used when most random passwords are valid anyway (acceptance is
+    the fraction of valid ones, at least _REJECTION_MIN_ACCEPTANCE): then a
+    batch-wide filter is cheaper than building every password by hand.
+    The kept passwords are independent uniform draws that happen to be
+    valid, so they are uniformly distributed over the valid passwords.
+    '''
+    classes = [frozenset(group) for group in policy.groups]
+    passwords: List[str] = []
+
+    while len(passwords) < count:
+        missing = count - len(passwords)
+        # a few more than expected, so that one batch is almost always enough.
+        size = int(missing / acceptance) + missing // 16 + 4
+        for pwd in _generate_batch(size, length, policy, False):
+            if all(not group.isdisjoint(pwd) for group in classes):
+                passwords.append(pwd)
+
+    return passwords[:count]
+
+
+def _generate_with_all_classes(count: int, length: int, policy: CharsetPolicy) -> List[str]:
+    '''
+    Generate passwords that contain every character class of the policy.
+
+    When at least half of all random passwords are valid (long passwords),
+    random batches are simply filtered (see _filter_all_classes()).
+    Otherwise a constructive algorithm is used, no regenerate-until-valid loop:
+    1) pick how many characters each class gets, weighted by how many
+       valid passwords have that split (see _class_count_tables())
+    2) draw that many random characters from each class
+    3) shuffle the characters with a Fisher-Yates shuffle
+
+    Every valid password is exactly equally likely - the same distribution
+    as "generate and throw away invalid passwords", without the waste.
+
+    Step 1 reads the class counts of a password from one random number
+    below the number of valid passwords: it is bisected into the cumulative
+    class weights; the offset inside the chosen bucket, divided by the
+    bucket factor, is again uniform and is used for the next class.
+    Step 3 uses small random numbers drawn in bulk (see _shuffle_draws()).
+    '''
+    groups = policy.groups
+    k = len(groups)
+
+    if length < k:
+        raise ValueError(
+            f'Password length must be at least {k} to include every character class.'
+        )
+
+    group_policies = [compile_policy(group, f'{policy.name}-class') for group in groups]
+    valid, cumulative, factors = _class_count_tables(tuple(len(group) for group in groups), length)
+
+    acceptance = valid / policy.size ** length
+    if acceptance >= _REJECTION_MIN_ACCEPTANCE:
+        return _filter_all_classes(count, length, policy, acceptance)
+
+    randbelow = _ENTROPY_POOL.randbelow
+
+    # 1) class counts for every password in the batch.
+    splits: List[List[int]] = []
+    class_totals = [0] * k
+
+    for _ in range(count):
+        code = randbelow(valid)
+        remaining = length
+        split = []
+
+        for j in range(k - 1):
+            steps = cumulative[j][remaining]
+            index = bisect_right(steps, code)
+            if index:
+                code -= steps[index - 1]
+            code //= factors[j][remaining][index]
+
+            m = index + 1
+            split.append(m)
+            class_totals[j] += m
+            remaining -= m
+
+        # the last class simply gets all remaining positions.
+        split.append(remaining)
+        class_totals[k - 1] += remaining
+        splits.append(split)
+
+    # 2) all characters of one class for the whole batch, in one draw.
+    pools = [_random_chars(group_policies[j], class_totals[j]) for j in range(k)]
+    offsets = [0] * k
+
+    # 3) assemble and shuffle every password.
+    swaps = _shuffle_draws(count, length)
+    passwords: List[str] = []
+    for split in splits:
+        chars: List[str] = []
+        for j, m in enumerate(split):
+            start = offsets[j]
+            chars.extend(pools[j][start:start + m])
+            offsets[j] = start + m
+
+        for i in range(length - 1, 0, -1):
+            swap = next(swaps)
+            chars[i], chars[swap] = chars[swap], chars[i]
+
+        passwords.append(''.join(chars))
+
+    return passwords
+
+
+def count_possible_passwords(
+    length: int,
+    level: Union[str, CharsetPolicy],
+    require_all_classes: bool = False,
+) -> int:
+    '''
+    Return how many different passwords a level/length combination allows.
+
+    For the pronounceable level this is the number of strings the Markov
+    model can actually produce (see MarkovModel.count_passwords()), far
+    fewer than every lowercase string.
+
+    :param length: Password length (must be > 0).
+    :param level: Difficulty level ("1"-"4") or a CharsetPolicy.
+    :param require_all_classes: Only count passwords that contain every class.
+    :return: Number of possible passwords (an exact integer).
+    '''
+    policy = get_policy(level)
+
+    if policy == _POLICIES[Difficulty.PRONOUNCEABLE]:
+        # imported here because markov itself uses the entropy pool of this module.
+        from .markov import load_model
+        return load_model().count_passwords(length)
+
+    if not require_all_classes:
+        return policy.size ** length
+
+    if length < len(policy.groups):
+        return 0
+
+    return _class_count_tables(tuple(len(group) for group in policy.groups), length)[0]
+
+
+def _generate_batch(
+    count: int,
+    length: int,
+    policy: CharsetPolicy,
+    require_all_classes: bool,
+) -> List[str]:
+    '''
+    Generate `count` passwords (duplicates possible) for an already resolved policy.
+    '''
+    if policy == _POLICIES[Difficulty.PRONOUNCEABLE]:
+        # imported here because markov itself uses the entropy pool of this module.
+        from .markov import generate_pronounceable
+        return [pwd for pwd, _ in generate_pronounceable(count, length)]
+
+    if require_all_classes:
+        return _generate_with_all_classes(count, length, policy)
+
+    # one long string of characters, cut into passwords of equal length.
+    needed = count * length
+    characters = _random_chars(policy, needed)
+    return [characters[start:start + length] for start in range(0, needed, length)]
+
+
+# how many rounds of redraws in a row may add no new (unique, not breached) password.
+_MAX_STALLED_ROUNDS = 100
+
+
+def generate_passwords(
+    count: int,
+    length: int,
+    level: Union[str, CharsetPolicy],
+    require_all_classes: bool = False,
+    unique: Union[bool, BloomFilter] = False,
+    reject_breached: Union[bool, BreachIndex] = False,
+) -> List[str]:
+    '''
+    Generate many random passwords with the same length and difficulty level.
+
+    The randomness for the whole batch is drawn at once (see _random_chars()).
+
+    :param count: Number of passwords to generate (must be >= 0).
+    :param length: Desired length of each password (must be > 0).
+    :param level: Difficulty level ("1"-"4") or a CharsetPolicy.
+    :param require_all_classes: If True, every password contains at least one
+                                character of each class in the charset
+                                (lowercase, uppercase, digits, symbols).
+    :param unique: True to guarantee that the batch contains no duplicates.
+                   Pass a BloomFilter instead to stay unique across several
+                   calls (e.g. chunks of one streaming run), or to choose
+                   its error rate and memory limit.
+    :param reject_breached: True to replace every password found in the breach
+                            file (config.BREACH_FILE), or a BreachIndex to use.
+    :return: A list with `count` generated passwords.
+    :raises ValueError: If count, length or the difficulty level is invalid,
+                        the length is too short to include every class, or
+                        more unique passwords are requested than the level allows
+                        (or the generator stops producing new or unbreached ones).
+    :raises FileNotFoundError: If reject_breached is True and no breach file exists.
+    '''
+    if count < 0:
+        raise ValueError('Password count cannot be negative.')
+
     if length <= 0:
         # a password with zero or negativ lenth doesn´t make sense.
         raise ValueError('Password lenth must be greater that zero.')
+
+    # the policy already holds the byte -> character table.
+    policy = get_policy(level)
+
+    breached = resolve_breach_index(reject_breached)
+
+    if not unique and breached is None:
+        return _generate_batch(count, length, policy, require_all_classes)
+
+    if count == 0:
+        return []
+
+    seen = None
+    if unique:
+        seen = unique if isinstance(unique, BloomFilter) else BloomFilter(count)
+
+        # close to the limit almost every draw is a duplicate, so we stop at half.
+        possible = count_possible_passwords(length, policy, require_all_classes)
+        if seen.count + count > possible // 2:
+            raise ValueError(
+                f'Cannot generate {count:,} more unique passwords: only {possible:,} '
+                f'are possible with this length and level.'
+            )
+
+    passwords: List[str] = []
+    stalled = 0
+    while len(passwords) < count:
+        before = len(passwords)
+        # draw replacements for everything that was breached or "probably seen".
+        for pwd in _generate_batch(count - len(passwords), length, policy, require_all_classes):
+            if breached is not None and pwd in breached:
+                continue
+            if seen is None or seen.add(pwd):
+                passwords.append(pwd)
+
+        # a generator that keeps repeating itself (e.g. a skewed Markov model
+        # close to its limit, or a tiny level whose passwords are all breached)
+        # must fail instead of spinning forever.
+        stalled = stalled + 1 if len(passwords) == before else 0
+        if stalled >= _MAX_STALLED_ROUNDS:
+            wanted = ' and '.join(
+                word for word, active in (('unique', seen is not None), ('unbreached', breached is not None)) if active
+            )
+            raise ValueError(
+                f'No new {wanted} passwords were generated in {_MAX_STALLED_ROUNDS} attempts, '
+                'choose a longer length or a harder level.'
+            )
+
+    return passwords
+
+
+def generate_password(
+    length: int,
+    level: Union[str, CharsetPolicy],
+    require_all_classes: bool = False,
+    reject_breached: Union[bool, BreachIndex] = False,
+) -> str:
+    '''
+    Generate a random password with the given length and difficulty level.
     
-    # get the allowed characters based on the difficulty level.
-    charset = get_charset_by_difficulty(level)
-    
-    if not charset:
-        # just a safety check - this should normally never happen.
-        raise ValueError('Character set is empty. Cannot generate password.')
-    
-    # build the password by randomly picking one character at a time.
-    password_chars = []     # we collect characters in a list first (efficient)
-    
-    
-    for _ in range(length):
-        # random.choice picks a single random character from the charset string.
-        random_char = random.choice(charset)
-        password_chars.append(random_char)
-        
-        
-    # join the list of characters into a single string.
-    password = ''.join(password_chars)
-    return password
\ No newline at end of file
+    :param lenth: Desired lenth of the password (must be > 0).
+    :param level: Difficulty level ("1"-"4") or a CharsetPolicy.
+    :param require_all_classes: Include at least one character of each class.
+    :param reject_breached: True to never return a password from the breach
+                            file (config.BREACH_FILE), or a BreachIndex to use.
+    :return: The generated password as a string.
+    :raised ValueError: If lenth is invalid or the character set is empty,
+                        or only breached passwords could be generated.
+    :raises FileNotFoundError: If reject_breached is True and no breach file exists.
+    '''
+    # a single password is simply a batch of one.
+    return generate_passwords(1, length, level, require_all_classes, reject_breached=reject_breached)[0]
@@ -7,106 +7,300 @@ Demonstrates common security practices and concepts:
 - Input validation (used together with utilities in the CLI)
 - Safe path handling via pathlib (reduces path traversal risks)
 - Avoiding command injection (no user input is executed as shell commands)
-- Password hashing with salt using PBKDF2-HMAC-SHA256
+- Password hashing with salt using PBKDF2-HMAC-SHA256 or scrypt (see kdf.py)
 - Safe data handling (no plain passwords in logs, optional masking in UI)
 
 Responsibility:
 - Create salted, hashed representations of passwords for storage
 - Verify plain text passwords against stored hashes
 - Provide masking helpers to avoid showing full passwords in the CLI
+- Hash many passwords at once on several CPU cores (e.g. when importing a vault)
+- Check candidate passwords against many stored hashes at once (audits)
+- Cache parsed hash records, so repeated verification of the same account is cheap
+- Detect hashes with outdated parameters and report them for rehashing
+- Compute keyed fingerprints of passwords, to find reused passwords quickly
 """
 
 
 import base64
 import hashlib
 import hmac
+import os
 import secrets
-from typing import Tuple
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
+from .config import FINGERPRINT_KEY_FILE, HASH_CACHE_SIZE, HASH_WORKERS
+from .kdf import KdfBackend, Params, get_kdf, get_kdf_params
+from .parallel import resolve_workers
 
-def _pbkdf2_sha256(password: str, salt: bytes, iterations: int) -> bytes:
+
+def _hash_with(password: str, algorithm: str, params: Params) -> str:
     '''
-    Derive a cryptographic key from a password using PBKDF2-HMAC-SHA256.
+    Hash a password with an explicit algorithm and parameters.
 
     Args:
         password: The plain text password.
-        salt: Random salt bytes.
-        iterations: Number of PBKDF2 iterations.
+        algorithm: Name of a registered KDF (see kdf.available_kdfs()).
+        params: Cost parameters of that KDF.
 
     Returns:
-        Derived key bytes.
+        The stored hash string.
     '''
-    return hashlib.pbkdf2_hmac(
-        'sha256',
-        password.encode('utf-8'),
-        salt,
-        iterations
-    )
+    backend = get_kdf(algorithm)
+
+    # generate a random 16-byte salt.
+    salt = secrets.token_bytes(16)
+
+    # derive the key with the chosen KDF.
+    dk = backend.derive(password.encode('utf-8'), salt, params)
+
+    # encode salt and hash to base64 so they can be stored as text.
+    salt_b64 = base64.b64encode(salt).decode('ascii')
+    hash_b64 = base64.b64encode(dk).decode('ascii')
+
+    return f'{algorithm}${backend.format_params(params)}${salt_b64}${hash_b64}'
 
 
-def hash_password(password: str, iterations: int = 100_000) -> str:
+def _resolve_kdf(iterations: Optional[int], algorithm: Optional[str]) -> Tuple[str, Params]:
+    '''
+    Pick the algorithm and parameters for new hashes.
+
+    An explicit iteration count always means PBKDF2 with exactly that count,
+    otherwise the calibrated parameters of this host are used (see kdf.py).
+    '''
+    if iterations is not None:
+        if algorithm not in (None, 'pbkdf2_sha256'):
+            raise ValueError('iterations can only be used with pbkdf2_sha256.')
+        return 'pbkdf2_sha256', get_kdf('pbkdf2_sha256').parse_params(str(iterations))
+
+    return get_kdf_params(algorithm)
+
+
+def hash_password(
+    password: str,
+    iterations: Optional[int] = None,
+    algorithm: Optional[str] = None,
+) -> str:
     '''
     Create a salted, hashed representation of a password.
 
     The format is:
-        pbkdf2_sha256$iterations$salt_b64$hash_b64
+        algorithm$params$salt_b64$hash_b64
+    e.g.
+        pbkdf2_sha256$600000$salt_b64$hash_b64
+        scrypt$32768,8,1$salt_b64$hash_b64
 
     This is similar in spirit to how many web frameworks store password hashes.
 
     Args:
         password: The plain text password to hash.
-        iterations: Number of PBKDF2 iterations (default: 100_000).
+        iterations: Number of PBKDF2 iterations. By default the cost is
+                    calibrated once per host to config.KDF_TARGET_MS.
+        algorithm: KDF to use (default: config.KDF_ALGORITHM).
 
     Returns:
-        A single string containing algorithm, iterations, salt and hash.
+        A single string containing algorithm, parameters, salt and hash.
+
+    Raises:
+        ValueError: If the algorithm is unknown or the iteration count invalid.
     '''
-    # generate a random 16-byte salt.
-    salt = secrets.token_bytes(16)
-    
-    # derive the key using PBKDF2-HMAC-SHA256.
-    dk = _pbkdf2_sha256(password, salt, iterations)
-    
-    # encode salt and hash to base64 so they can be stored as text.
-    salt_b64 = base64.b64encode(salt).decode('ascii')
-    hash_b64 = base64.b64encode(dk).decode('ascii')
-    
-    return f'pbkdf2_sha256${iterations}${salt_b64}${hash_b64}'
+    algorithm, params = _resolve_kdf(iterations, algorithm)
+    return _hash_with(password, algorithm, params)
+
+
+def _hash_one(item: Tuple[str, str, Params]) -> str:
+    '''
+    Worker entry point for hash_passwords(): hash one (password, algorithm, params) item.
+
+    Defined at module level so it can be pickled and sent to worker processes.
+    '''
+    return _hash_with(*item)
+
+
+def hash_passwords(
+    passwords: Iterable[str],
+    iterations: Optional[int] = None,
+    workers: Optional[int] = None,
+    use_processes: bool = False,
+    algorithm: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> List[str]:
+    '''
+    Hash many passwords in parallel.
+
+    hashlib.pbkdf2_hmac() and hashlib.scrypt() release the GIL while they
+    work, so a thread pool already keeps every CPU core busy;
+    use_processes=True switches to a process pool for Python builds where
+    that is not the case. Every password still gets its own random salt,
+    and the results use the same format as hash_password().
+
+    Args:
+        passwords: The plain text passwords to hash.
+        iterations: Number of PBKDF2 iterations per password (default: calibrated).
+        workers: Number of threads/processes (None = config.HASH_WORKERS,
+                 0 = one per CPU core, 1 = hash in the calling thread).
+        use_processes: Use a process pool instead of a thread pool.
+        algorithm: KDF to use (default: config.KDF_ALGORITHM).
+        progress: Called as progress(done, total) after every finished hash
+                  (in input order), e.g. to show a progress bar.
 
+    Returns:
+        One hash string per password, in the same order as the input.
 
-def _parse_stored_hash(stored: str) -> Tuple[int, bytes, bytes]:
+    Raises:
+        ValueError: If workers is negative or the algorithm is unknown.
+    '''
+    worker_count = resolve_workers(HASH_WORKERS if workers is None else workers)
+
+    # resolve (and calibrate, if needed) once, before any work is sent to workers.
+    algorithm, params = _resolve_kdf(iterations, algorithm)
+    items = [(password, algorithm, params) for password in passwords]
+
+    total = len(items)
+
+    def collect(results: Iterable[str]) -> List[str]:
+        if progress is None:
+            return list(results)
+        hashes: List[str] = []
+        for stored in results:
+            hashes.append(stored)
+            progress(len(hashes), total)
+        return hashes
+
+    if worker_count == 1 or total <= 1:
+        return collect(_hash_one(item) for item in items)
+
+    executor: Executor
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers=worker_count)
+        # send several passwords per task, so pickling overhead stays small.
+        chunksize = max(1, len(items) // (worker_count * 4))
+    else:
+        executor = ThreadPoolExecutor(max_workers=worker_count)
+        chunksize = 1
+
+    # Executor.map() returns the results in input order.
+    with executor:
+        return collect(executor.map(_hash_one, items, chunksize=chunksize))
+
+
+def _parse_stored_hash(stored: str) -> Tuple[str, Params, bytes, bytes]:
     '''
     Parse a stored hash string into its components.
 
     Expected format:
-        pbkdf2_sha256$iterations$salt_b64$hash_b64
+        algorithm$params$salt_b64$hash_b64
+
+    The algorithm must be registered in the KDF registry (see kdf.py).
 
     Args:
         stored: The stored hash string.
 
     Returns:
-        Tuple of (iterations, salt_bytes, hash_bytes).
+        Tuple of (algorithm, params, salt_bytes, hash_bytes).
 
     Raises:
-        ValueError: If the format is invalid.
+        ValueError: If the format is invalid or the algorithm is unsupported.
     '''
     try:
-        algorithm, iter_str, salt_b64, hash_b64 = stored.split('$', 3)
+        algorithm, params_str, salt_b64, hash_b64 = stored.split('$', 3)
     except ValueError as exc:
         raise ValueError('Invalid stored hash format.') from exc
     
-    if algorithm != 'pbkdf2_sha256':
-        raise ValueError(f'Unsupported algorithm: {algorithm}')
-    
-    iterations = int(iter_str)
+    params = get_kdf(algorithm).parse_params(params_str)
     salt = base64.b64decode(salt_b64)
     stored_hash = base64.b64decode(hash_b64)
     
-    return iterations, salt, stored_hash
+    return algorithm, params, salt, stored_hash
+
+
+# bounded LRU cache in front of _parse_stored_hash(), keyed by the stored string.
+# only the parsed components (algorithm, params, salt, expected hash) are cached -
+# never a key derived from a password, so the cache cannot skip any KDF work.
+# invalid strings raise and are therefore never cached.
+_parse_stored_hash_cached = lru_cache(maxsize=HASH_CACHE_SIZE)(_parse_stored_hash)
+
+
+def hash_cache_info() -> Dict[str, Optional[int]]:
+    '''
+    Return statistics of the parsed-hash cache used by verify_password().
+
+    Returns:
+        Dict with hits, misses, size (current entries) and maxsize.
+    '''
+    info = _parse_stored_hash_cached.cache_info()
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'maxsize': info.maxsize,
+    }
+
+
+def clear_hash_cache() -> None:
+    '''
+    Empty the parsed-hash cache and reset its statistics.
+    '''
+    _parse_stored_hash_cached.cache_clear()
+
+
+# called as callback(password, stored_hash) after a successful verify_password()
+# of a hash with outdated parameters (see set_rehash_callback()).
+_rehash_callback: Optional[Callable[[str, str], None]] = None
+
+
+def set_rehash_callback(callback: Optional[Callable[[str, str], None]]) -> None:
+    '''
+    Register a function that is told about outdated hashes.
+
+    After verify_password() has confirmed a password, the plain text is
+    available, so this is the only moment an old hash can be upgraded. The
+    callback should only queue the work (e.g. storage's rehash worker), since
+    it runs inside verify_password().
+
+    Args:
+        callback: Function called with (password, stored_hash), or None to disable.
+    '''
+    global _rehash_callback
+    _rehash_callback = callback
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    '''
+    Check whether a stored hash uses weaker settings than new hashes would.
+
+    A hash is outdated if it uses a different algorithm than
+    config.KDF_ALGORITHM, or a lower cost than the calibrated parameters.
+    Hashes that are stronger than the current settings are left alone.
+
+    Args:
+        stored_hash: The stored hash string.
+
+    Returns:
+        True if the hash should be recomputed, False otherwise (also for
+        hashes that cannot be parsed, they cannot be verified anyway).
+    '''
+    try:
+        algorithm, params, _, _ = _parse_stored_hash_cached(stored_hash)
+    except ValueError:
+        return False
+
+    current_algorithm, current_params = get_kdf_params()
+    if algorithm != current_algorithm:
+        return True
+
+    backend = get_kdf(algorithm)
+    return backend.cost(params) < backend.cost(current_params)
 
 
 def verify_password(password: str, stored_hash: str) -> bool:
     '''
-    Verify a plain text password against a stored PBKDF2 hash.
+    Verify a plain text password against a stored hash (any registered KDF).
 
     Args:
         password: The plain text password to verify.
@@ -116,16 +310,199 @@ def verify_password(password: str, stored_hash: str) -> bool:
         True if the password matches the hash, False otherwise.
     '''
     try:
-        iterations, salt, expected_hash = _parse_stored_hash(stored_hash)
+        algorithm, params, salt, expected_hash = _parse_stored_hash_cached(stored_hash)
     except ValueError:
         # if the stored format is invalid, we treat it as non-matching.
         return False
     
-    # derive a new hash using the same parameters.
-    candidate_hash = _pbkdf2_sha256(password, salt, iterations)
+    # derive a new hash using the same algorithm and parameters.
+    candidate_hash = get_kdf(algorithm).derive(password.encode('utf-8'), salt, params)
     
     # use hmac.compare_digest to avoid timing attacks.
-    return hmac.compare_digest(candidate_hash, expected_hash)
+    matches = hmac.compare_digest(candidate_hash, expected_hash)
+
+    callback = _rehash_callback
+    if matches and callback is not None and needs_rehash(stored_hash):
+        callback(password, stored_hash)
+
+    return matches
+
+
+# number of stored hashes checked by one verify_many() task.
+_VERIFY_CHUNK_SIZE = 32
+
+
+@dataclass(frozen=True)
+class HashMatch:
+    '''
+    A candidate password that matches a stored hash (see verify_many()).
+    '''
+
+    candidate: int      # index into the candidate passwords
+    stored: int         # index into the stored hashes
+
+
+def _verify_chunk(
+    candidate: int,
+    password: bytes,
+    backend: KdfBackend,
+    params: Params,
+    entries: List[Tuple[int, bytes, bytes]],
+    stop: threading.Event,
+) -> List[HashMatch]:
+    '''
+    Worker task for verify_many(): check one password against a chunk of
+    hashes that all use the same algorithm and parameters.
+    '''
+    matches: List[HashMatch] = []
+
+    for index, salt, expected in entries:
+        if stop.is_set():
+            break
+
+        candidate_hash = backend.derive(password, salt, params)
+        # every comparison is constant-time, even though we search many hashes.
+        if hmac.compare_digest(candidate_hash, expected):
+            matches.append(HashMatch(candidate, index))
+
+    return matches
+
+
+def verify_many(
+    candidates: Sequence[str],
+    stored_hashes: Sequence[str],
+    workers: Optional[int] = None,
+    stop_on_first: bool = False,
+) -> List[HashMatch]:
+    '''
+    Check every candidate password against every stored hash.
+
+    All hashes are parsed once and grouped by algorithm and parameters
+    (e.g. iteration count); cheaper groups are checked first, so with
+    stop_on_first a match is usually found early. The KDF work runs on a
+    thread pool (the hashlib KDFs release the GIL). Hashes that cannot be
+    parsed never match.
+
+    Args:
+        candidates: Plain text passwords to look for.
+        stored_hashes: Stored hash strings, e.g. every password_hash in the vault.
+        workers: Number of threads (None = config.HASH_WORKERS, 0 = one per CPU core).
+        stop_on_first: Stop as soon as any match is found. Work that is
+                       already running finishes its current hash, so more
+                       than one match may still be returned.
+
+    Returns:
+        The matches, sorted by candidate index and then by stored index.
+
+    Raises:
+        ValueError: If workers is negative.
+    '''
+    worker_count = resolve_workers(HASH_WORKERS if workers is None else workers)
+
+    # parse once: (algorithm, params) -> [(index, salt, expected hash), ...]
+    groups: Dict[Tuple[str, Params], List[Tuple[int, bytes, bytes]]] = {}
+    for index, stored in enumerate(stored_hashes):
+        try:
+            algorithm, params, salt, expected = _parse_stored_hash(stored)
+        except (ValueError, TypeError):
+            continue
+        groups.setdefault((algorithm, params), []).append((index, salt, expected))
+
+    # cheapest groups first.
+    ordered_groups = sorted(groups.items(), key=lambda item: get_kdf(item[0][0]).cost(item[0][1]))
+
+    encoded = [password.encode('utf-8') for password in candidates]
+    stop = threading.Event()
+    matches: List[HashMatch] = []
+
+    tasks = [
+        (candidate, password, get_kdf(algorithm), params, entries[start:start + _VERIFY_CHUNK_SIZE])
+        for (algorithm, params), entries in ordered_groups
+        for start in range(0, len(entries), _VERIFY_CHUNK_SIZE)
+        for candidate, password in enumerate(encoded)
+    ]
+
+    with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        futures: List[Future] = [executor.submit(_verify_chunk, *task, stop) for task in tasks]
+
+        for future in futures:
+            found = future.result()
+            matches.extend(found)
+
+            if found and stop_on_first:
+                stop.set()
+                for pending in futures:
+                    pending.cancel()
+                break
+
+    return sorted(matches, key=lambda match: (match.candidate, match.stored))
+
+
+_fingerprint_keys: Dict[Path, bytes] = {}
+_fingerprint_lock = threading.Lock()
+
+
+def get_fingerprint_key(path: Optional[Path] = None) -> bytes:
+    '''
+    Return the local secret key used for password fingerprints.
+
+    The key (32 random bytes) is created on first use and stored in
+    config.FINGERPRINT_KEY_FILE, readable only by the current user.
+    Without the key, a fingerprint reveals nothing about the password.
+
+    Args:
+        path: Key file to use (default: config.FINGERPRINT_KEY_FILE).
+
+    Returns:
+        The key bytes.
+
+    Raises:
+        ValueError: If the key file exists but does not hold a valid key.
+    '''
+    path = path or FINGERPRINT_KEY_FILE
+
+    with _fingerprint_lock:
+        key = _fingerprint_keys.get(path)
+        if key is not None:
+            return key
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # O_EXCL: never overwrite a key that another process just created.
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            key = path.read_bytes()
+        else:
+            key = secrets.token_bytes(32)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(key)
+
+        if len(key) != 32:
+            raise ValueError(f'Fingerprint key file {path} is corrupt.')
+
+        _fingerprint_keys[path] = key
+        return key
+
+
+def password_fingerprint(password: str, key: Optional[bytes] = None) -> str:
+    '''
+    Compute a keyed fingerprint (HMAC-SHA256) of a password.
+
+    Unlike password hashes, fingerprints have no salt: the same password
+    always gives the same fingerprint, so reused passwords can be found by
+    comparing fingerprints instead of running a KDF for every pair.
+    The secret key keeps them from being brute-forced without access to
+    this machine.
+
+    Args:
+        password: The plain text password.
+        key: Secret key (default: get_fingerprint_key()).
+
+    Returns:
+        Hex encoded fingerprint.
+    '''
+    key = key if key is not None else get_fingerprint_key()
+    return hmac.new(key, password.encode('utf-8'), hashlib.sha256).hexdigest()
 
 
 def mask_password(password: str, visible_chars: int = 3) -> str:
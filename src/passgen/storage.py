@@ -4,72 +4,321 @@
 Password storage and retrieval for PassGen.
 
 Responsibility:
-- Read and write password records to a JSON file
+- Read and write password records through the configured storage backend
+  (a JSON Lines file by default, or SQLite; see backends.py)
+- Migrate the vault of older versions (one JSON array) to the backend, once
 - Store both plain text passwords (for this learning project) and hashed passwords
 - Provide a simple API: add_password() and list_passwords()
+- Import many records at once: add_passwords() hashes in parallel and writes once
+- Save records hashed elsewhere in one write: append_hashed_passwords() (used by aio)
+- Audit the vault: find records whose hash matches a candidate password
+- Upgrade outdated password hashes in the background, in batched writes
+- Optionally save records first and hash them in the background (deferred hashing)
+- Find reused passwords in one pass with keyed fingerprints
+- Look up records by service/username or service prefix through in-memory indexes
+- Stream records one at a time with filters and pagination (iter_passwords())
 
 Demonstrates:
 - Separation between data persistence and application logic
-- JSON-based storage via helper functions in the I/O layer (io.module_io)
+- Storage through a pluggable backend, selected with config.STORAGE_BACKEND
+- Append-only writes: add_password() appends one line (or inserts one row),
+  so saving is O(1) instead of reading and rewriting the whole vault
 - Adding metadata such as timestamps to stored records
 - How to gradually introduce more secure storage (hashing) in a teaching context
+- A background worker thread that batches many small updates into one file write
+- Hash and sorted (bisect) indexes, built lazily and kept up to date incrementally
+- A process-level cache of the parsed vault, validated with the file's inode, size and mtime
+- Generators: iter_passwords() keeps one record in memory, whatever the vault size
 """
 
 
 
+import os
+from bisect import bisect_left, insort
+from itertools import islice
+import queue
+import threading
+import time
+import uuid
 from datetime import datetime                               # used to store a timestamp for each password
-from typing import List, Dict, Any                          # type hints for better readability
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Set, Tuple, Union  # type hints for better readability
 
-from .config import PASSWORD_FILE                           # import the path to our JSON file
-from .io.module_io import read_json_file, write_json_file   # import read/writ JSON
-from .security import hash_password                         # import security
+from .backends import StorageBackend, open_backend         # JSON Lines / SQLite vaults
+from .breach import BreachIndex, resolve_breach_index       # optional breached-password check
+from .config import (                                       # import the path to our vault files and settings
+    PASSWORD_FILE,
+    REHASH_BATCH_DELAY,
+    REHASH_BATCH_SIZE,
+    SQLITE_FILE,
+    STORAGE_BACKEND,
+    STORE_FINGERPRINTS,
+    VAULT_CACHE,
+)
+from .io.module_io import iter_json_array, iter_jsonl_file  # import streaming JSON (Lines) readers
+from .security import (                                     # import security
+    hash_password,
+    hash_passwords,
+    password_fingerprint,
+    set_rehash_callback,
+    verify_many,
+)
+
+
+# password_hash of a record whose hash is still being computed (deferred hashing).
+# it can never be parsed as a hash, so it never verifies.
+PENDING_HASH = '!pending'
+
+# every read-modify-write of the password file holds this lock, so the
+# background rehash worker and add_password() never overwrite each other.
+_FILE_LOCK = threading.RLock()
+
+# stop() methods of the background workers, called when the program exits.
+_exit_hooks: List[Callable[[], None]] = []
+_exit_hooks_lock = threading.Lock()
+_exit_hooks_registered = False
+
+
+def _run_exit_hooks() -> None:
+    with _exit_hooks_lock:
+        hooks = _exit_hooks[:]
+        _exit_hooks.clear()
+    for stop in reversed(hooks):
+        stop()
+
+
+def _stop_at_exit(stop: Callable[[], None]) -> None:
+    '''
+    Call stop() of a background worker when the program exits.
+
+    The workers hash their last batch with security.hash_passwords(), which
+    uses a thread pool, but atexit handlers run after concurrent.futures has
+    shut its pools down. threading's exit hooks run before that (in reverse
+    order of registration, and concurrent.futures registers at import), so
+    the last batch is still hashed in parallel.
+    '''
+    global _exit_hooks_registered
+    with _exit_hooks_lock:
+        if not _exit_hooks_registered:
+            threading._register_atexit(_run_exit_hooks)
+            _exit_hooks_registered = True
+        _exit_hooks.append(stop)
+
+
+def _cancel_stop_at_exit(stop: Callable[[], None]) -> None:
+    '''
+    Undo _stop_at_exit() for a worker that was stopped already.
+    '''
+    with _exit_hooks_lock:
+        if stop in _exit_hooks:
+            _exit_hooks.remove(stop)
+
+
+def get_backend() -> StorageBackend:
+    '''
+    The storage backend of the vault (config.STORAGE_BACKEND).
+
+    :raises ValueError: If the configured backend does not exist.
+    '''
+    path = SQLITE_FILE if STORAGE_BACKEND == 'sqlite' else PASSWORD_FILE
+    backend = open_backend(STORAGE_BACKEND, path)
+    _ensure_migrated(backend)
+    return backend
+
+
+# vaults already checked for older files to migrate.
+_MIGRATION_CHECKED: Set[Tuple[str, Path]] = set()
+
+
+def _legacy_file() -> Path:
+    '''
+    Path of the JSON array file used by older versions (passwords.json).
+    '''
+    return PASSWORD_FILE.with_suffix('.json')
+
+
+def migrate_json_vault(source: Optional[Path] = None) -> int:
+    '''
+    Move the records of an old JSON array file into the vault.
+
+    The records are added after those already in the vault (in a single
+    write), then the source is renamed to "<name>.migrated", so it is
+    imported only once. The file is parsed incrementally, so its text is
+    never held in memory next to the records.
+
+    :param source: JSON array file (default: passwords.json next to PASSWORD_FILE).
+    :return: Number of migrated records (0 if the source does not exist).
+    :raises ValueError: If the source is not a JSON list of records.
+    '''
+    source = source or _legacy_file()
+    if source == PASSWORD_FILE or not source.exists():
+        return 0
+
+    try:
+        records = [record for record in iter_json_array(source) if isinstance(record, dict)]
+    except ValueError as exc:
+        raise ValueError(f'{source} is not a JSON list of password records.') from exc
+
+    with _FILE_LOCK:
+        get_backend().append(records)
+        os.replace(source, source.with_name(source.name + '.migrated'))
+
+    return len(records)
+
+
+def _ensure_migrated(backend: StorageBackend) -> None:
+    '''
+    Fill a new vault once, before it is used for the first time.
+
+    - An old passwords.json (JSON array) is moved into the vault.
+    - A new SQLite vault gets a copy of the records in the JSON Lines file,
+      so switching config.STORAGE_BACKEND keeps the saved passwords (the
+      JSON Lines file is left as it is).
+
+    Only done while the vault does not exist yet, so records are never
+    imported twice (e.g. after a crash before the rename).
+    '''
+    key = (backend.name, backend.path)
+    if key in _MIGRATION_CHECKED:
+        return
+
+    with _FILE_LOCK:
+        if key in _MIGRATION_CHECKED:
+            return
+        # mark first: migrate_json_vault() calls get_backend() again.
+        _MIGRATION_CHECKED.add(key)
+
+        if backend.exists():
+            return
+
+        if backend.path != PASSWORD_FILE and PASSWORD_FILE.exists():
+            backend.append(list(iter_jsonl_file(PASSWORD_FILE)))
+
+        try:
+            migrate_json_vault()
+        except ValueError:
+            # an unreadable old file was treated as empty before, keep it as it is.
+            pass
+
+
+# (backend generation, file signature): changes with every write, by this process or another.
+VaultState = Tuple[int, Any]
+
+
+def _vault_state(backend: StorageBackend) -> VaultState:
+    return backend.generation, backend.signature()
+
+
+class _VaultCache:
+    '''
+    The parsed records of the vault, kept for as long as the vault is unchanged.
+
+    The cache is valid while the backend generation (writes made by this
+    process) and the file signature (inode, size and mtime, which also
+    change when another process writes) are the same as when it was filled.
+    '''
+
+    def __init__(self) -> None:
+        self.backend: Optional[StorageBackend] = None
+        self.state: Optional[VaultState] = None
+        self.records: List[Dict[str, Any]] = []
+        self.hits = 0
+        self.misses = 0
+
+
+_cache = _VaultCache()
 
 
 def _load_raw() -> List[Dict[str, Any]]:
     '''
-    Load the raw list of password records from the JSON file.
+    Load the raw list of password records from the vault.
     
-    Uses the generic read_json_file() helper from the io.module_io module.
+    A vault that does not exist yet is an empty list. The vault is only
+    parsed again when it has changed (see _VaultCache); the caller gets
+    copies of the cached records and may change them freely.
     '''
-    data = read_json_file(PASSWORD_FILE)
-    
-    # if the file was missing or invalid, we treat it as an empty list.
-    if data is None:
-        return []
-    
-    # we expect the data to be a list of dictionaries.
-    if not isinstance(data, list):
-        return []
-    
-    return data
+    backend = get_backend()
+    if not VAULT_CACHE:
+        return list(backend.iter_records())
+
+    with _FILE_LOCK:
+        # read the state before parsing: if the vault changes while we read,
+        # the next call sees a different state and parses it again.
+        state = _vault_state(backend)
+        if _cached_records(backend, state) is None:
+            _cache.misses += 1
+            _cache.backend, _cache.state = backend, state
+            _cache.records = list(backend.iter_records())
+
+        return [dict(record) for record in _cache.records]
+
+
+def _cached_records(backend: StorageBackend, state: VaultState) -> Optional[List[Dict[str, Any]]]:
+    '''
+    The cached records if they are those of the vault in this state (a hit), else None.
+
+    Call with _FILE_LOCK held.
+    '''
+    if _cache.backend is backend and _cache.state == state:
+        _cache.hits += 1
+        return _cache.records
+    return None
+
+
+def invalidate_vault_cache() -> None:
+    '''
+    Forget the cached records and lookup indexes; the next read parses the vault.
+
+    Changes are detected automatically, this is only needed if the vault
+    file was changed in a way its inode, size and mtime do not show.
+    '''
+    global _index
+    with _FILE_LOCK:
+        _cache.backend, _cache.state, _cache.records = None, None, []
+        _index = None
+
+
+def vault_cache_info() -> Dict[str, int]:
+    '''
+    Return statistics of the parsed-vault cache.
+
+    :return: Dict with hits, misses and size (number of cached records).
+    '''
+    with _FILE_LOCK:
+        return {'hits': _cache.hits, 'misses': _cache.misses, 'size': len(_cache.records)}
 
 
 def _save_raw(data: List[Dict[str, Any]]) -> None:
     '''
-    Save the given list of password records back to the JSON file.
-    
-    Delegates JSON writing to the io.module_io helper.
+    Replace the whole vault with the given records.
+
+    Not needed for normal use: new records are appended with
+    _append_records() and hashes are changed with _update_hashes().
     '''
-    write_json_file(PASSWORD_FILE, data)
+    with _FILE_LOCK:
+        get_backend().replace_all(data)
 
 
-def add_password(service: str, username: str, password: str) -> None:
+def _update_hashes(by: str, new_hashes: Dict[str, str], current: Optional[str] = None) -> int:
     '''
-    Add a new password record to the JSON file.
+    Change the password_hash of existing records in one write.
 
-    We store both:
-    - the plain text password (for this learning project / CLI display)
-    - a hashed version of the password (to demonstrate secure storage)
+    See backends.StorageBackend.update_hashes().
+    '''
+    with _FILE_LOCK:
+        backend = get_backend()
+        state = _vault_state(backend)
+        updated = backend.update_hashes(by, new_hashes, current)
+        _sync_index(backend, state, lambda index: index.update_hashes(by, new_hashes, current))
+        return updated
 
-    In a real-world application, you would normally NOT store the plain text
-    password at all, only the hash, or use proper encryption.
+
+def _build_record(service: str, username: str, password: str, password_hash: str) -> Dict[str, Any]:
+    '''
+    Create a new password record (does not write anything).
     '''
-    data = _load_raw()
-    
-    # create a salted hash of the password for improved security.
-    password_hash = hash_password(password)
-    
     record: Dict[str, Any] = {
+        'id': uuid.uuid4().hex,         # stable id, used to find the record again later
         'service': service,
         'username': username,
         'password': password,           # plain text
@@ -77,15 +326,744 @@ def add_password(service: str, username: str, password: str) -> None:
         # store a timestamp when the password was created
         'created_at': datetime.now().isoformat(timespec='seconds'),
     }
-    
-    data.append(record)
-    _save_raw(data)
+
+    if STORE_FINGERPRINTS:
+        # keyed, unsalted: equal passwords get equal fingerprints (see find_reused_passwords()).
+        record['fingerprint'] = password_fingerprint(password)
+
+    return record
+
+
+def _append_records(records: List[Dict[str, Any]]) -> None:
+    '''
+    Append records to the vault with a single write (one transaction).
+
+    The lookup indexes (if built) are updated incrementally.
+    '''
+    with _FILE_LOCK:
+        backend = get_backend()
+        state = _vault_state(backend)
+        backend.append(records)
+        _sync_index(backend, state, lambda index: index.add(records))
+
+
+def append_hashed_passwords(entries: Iterable[Tuple[str, str, str, str]]) -> int:
+    '''
+    Save passwords whose hashes are already computed, with a single write.
+
+    This is the write half of add_passwords(), for callers that hash the
+    passwords themselves (e.g. aio, which hashes in its own worker pool and
+    coalesces concurrent saves into one call). Nothing is validated here.
+
+    :param entries: (service, username, password, password_hash) tuples.
+    :return: Number of records added.
+    '''
+    records = [
+        _build_record(service, username, password, password_hash)
+        for service, username, password, password_hash in entries
+    ]
+    if records:
+        _append_records(records)
+    return len(records)
+
+
+def add_password(
+    service: str,
+    username: str,
+    password: str,
+    defer_hash: bool = False,
+    reject_breached: Union[bool, BreachIndex] = False,
+) -> None:
+    '''
+    Add a new password record to the vault.
+
+    We store both:
+    - the plain text password (for this learning project / CLI display)
+    - a hashed version of the password (to demonstrate secure storage)
+
+    In a real-world application, you would normally NOT store the plain text
+    password at all, only the hash, or use proper encryption.
+
+    :param defer_hash: Write the record right away with password_hash set to
+                       PENDING_HASH and compute the hash in a background
+                       thread (see DeferredHashWorker). Records still pending
+                       after a crash are fixed by recover_pending_hashes().
+    :param reject_breached: True to refuse a password found in the breach file
+                            (config.BREACH_FILE), or a BreachIndex to use.
+    :raises ValueError: If reject_breached is set and the password is breached.
+    :raises FileNotFoundError: If reject_breached is True and no breach file exists.
+    '''
+    breached = resolve_breach_index(reject_breached)
+    if breached is not None and password in breached:
+        raise ValueError(f'The password for {service} appears in the breach corpus, choose another one.')
+
+    if defer_hash:
+        record = _build_record(service, username, password, PENDING_HASH)
+        _append_records([record])
+        _get_deferred_worker().submit(record['id'], password)
+        return
+
+    # create a salted hash of the password for improved security.
+    # (hashing is slow on purpose, so we do it before taking the file lock.)
+    password_hash = hash_password(password)
+
+    _append_records([_build_record(service, username, password, password_hash)])
+
+
+def _validate_new_record(position: int, item: Any, breached: Optional[BreachIndex] = None) -> Tuple[str, str, str]:
+    '''
+    Check one entry of an add_passwords() batch.
+
+    :return: Tuple of (service, username, password).
+    :raises ValueError: If the entry is malformed or its password is in
+                        `breached` (the message names its position).
+    '''
+    if isinstance(item, dict):
+        values = (item.get('service'), item.get('username', ''), item.get('password'))
+    elif isinstance(item, (tuple, list)) and len(item) == 3:
+        values = tuple(item)
+    else:
+        raise ValueError(f'Record {position}: expected a dict or a (service, username, password) tuple.')
+
+    service, username, password = values
+    if not isinstance(service, str) or not service.strip():
+        raise ValueError(f'Record {position}: service must be a non-empty string.')
+    if not isinstance(username, str):
+        raise ValueError(f'Record {position}: username must be a string.')
+    if not isinstance(password, str) or not password:
+        raise ValueError(f'Record {position}: password must be a non-empty string.')
+    if breached is not None and password in breached:
+        raise ValueError(f'Record {position}: password appears in the breach corpus.')
+
+    return service, username, password
+
+
+def add_passwords(
+    records: Iterable[Any],
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    reject_breached: Union[bool, BreachIndex] = False,
+) -> int:
+    '''
+    Add many password records at once, e.g. when importing another vault.
+
+    Compared to calling add_password() in a loop:
+    - the whole batch is validated first, so a bad entry leaves the vault unchanged
+    - the hashes are computed in parallel (see security.hash_passwords())
+    - all records are written in one append (one transaction for SQLite)
+
+    The time is dominated by the password hashes (config.KDF_TARGET_MS each,
+    divided by the number of workers); the write itself takes a fraction of a
+    second even for 100k records.
+
+    :param records: Dicts with service, username and password (like the
+                    records of list_passwords()), or (service, username,
+                    password) tuples.
+    :param workers: Number of hashing threads (None = config.HASH_WORKERS).
+    :param progress: Called as progress(done, total) while hashing.
+    :param reject_breached: True to refuse the batch if a password is found in
+                            the breach file (config.BREACH_FILE), or a BreachIndex.
+    :return: Number of records added.
+    :raises ValueError: If any entry is invalid or breached (nothing is written).
+    :raises FileNotFoundError: If reject_breached is True and no breach file exists.
+    '''
+    breached = resolve_breach_index(reject_breached)
+    entries = [_validate_new_record(position, item, breached) for position, item in enumerate(records)]
+    if not entries:
+        return 0
+
+    password_hashes = hash_passwords((password for _, _, password in entries), workers=workers, progress=progress)
+
+    return append_hashed_passwords(
+        (service, username, password, password_hash)
+        for (service, username, password), password_hash in zip(entries, password_hashes)
+    )
     
     
 def list_passwords() -> List[Dict[str, Any]]:
     '''
     Return the list of all saved password records.
+
+    The vault is streamed record by record, never parsed as one big document.
     
     :return: List of dictionaries with key: service, username, password, created_at.
     '''
-    return _load_raw()
\ No newline at end of file
+    return _load_raw()
+
+
+def iter_passwords(
+    offset: int = 0,
+    limit: Optional[int] = None,
+    where: Union[Dict[str, Any], Callable[[Dict[str, Any]], bool], None] = None,
+) -> Iterator[Dict[str, Any]]:
+    '''
+    Stream the saved password records one at a time, optionally filtered and paged.
+
+    Unlike list_passwords(), the vault is never loaded as a whole: records
+    are parsed one by one as the caller consumes them, so memory use stays
+    the same whatever the size of the vault. If the vault is already cached
+    (and unchanged), the cached records are used instead of reading it again.
+
+    :param offset: Number of matching records to skip.
+    :param limit: Maximum number of records to return (None: all).
+    :param where: Dict of field -> value that must all be equal (exact match;
+                  with the SQLite backend, the filter runs in SQL on the
+                  indexes), or a function record -> bool.
+    :return: Iterator over copies of the matching records, in saved order.
+    :raises ValueError: If offset or limit is negative.
+    '''
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError('Offset and limit must not be negative.')
+
+    backend = get_backend()
+    fields: Dict[str, Any] = {} if where is None or callable(where) else dict(where)
+
+    with _FILE_LOCK:
+        cached = _cached_records(backend, _vault_state(backend)) if VAULT_CACHE else None
+
+    if cached is None:
+        if not callable(where):
+            # the backend applies the field filter and the page itself.
+            return backend.query(fields, offset, limit)
+        records = (record for record in backend.iter_records() if where(record))
+    elif callable(where):
+        records = (record for record in map(dict, cached) if where(record))
+    else:
+        records = (dict(record) for record in cached if all(record.get(k) == v for k, v in fields.items()))
+
+    return islice(records, offset, None if limit is None else offset + limit)
+
+
+def _normalize(value: Any) -> str:
+    '''
+    Index key of a service or username: lookups ignore upper/lower case.
+    '''
+    return value.casefold() if isinstance(value, str) else ''
+
+
+class _RecordIndex:
+    '''
+    In-memory lookup indexes over all records of one vault.
+
+    - by_account: (service, username) -> positions, a hash index for find_password()
+    - by_service: service -> positions, for find_password() without username
+    - prefixes:   sorted (service, position) pairs, binary-searched by find_by_prefix()
+
+    `state` is the vault state (see _vault_state()) the index reflects.
+    Writes made through this module update the index in place; any other
+    write (e.g. a reset from io.file_ops, or another process) makes it
+    stale, and it is rebuilt on the next lookup.
+    '''
+
+    # batches larger than this are merged in with one sort instead of one insort each.
+    _INSORT_LIMIT = 32
+
+    def __init__(self, backend: StorageBackend, state: VaultState) -> None:
+        self.backend = backend
+        self.state = state
+        self.records: List[Dict[str, Any]] = []
+        self.by_account: Dict[Tuple[str, str], List[int]] = {}
+        self.by_service: Dict[str, List[int]] = {}
+        self.prefixes: List[Tuple[str, int]] = []
+
+    def add(self, records: Iterable[Dict[str, Any]]) -> None:
+        '''
+        Index records that were appended to the vault.
+        '''
+        added: List[Tuple[str, int]] = []
+        for record in records:
+            position = len(self.records)
+            self.records.append(record)
+
+            service = _normalize(record.get('service'))
+            self.by_service.setdefault(service, []).append(position)
+            self.by_account.setdefault((service, _normalize(record.get('username'))), []).append(position)
+            added.append((service, position))
+
+        if len(added) <= self._INSORT_LIMIT:
+            for entry in added:
+                insort(self.prefixes, entry)
+        else:
+            # timsort finds the two sorted runs and merges them in linear time.
+            added.sort()
+            self.prefixes.extend(added)
+            self.prefixes.sort()
+
+    def update_hashes(self, by: str, new_hashes: Dict[str, str], current: Optional[str] = None) -> None:
+        '''
+        Apply the same change as backends.StorageBackend.update_hashes().
+        '''
+        for record in self.records:
+            new_hash = new_hashes.get(record.get(by))
+            if new_hash is not None and (current is None or record.get('password_hash') == current):
+                record['password_hash'] = new_hash
+
+    def get(self, positions: Iterable[int]) -> List[Dict[str, Any]]:
+        # copies, so callers cannot change the indexed records by accident.
+        return [dict(self.records[position]) for position in positions]
+
+
+_index: Optional[_RecordIndex] = None
+
+
+def _sync_index(backend: StorageBackend, state: VaultState, apply: Callable[[_RecordIndex], None]) -> None:
+    '''
+    Apply a write to the lookup indexes, if they were up to date before it.
+
+    :param state: Vault state read just before the write.
+    :param apply: Changes the index the same way the write changed the vault.
+    '''
+    index = _index
+    if index is None or index.backend is not backend or backend.generation == state[0]:
+        return
+
+    if index.state == state:
+        apply(index)
+        index.state = _vault_state(backend)
+
+
+def _get_index() -> _RecordIndex:
+    '''
+    The lookup indexes of the vault, built on first use (one pass over the vault).
+    '''
+    global _index
+    backend = get_backend()
+
+    with _FILE_LOCK:
+        index = _index
+        state = _vault_state(backend)
+        if index is None or index.backend is not backend or index.state != state:
+            index = _RecordIndex(backend, state)
+            # _load_raw() returns copies, so the index owns its records.
+            index.add(_load_raw())
+            _index = index
+        return index
+
+
+def find_password(service: str, username: Optional[str] = None) -> List[Dict[str, Any]]:
+    '''
+    Return the saved records of a service (and username), oldest first.
+
+    Service and username are compared without regard to upper/lower case.
+    The first call builds an in-memory index of the vault; after that a
+    lookup is a dictionary access, and add_password() keeps the index up to date.
+
+    :param service: Service name, e.g. "Gmail".
+    :param username: Only records with this username (None = all usernames).
+    :return: List of matching records (copies).
+    '''
+    index = _get_index()
+    service_key = _normalize(service)
+
+    if username is None:
+        positions = index.by_service.get(service_key, [])
+    else:
+        positions = index.by_account.get((service_key, _normalize(username)), [])
+    return index.get(positions)
+
+
+def find_by_prefix(service_prefix: str) -> List[Dict[str, Any]]:
+    '''
+    Return the records whose service starts with the given prefix.
+
+    Uses a binary search in the sorted prefix index, so the cost depends on
+    the number of matches, not on the size of the vault.
+
+    :param service_prefix: Start of the service name (case-insensitive); "" matches all.
+    :return: Matching records (copies), sorted by service, then oldest first.
+    '''
+    index = _get_index()
+    prefix = _normalize(service_prefix)
+    prefixes = index.prefixes
+
+    positions: List[int] = []
+    # (prefix,) sorts before every (service, position) pair that starts with prefix.
+    for i in range(bisect_left(prefixes, (prefix,)), len(prefixes)):
+        service, position = prefixes[i]
+        if not service.startswith(prefix):
+            break
+        positions.append(position)
+
+    return index.get(positions)
+
+
+def audit_passwords(
+    candidates: Iterable[str],
+    workers: Optional[int] = None,
+    stop_on_first: bool = False,
+) -> List[Tuple[str, Dict[str, Any]]]:
+    '''
+    Find saved records whose password_hash matches one of the candidates.
+
+    Only the hashes are checked, so this also works for records that do not
+    keep the plain text password. See security.verify_many().
+
+    :param candidates: Passwords to look for (e.g. known leaked passwords).
+    :param workers: Number of hashing threads (None = config default).
+    :param stop_on_first: Stop after the first match.
+    :return: List of (candidate password, matching record) pairs.
+    '''
+    candidates = list(candidates)
+    records = _load_raw()
+    stored = [record.get('password_hash', '') for record in records]
+
+    matches = verify_many(candidates, stored, workers=workers, stop_on_first=stop_on_first)
+    return [(candidates[match.candidate], records[match.stored]) for match in matches]
+
+
+class RehashWorker:
+    '''
+    Background thread that upgrades outdated password hashes in the vault.
+
+    verify_password() reports every successfully verified hash with outdated
+    parameters (see security.needs_rehash()). The worker collects these for
+    a short moment (REHASH_BATCH_DELAY seconds, or until REHASH_BATCH_SIZE
+    are queued), hashes them all with the current parameters and then
+    rewrites the password file once for the whole batch.
+
+    Counters (see stats()):
+    - pending:  hashes queued but not written yet
+    - migrated: records whose hash was upgraded
+    - skipped:  queued hashes that were no longer in the vault
+    - failed:   queued hashes lost to an error (retried at the next verify)
+    - batches:  number of storage updates, one per batch (at most one file
+                write each), also for batches that had nothing left to
+                migrate or failed
+    '''
+
+    def __init__(self, batch_size: int = REHASH_BATCH_SIZE, delay: float = REHASH_BATCH_DELAY) -> None:
+        self.batch_size = batch_size
+        self.delay = delay
+
+        self._condition = threading.Condition()
+        # old hash -> plain text password; a dict, so a hash is queued only once.
+        self._pending: Dict[str, str] = {}
+        self._in_progress = 0
+        self._stopped = False
+
+        self.migrated = 0
+        self.skipped = 0
+        self.failed = 0
+        self.batches = 0
+
+        self._thread = threading.Thread(target=self._run, name='passgen-rehash', daemon=True)
+        self._thread.start()
+
+    def submit(self, password: str, stored_hash: str) -> None:
+        '''
+        Queue one outdated hash (used as the security rehash callback).
+        '''
+        with self._condition:
+            if self._stopped:
+                return
+            self._pending[stored_hash] = password
+            self._condition.notify_all()
+
+    def _take_batch(self) -> Optional[Dict[str, str]]:
+        with self._condition:
+            while not self._pending and not self._stopped:
+                self._condition.wait()
+
+            if not self._pending:
+                return None
+
+            # give other verifications a moment to join this batch
+            # (submit() wakes us up, so wait until the deadline has passed).
+            deadline = time.monotonic() + self.delay
+            while len(self._pending) < self.batch_size and not self._stopped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            keys = list(self._pending)[:self.batch_size]
+            batch = {key: self._pending.pop(key) for key in keys}
+            self._in_progress = len(batch)
+            return batch
+
+    def _write_batch(self, batch: Dict[str, str]) -> Tuple[int, int]:
+        '''
+        Hash a batch with the current parameters and write it in one go.
+        '''
+        old_hashes = list(batch)
+        new_hashes = dict(zip(old_hashes, hash_passwords(batch[old] for old in old_hashes)))
+
+        migrated = _update_hashes('password_hash', new_hashes)
+        return migrated, len(batch) - migrated
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+
+            failed = 0
+            try:
+                migrated, skipped = self._write_batch(batch)
+            except Exception:
+                # never let the worker die: failed hashes are simply upgraded
+                # the next time the password is verified.
+                migrated, skipped, failed = 0, 0, len(batch)
+
+            with self._condition:
+                self.migrated += migrated
+                self.skipped += skipped
+                self.failed += failed
+                self.batches += 1
+                self._in_progress = 0
+                self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        '''
+        Wait until every queued hash has been written.
+
+        :return: True if the queue is empty, False if the timeout expired.
+        '''
+        with self._condition:
+            self._condition.notify_all()
+            return self._condition.wait_for(
+                lambda: not self._pending and not self._in_progress, timeout,
+            )
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        '''
+        Write what is still queued, then end the worker thread.
+        '''
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        '''
+        Return a snapshot of the migration counters.
+        '''
+        with self._condition:
+            return {
+                'pending': len(self._pending) + self._in_progress,
+                'migrated': self.migrated,
+                'skipped': self.skipped,
+                'failed': self.failed,
+                'batches': self.batches,
+            }
+
+
+_rehash_worker: Optional[RehashWorker] = None
+
+
+def enable_rehash_on_verify() -> RehashWorker:
+    '''
+    Start upgrading outdated hashes whenever verify_password() succeeds.
+
+    Calling it again returns the running worker. Queued upgrades are
+    written before the program exits (see _stop_at_exit()).
+    '''
+    global _rehash_worker
+    if _rehash_worker is None:
+        _rehash_worker = RehashWorker()
+        set_rehash_callback(_rehash_worker.submit)
+        _stop_at_exit(_rehash_worker.stop)
+    return _rehash_worker
+
+
+def disable_rehash_on_verify() -> None:
+    '''
+    Stop the rehash worker (after writing what is still queued).
+    '''
+    global _rehash_worker
+    if _rehash_worker is not None:
+        set_rehash_callback(None)
+        _rehash_worker.stop()
+        _cancel_stop_at_exit(_rehash_worker.stop)
+        _rehash_worker = None
+
+
+def rehash_stats() -> Dict[str, int]:
+    '''
+    Migration counters of the rehash worker (all zero if it is not running).
+    '''
+    if _rehash_worker is None:
+        return {'pending': 0, 'migrated': 0, 'skipped': 0, 'failed': 0, 'batches': 0}
+    return _rehash_worker.stats()
+
+
+def _set_pending_hashes(hashes: Dict[str, str]) -> int:
+    '''
+    Replace PENDING_HASH with the computed hash in the records with these ids.
+
+    All records are patched in one read and one write.
+
+    :param hashes: Record id -> computed password hash.
+    :return: Number of records patched.
+    '''
+    # only patch records that are still pending (the file may have
+    # been reset or the record replaced in the meantime).
+    return _update_hashes('id', hashes, current=PENDING_HASH)
+
+
+class DeferredHashWorker:
+    '''
+    Background thread that computes the hashes of records saved with defer_hash=True.
+
+    Everything queued while the previous batch was hashed is hashed together
+    (in parallel, see security.hash_passwords()) and patched into the file
+    with a single write.
+    '''
+
+    def __init__(self) -> None:
+        self._queue: 'queue.Queue[Optional[Tuple[str, str]]]' = queue.Queue()
+        self.hashed = 0
+
+        self._thread = threading.Thread(target=self._run, name='passgen-deferred-hash', daemon=True)
+        self._thread.start()
+
+    def submit(self, record_id: str, password: str) -> None:
+        '''
+        Queue the record with this id for hashing.
+        '''
+        self._queue.put((record_id, password))
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [item]
+
+            # take everything else that is already waiting.
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            items = [entry for entry in batch if entry is not None]
+            try:
+                if items:
+                    new_hashes = hash_passwords(password for _, password in items)
+                    self.hashed += _set_pending_hashes(
+                        {record_id: new_hash for (record_id, _), new_hash in zip(items, new_hashes)}
+                    )
+            except Exception:
+                # the records stay pending and are hashed by recover_pending_hashes().
+                pass
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if None in batch:
+                return
+
+    @property
+    def pending(self) -> int:
+        '''
+        Number of queued records that are not hashed yet.
+        '''
+        return self._queue.unfinished_tasks
+
+    def flush(self) -> None:
+        '''
+        Block until every queued record has been hashed and written.
+        '''
+        self._queue.join()
+
+    def stop(self) -> None:
+        '''
+        Hash what is still queued, then end the worker thread.
+        '''
+        self._queue.put(None)
+        self._thread.join()
+
+
+_deferred_worker: Optional[DeferredHashWorker] = None
+_deferred_lock = threading.Lock()
+
+
+def _get_deferred_worker() -> DeferredHashWorker:
+    '''
+    The deferred hashing worker, started on first use.
+
+    Queued records are hashed before the program exits (see _stop_at_exit()).
+    '''
+    global _deferred_worker
+    with _deferred_lock:
+        if _deferred_worker is None:
+            _deferred_worker = DeferredHashWorker()
+            _stop_at_exit(_deferred_worker.stop)
+        return _deferred_worker
+
+
+def flush_deferred_hashes() -> None:
+    '''
+    Wait until every record saved with defer_hash=True has its hash.
+    '''
+    if _deferred_worker is not None:
+        _deferred_worker.flush()
+
+
+def recover_pending_hashes() -> int:
+    '''
+    Hash every record that is still marked as pending.
+
+    Records stay pending if the program stopped (e.g. crashed) before the
+    background worker finished. Call this at startup, before new records
+    are saved with defer_hash=True.
+
+    :return: Number of records that were hashed.
+    '''
+    pending = [
+        (record['id'], record['password'])
+        for record in _load_raw()
+        if record.get('password_hash') == PENDING_HASH and 'id' in record and 'password' in record
+    ]
+    if not pending:
+        return 0
+
+    new_hashes = hash_passwords(password for _, password in pending)
+    return _set_pending_hashes({record_id: new_hash for (record_id, _), new_hash in zip(pending, new_hashes)})
+
+
+def _record_fingerprint(record: Dict[str, Any]) -> Optional[str]:
+    '''
+    The stored fingerprint of a record, computed from the plain text for
+    records saved before fingerprints existed (None if neither is available).
+    '''
+    fingerprint = record.get('fingerprint')
+    if fingerprint is None and isinstance(record.get('password'), str):
+        fingerprint = password_fingerprint(record['password'])
+    return fingerprint
+
+
+def build_fingerprint_index(records: Iterable[Dict[str, Any]]) -> Dict[str, List[str]]:
+    '''
+    Map every fingerprint to the ids of the records that use it.
+
+    Records without an id (saved by older versions) are identified by their
+    position in the file, e.g. "#3".
+
+    :param records: Password records, e.g. from list_passwords().
+    :return: Dict fingerprint -> list of record ids, in file order.
+    '''
+    index: Dict[str, List[str]] = {}
+    for position, record in enumerate(records):
+        fingerprint = _record_fingerprint(record)
+        if fingerprint is not None:
+            index.setdefault(fingerprint, []).append(record.get('id') or f'#{position}')
+    return index
+
+
+def find_reused_passwords() -> List[List[Dict[str, Any]]]:
+    '''
+    Find groups of records that share the same password.
+
+    One linear pass over the vault: records are grouped by fingerprint,
+    instead of running the KDF for every pair of records.
+
+    :return: One list of records per reused password (only groups of 2 or more).
+    '''
+    records = _load_raw()
+    by_id = {record.get('id') or f'#{position}': record for position, record in enumerate(records)}
+
+    return [
+        [by_id[record_id] for record_id in record_ids]
+        for record_ids in build_fingerprint_index(records).values()
+        if len(record_ids) > 1
+    ]
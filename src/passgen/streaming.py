@@ -0,0 +1,255 @@
+# src/passgen/streaming.py
+
+"""
+Streaming (non-interactive) password generation for PassGen.
+
+Responsibility:
+- Produce very large numbers of passwords as a pipeline of fixed-size chunks
+- Write the chunks to stdout or a file with buffered, chunked writes
+- Report how many passwords were written and how fast
+- Optionally drop duplicates and passwords from the breach corpus on the way
+
+Demonstrates:
+- Generator pipelines: only one chunk of passwords is in memory at a time,
+  so memory use stays flat no matter how many passwords are requested
+- Reusing the batch engine in password_generator (and the process pool in
+  parallel) instead of duplicating logic
+- Returning simple statistics objects instead of printing from library code
+"""
+
+
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, TextIO, Union
+
+from .bloom import BloomFilter
+from .breach import BreachIndex, resolve_breach_index
+from .config import STREAM_BUFFER_SIZE, STREAM_CHUNK_SIZE, UNIQUE_ERROR_RATE, UNIQUE_MAX_MEMORY
+from .parallel import iter_parallel_chunks
+from .password_generator import CharsetPolicy, count_possible_passwords, generate_passwords
+from .strength import score_passwords
+
+
+@dataclass(frozen=True)
+class StreamStats:
+    '''
+    Summary of a finished streaming run.
+    '''
+
+    count: int          # number of passwords written
+    bytes_written: int  # number of characters written (including newlines)
+    elapsed: float      # wall-clock seconds for generation + writing
+
+    @property
+    def rate(self) -> float:
+        '''
+        Throughput in passwords per second.
+        '''
+        if self.elapsed <= 0:
+            return float('inf') if self.count else 0.0
+        return self.count / self.elapsed
+
+
+def iter_password_chunks(
+    count: int,
+    length: int,
+    level: Union[str, CharsetPolicy],
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    require_all_classes: bool = False,
+) -> Iterator[List[str]]:
+    '''
+    Yield lists of generated passwords, at most chunk_size at a time.
+
+    :param count: Total number of passwords to produce (must be >= 0).
+    :param length: Length of each password (must be > 0).
+    :param level: Difficulty level ("1"-"4") or a CharsetPolicy.
+    :param chunk_size: Maximum number of passwords per chunk (must be > 0).
+    :param require_all_classes: Include at least one character of each class.
+    :raises ValueError: If any of the arguments is invalid.
+    '''
+    if count < 0:
+        raise ValueError('Password count cannot be negative.')
+
+    if chunk_size <= 0:
+        raise ValueError('Chunk size must be greater than zero.')
+
+    remaining = count
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        yield generate_passwords(size, length, level, require_all_classes)
+        remaining -= size
+
+
+def deduplicate_chunks(
+    chunks: Iterable[List[str]],
+    seen: BloomFilter,
+    count: int,
+    length: int,
+    level: Union[str, CharsetPolicy],
+    require_all_classes: bool = False,
+    breached: Optional[BreachIndex] = None,
+) -> Iterator[List[str]]:
+    '''
+    Pipeline step: drop every password the filter has (probably) seen before.
+
+    Works for any chunk source, including worker processes, because the
+    filter lives in this process. Passwords that were dropped are replaced
+    at the end, so exactly `count` unique passwords come out.
+    '''
+    produced = 0
+    for chunk in chunks:
+        fresh = [pwd for pwd in chunk if seen.add(pwd)]
+        produced += len(fresh)
+        yield fresh
+
+    missing = count - produced
+    if missing > 0:
+        yield generate_passwords(
+            missing, length, level, require_all_classes,
+            unique=seen, reject_breached=breached if breached is not None else False,
+        )
+
+
+def reject_breached_chunks(
+    chunks: Iterable[List[str]],
+    breached: BreachIndex,
+    length: int,
+    level: Union[str, CharsetPolicy],
+    require_all_classes: bool = False,
+) -> Iterator[List[str]]:
+    '''
+    Pipeline step: replace every password that appears in the breach corpus.
+
+    Like deduplicate_chunks(), this runs in this process, so it also
+    checks chunks that come from worker processes.
+    '''
+    for chunk in chunks:
+        kept = [pwd for pwd in chunk if pwd not in breached]
+        missing = len(chunk) - len(kept)
+        if missing:
+            kept.extend(generate_passwords(missing, length, level, require_all_classes, reject_breached=breached))
+        yield kept
+
+
+def add_strength_column(
+    chunks: Iterable[List[str]],
+    level: Union[str, CharsetPolicy],
+) -> Iterator[List[str]]:
+    '''
+    Pipeline step: append the strength score (in bits) to every password.
+
+    Each chunk is scored as one batch, e.g. "xK9#mQ2$vL<TAB>61.2".
+    '''
+    for chunk in chunks:
+        scores = score_passwords(chunk, level)
+        yield [f'{pwd}\t{score.score:.1f}' for pwd, score in zip(chunk, scores)]
+
+
+def write_password_chunks(chunks: Iterable[List[str]], out: TextIO) -> StreamStats:
+    '''
+    Write chunks of passwords to an open text stream, one password per line.
+
+    Each chunk is joined into a single string and written with one call,
+    so the number of write calls depends on the number of chunks,
+    not on the number of passwords.
+
+    :param chunks: Iterable of password lists (e.g. from iter_password_chunks()).
+    :param out: Writable text stream (sys.stdout, an open file, io.StringIO, ...).
+    :return: StreamStats for the run.
+    '''
+    start = time.perf_counter()
+    count = 0
+    bytes_written = 0
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+
+        text = '\n'.join(chunk) + '\n'
+        out.write(text)
+
+        count += len(chunk)
+        bytes_written += len(text)
+
+    out.flush()
+    return StreamStats(count, bytes_written, time.perf_counter() - start)
+
+
+def stream_passwords(
+    count: int,
+    length: int,
+    level: Union[str, CharsetPolicy],
+    output: Optional[Path] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    workers: Optional[int] = 1,
+    ordered: bool = True,
+    require_all_classes: bool = False,
+    with_strength: bool = False,
+    unique: bool = False,
+    unique_error_rate: float = UNIQUE_ERROR_RATE,
+    unique_max_memory: int = UNIQUE_MAX_MEMORY,
+    reject_breached: Union[bool, BreachIndex] = False,
+) -> StreamStats:
+    '''
+    Generate `count` passwords and stream them to a file or stdout.
+
+    :param count: Total number of passwords to produce.
+    :param length: Length of each password.
+    :param level: Difficulty level ("1"-"4") or a CharsetPolicy.
+    :param output: Target file, or None to write to stdout.
+    :param chunk_size: Number of passwords generated and written per chunk.
+    :param workers: Number of worker processes. 1 generates in this process,
+                    0 uses one worker per CPU core (see parallel.resolve_workers()).
+    :param ordered: Keep chunks in submission order when using several workers.
+    :param require_all_classes: Include at least one character of each class.
+    :param with_strength: Write "password<TAB>score in bits" instead of only the password.
+    :param unique: Guarantee that no password is written twice (Bloom filter based).
+    :param unique_error_rate: False-positive rate of the Bloom filter.
+    :param unique_max_memory: Maximum memory for the Bloom filter, in bytes.
+    :param reject_breached: True to replace every password found in the breach
+                            file (config.BREACH_FILE), or a BreachIndex to use.
+    :return: StreamStats for the run.
+    :raises ValueError: If the arguments are invalid, e.g. more unique passwords
+                        are requested than the length and level allow.
+    :raises FileNotFoundError: If reject_breached is True and no breach file exists.
+    '''
+    breached = resolve_breach_index(reject_breached)
+
+    seen = None
+    if unique and count > 0:
+        # check everything up front, before anything is written.
+        possible = count_possible_passwords(length, level, require_all_classes)
+        if count > possible // 2:
+            raise ValueError(
+                f'Cannot generate {count:,} unique passwords: only {possible:,} '
+                f'are possible with this length and level.'
+            )
+        seen = BloomFilter(count, unique_error_rate, unique_max_memory)
+
+    if workers == 1:
+        chunks = iter_password_chunks(count, length, level, chunk_size, require_all_classes)
+    else:
+        chunks = iter_parallel_chunks(
+            count, length, level, workers, chunk_size, ordered, require_all_classes,
+        )
+
+    if breached is not None:
+        chunks = reject_breached_chunks(chunks, breached, length, level, require_all_classes)
+
+    if seen is not None:
+        chunks = deduplicate_chunks(chunks, seen, count, length, level, require_all_classes, breached)
+
+    if with_strength:
+        chunks = add_strength_column(chunks, level)
+
+    if output is None:
+        return write_password_chunks(chunks, sys.stdout)
+
+    # ensure the parent directory exists, like the JSON helpers do.
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    # a large buffer means few system calls, even for small chunks.
+    with output.open('w', encoding='ascii', buffering=STREAM_BUFFER_SIZE) as f:
+        return write_password_chunks(chunks, f)
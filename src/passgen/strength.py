@@ -0,0 +1,255 @@
+# src/passgen/strength.py
+
+"""
+Password strength scoring for PassGen.
+
+Responsibility:
+- Estimate the entropy (in bits) of passwords from the size of their charset
+- Subtract penalties for repeated characters and straight sequences ("aaa", "abc", "321")
+- Score whole batches at once, e.g. all passwords of a bulk run or of the vault
+
+How a score is computed:
+    bits per character = log2(charset size)
+    entropy            = length * bits per character
+    penalty            = bits per character for every "patterned" character:
+                         - a character equal to the one before it ("aa")
+                         - a character continuing a straight run of 3+ ("abc", "987")
+    score              = entropy - penalty
+
+The charset size comes from the difficulty level when it is known (generated
+passwords), otherwise from the character classes found in the password.
+Pronounceable passwords are not uniformly random, so for that level the
+exact entropy under the Markov model is used instead (with no penalties,
+the model already accounts for the structure of the password).
+
+Demonstrates:
+- Optional dependencies: NumPy is used when installed, with a pure-Python fallback
+- Array-backed (vectorized) computation over a whole batch instead of a Python loop
+- Returning small, immutable result objects (dataclasses)
+"""
+
+
+import math
+import string
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
+
+from .markov import pronounceable_entropy
+from .password_generator import CharsetPolicy, Difficulty, get_policy
+
+try:
+    import numpy as np          # optional, install with: pip install passgen[fast]
+except ImportError:             # pragma: no cover - depends on the environment
+    np = None
+
+
+# sizes of the character classes used to guess the charset of an unknown password.
+_CLASS_SIZES: Tuple[int, int, int, int] = (
+    len(string.ascii_lowercase),
+    len(string.ascii_uppercase),
+    len(string.digits),
+    len(string.punctuation),    # all other characters count as symbols
+)
+
+# score limits (in bits) for the human readable labels.
+_LABELS: Tuple[Tuple[float, str], ...] = (
+    (28.0, 'very weak'),
+    (36.0, 'weak'),
+    (60.0, 'fair'),
+    (128.0, 'strong'),
+)
+
+
+@dataclass(frozen=True)
+class StrengthScore:
+    '''
+    Strength estimate for a single password (all values in bits).
+    '''
+
+    entropy: float      # length * log2(charset size)
+    penalty: float      # bits removed for repetitions and sequences
+
+    @property
+    def score(self) -> float:
+        '''
+        Effective strength: entropy minus penalties.
+        '''
+        return max(self.entropy - self.penalty, 0.0)
+
+    @property
+    def label(self) -> str:
+        '''
+        Human readable rating, e.g. "weak" or "strong".
+        '''
+        for limit, label in _LABELS:
+            if self.score < limit:
+                return label
+        return 'very strong'
+
+
+def _charset_size_python(password: str) -> int:
+    '''
+    Guess the charset size from the character classes that occur in the password.
+    '''
+    lower = upper = digit = other = False
+    for ch in password:
+        if 'a' <= ch <= 'z':
+            lower = True
+        elif 'A' <= ch <= 'Z':
+            upper = True
+        elif '0' <= ch <= '9':
+            digit = True
+        else:
+            other = True
+
+    flags = (lower, upper, digit, other)
+    return sum(size for size, present in zip(_CLASS_SIZES, flags) if present)
+
+
+def _patterned_count_python(password: str) -> int:
+    '''
+    Count characters that repeat the previous one or continue a straight run.
+    '''
+    count = 0
+    prev_step = None
+
+    for i in range(1, len(password)):
+        step = ord(password[i]) - ord(password[i - 1])
+
+        if step == 0 or (abs(step) == 1 and step == prev_step):
+            count += 1
+
+        prev_step = step
+
+    return count
+
+
+def _score_python(
+    passwords: Sequence[str],
+    charset_size: Optional[int],
+) -> Tuple[List[float], List[float]]:
+    '''
+    Pure-Python scoring, used when NumPy is not installed.
+    '''
+    entropies: List[float] = []
+    penalties: List[float] = []
+
+    for password in passwords:
+        size = charset_size or _charset_size_python(password)
+        bits = math.log2(size) if size > 1 else 0.0
+
+        entropies.append(len(password) * bits)
+        penalties.append(_patterned_count_python(password) * bits)
+
+    return entropies, penalties
+
+
+def _score_numpy(
+    passwords: Sequence[str],
+    charset_size: Optional[int],
+) -> Tuple[List[float], List[float]]:
+    '''
+    Vectorized scoring with NumPy.
+
+    All passwords are concatenated into one array of code points. Every
+    per-character test is a single array operation, and the per-password
+    sums come from np.add.reduceat() over the start offsets.
+    '''
+    count = len(passwords)
+    lengths = np.fromiter(map(len, passwords), dtype=np.int64, count=count)
+    entropy = np.zeros(count, dtype=np.float64)
+    penalty = np.zeros(count, dtype=np.float64)
+
+    non_empty = lengths > 0
+    if not non_empty.any():
+        return entropy.tolist(), penalty.tolist()
+
+    # empty passwords add no characters, so they can simply be skipped.
+    sizes = lengths[non_empty]
+    starts = np.cumsum(sizes) - sizes
+    codes = np.frombuffer(''.join(passwords).encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+
+    # per-password charset size.
+    if charset_size:
+        charset = np.full(sizes.shape, charset_size, dtype=np.int64)
+    else:
+        is_lower = (codes >= ord('a')) & (codes <= ord('z'))
+        is_upper = (codes >= ord('A')) & (codes <= ord('Z'))
+        is_digit = (codes >= ord('0')) & (codes <= ord('9'))
+        is_other = ~(is_lower | is_upper | is_digit)
+
+        charset = np.zeros(sizes.shape, dtype=np.int64)
+        for mask, class_size in zip((is_lower, is_upper, is_digit, is_other), _CLASS_SIZES):
+            charset += np.logical_or.reduceat(mask, starts) * class_size
+
+    bits = np.log2(np.maximum(charset, 1).astype(np.float64))
+
+    # step[i] = codes[i] - codes[i - 1]; only valid from the 2nd character of a password.
+    step = np.zeros_like(codes)
+    step[1:] = codes[1:] - codes[:-1]
+    prev_step = np.zeros_like(codes)
+    prev_step[1:] = step[:-1]
+
+    first = np.zeros(codes.shape, dtype=bool)
+    first[starts] = True
+    second = np.zeros(codes.shape, dtype=bool)
+    second[(starts + 1)[sizes > 1]] = True
+
+    repeated = (step == 0) & ~first
+    straight = (np.abs(step) == 1) & (step == prev_step) & ~first & ~second
+    patterned = np.add.reduceat((repeated | straight).astype(np.int64), starts)
+
+    entropy[non_empty] = sizes * bits
+    penalty[non_empty] = patterned * bits
+    return entropy.tolist(), penalty.tolist()
+
+
+def _score_pronounceable(password: str) -> StrengthScore:
+    '''
+    Score a password from the pronounceable level with the Markov model.
+
+    Passwords the model cannot produce (e.g. edited by hand) fall back to
+    the charset based estimate.
+    '''
+    entropy = pronounceable_entropy(password)
+    if entropy is None:
+        entropies, penalties = _score_python([password], None)
+        return StrengthScore(entropies[0], penalties[0])
+
+    return StrengthScore(entropy, 0.0)
+
+
+def score_passwords(
+    passwords: Sequence[str],
+    level: Union[str, CharsetPolicy, None] = None,
+) -> List[StrengthScore]:
+    '''
+    Score a batch of passwords.
+
+    :param passwords: The passwords to score.
+    :param level: Difficulty level or CharsetPolicy the passwords were generated
+                  with. If None, the charset is guessed per password from the
+                  character classes it contains.
+    :return: One StrengthScore per password, in the same order.
+    :raises ValueError: If the level is invalid.
+    '''
+    policy = get_policy(level) if level is not None else None
+
+    if policy == get_policy(Difficulty.PRONOUNCEABLE):
+        return [_score_pronounceable(password) for password in passwords]
+
+    charset_size = policy.size if policy is not None else None
+
+    if np is not None and passwords:
+        entropies, penalties = _score_numpy(passwords, charset_size)
+    else:
+        entropies, penalties = _score_python(passwords, charset_size)
+
+    return [StrengthScore(entropy, penalty) for entropy, penalty in zip(entropies, penalties)]
+
+
+def score_password(password: str, level: Union[str, CharsetPolicy, None] = None) -> StrengthScore:
+    '''
+    Score a single password. See score_passwords().
+    '''
+    return score_passwords([password], level)[0]
@@ -0,0 +1,25 @@
+# tests/conftest.py
+
+'''
+Shared PyTest fixtures for PassGen.
+
+Hashing uses KDF parameters that are calibrated once per host and a
+fingerprint key, both stored in the data directory. During tests, both files
+are redirected to tmp_path and automatic calibration is switched off, so the
+tests never write to the real data directory and always use the fast default
+parameters.
+'''
+
+import pytest
+
+from passgen import kdf, security
+
+
+@pytest.fixture(autouse=True)
+def _isolated_kdf_params(tmp_path, monkeypatch):
+    monkeypatch.setattr(kdf, 'KDF_PARAMS_FILE', tmp_path / 'kdf_params.json')
+    monkeypatch.setattr(kdf, 'KDF_AUTO_CALIBRATE', False)
+    monkeypatch.setattr(security, 'FINGERPRINT_KEY_FILE', tmp_path / 'fingerprint.key')
+    kdf.reset_kdf_params()
+    yield
+    kdf.reset_kdf_params()
@@ -0,0 +1,78 @@
+# tests/test_aio.py
+
+'''
+Tests for the aio module (asyncio API) in PassGen.
+
+Focus:
+- async hash/verify give the same results as the blocking functions
+- concurrent add_password() calls are coalesced into fewer file writes
+- the admission limit holds back coroutines when the pool is full
+
+Each test runs its own event loop with asyncio.run(); the password file is
+redirected to tmp_path like in test_storage.py.
+'''
+
+import asyncio
+import threading
+
+from passgen import aio, storage
+from passgen.io.module_io import iter_jsonl_file
+
+
+def test_async_hash_and_verify():
+    '''
+    Hashes made through the async API verify with the async API.
+    '''
+    async def main():
+        stored = await aio.hash_password('async-secret', iterations=1_000)
+        return stored, await aio.verify_password('async-secret', stored), await aio.verify_password('x', stored)
+
+    stored, good, bad = asyncio.run(main())
+
+    assert stored.startswith('pbkdf2_sha256$1000$')
+    assert good is True
+    assert bad is False
+
+
+def test_concurrent_add_password_coalesces_writes(tmp_path, monkeypatch):
+    '''
+    20 concurrent saves end up in the file, written in fewer than 20 writes.
+    '''
+    temp_file = tmp_path / 'passwords.jsonl'
+    monkeypatch.setattr(storage, 'PASSWORD_FILE', temp_file)
+
+    async def main():
+        await asyncio.gather(*(aio.add_password(f'svc{i}', 'user', f'pw{i}') for i in range(20)))
+        listed = await aio.list_passwords()
+        return listed, aio.stats()
+
+    listed, stats = asyncio.run(main())
+
+    assert sorted(record['service'] for record in listed) == sorted(f'svc{i}' for i in range(20))
+    assert list(iter_jsonl_file(temp_file)) == listed
+    assert 1 <= stats['file_writes'] < 20
+    assert stats['queued_writes'] == 0
+
+
+def test_backpressure_limits_pending_jobs(monkeypatch):
+    '''
+    With a limit of 2 pending jobs, the third caller waits until a slot is free.
+    '''
+    release = threading.Event()
+
+    async def main():
+        state = aio._state()
+        monkeypatch.setattr(state, 'slots', asyncio.Semaphore(2))
+
+        tasks = [asyncio.create_task(aio._run(release.wait)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        snapshot = aio.stats()
+
+        release.set()
+        await asyncio.gather(*tasks)
+        return snapshot
+
+    snapshot = asyncio.run(main())
+
+    assert snapshot['active'] == 2
+    assert snapshot['waiting'] == 1
@@ -0,0 +1,195 @@
+# tests/test_backends.py
+
+'''
+Tests for the storage backends (backends.py) in PassGen.
+
+Focus:
+- every backend stores, streams, updates and backs up records the same way
+- the SQLite backend runs in WAL mode and has the lookup indexes
+- storage.add_password()/list_passwords() work unchanged with STORAGE_BACKEND = 'sqlite'
+
+All vault files are created in tmp_path.
+'''
+
+import sqlite3
+import threading
+
+import pytest
+
+from passgen import backends, storage
+from passgen.security import verify_password
+
+
+RECORDS = [
+    {'id': 'a', 'service': 'Gmail', 'username': 'me', 'password': 'pw1', 'password_hash': 'h1',
+     'created_at': '2025-12-10T22:30:00'},
+    # an old record: no id, an extra field that has no column in SQLite.
+    {'service': 'Spotify', 'username': 'you', 'password': 'pw2', 'password_hash': 'h2', 'note': 'åäö'},
+]
+
+
+@pytest.fixture(params=backends.available_backends())
+def backend(request, tmp_path):
+    backend_class = backends._REGISTRY[request.param]
+    backend = backend_class(tmp_path / f'vault{backend_class.suffix}')
+    yield backend
+    backend.close()
+
+
+def test_backend_roundtrip(backend, tmp_path):
+    '''
+    Records read back exactly as written, in order, and can be updated,
+    backed up and replaced.
+    '''
+    assert not backend.exists()
+    assert list(backend.iter_records()) == []
+
+    backend.append(RECORDS)
+    backend.append([{'id': 'c', 'service': 'GitHub', 'password_hash': 'h1'}])
+    assert backend.exists()
+    assert list(backend.iter_records()) == RECORDS + [{'id': 'c', 'service': 'GitHub', 'password_hash': 'h1'}]
+
+    # update by hash (rehash) and by id, only if the hash is still the expected one.
+    assert backend.update_hashes('password_hash', {'h1': 'h1-new', 'missing': 'x'}) == 2
+    assert backend.update_hashes('id', {'a': 'h1-newer', 'c': 'h3'}, current='h1-new') == 2
+    assert backend.update_hashes('id', {'c': 'ignored'}, current='h1-new') == 0
+    assert [record['password_hash'] for record in backend.iter_records()] == ['h1-newer', 'h2', 'h3']
+
+    with pytest.raises(ValueError):
+        backend.update_hashes('service', {'Gmail': 'x'})
+
+    target = tmp_path / 'backups' / f'copy{backend.suffix}'
+    backend.backup(target)
+    copy = type(backend)(target)
+    assert list(copy.iter_records()) == list(backend.iter_records())
+    copy.close()
+
+    backend.replace_all([])
+    assert backend.exists()
+    assert list(backend.iter_records()) == []
+
+
+def test_backend_query(backend):
+    '''
+    query() filters on any field (missing fields are None) and pages the result.
+    '''
+    assert list(backend.query({'service': 'Gmail'})) == []
+
+    backend.append(RECORDS)
+    backend.append([{'id': 'c', 'service': 'Gmail', 'username': 'other'}])
+
+    assert [r.get('id') for r in backend.query({})] == ['a', None, 'c']
+    assert [r['id'] for r in backend.query({'service': 'Gmail'})] == ['a', 'c']
+    assert [r['id'] for r in backend.query({'service': 'Gmail', 'username': 'other'})] == ['c']
+    assert [r['service'] for r in backend.query({'id': None})] == ['Spotify']
+    # "note" has no column in SQLite, it is filtered in Python.
+    assert list(backend.query({'note': 'åäö'})) == [RECORDS[1]]
+
+    assert [r.get('id') for r in backend.query({}, offset=1)] == [None, 'c']
+    assert [r.get('id') for r in backend.query({}, offset=1, limit=1)] == [None]
+    assert [r['id'] for r in backend.query({'service': 'Gmail'}, offset=1, limit=5)] == ['c']
+    assert list(backend.query({}, limit=0)) == []
+
+
+def test_sqlite_wal_and_indexes(tmp_path):
+    '''
+    The SQLite vault uses WAL and answers service/username/date queries from indexes.
+    '''
+    backend = backends.SqliteBackend(tmp_path / 'vault.db')
+    backend.append(RECORDS)
+
+    conn = sqlite3.connect(str(backend.path))
+    try:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+        for column in ('service', 'username', 'created_at'):
+            plan = ' '.join(row[-1] for row in conn.execute(
+                f'EXPLAIN QUERY PLAN SELECT * FROM passwords WHERE {column} = ?', ('x',)
+            ))
+            assert f'idx_passwords_{column}' in plan
+
+        # the filtered, paged query of iter_passwords() uses the indexes too.
+        plan = ' '.join(row[-1] for row in conn.execute(
+            'EXPLAIN QUERY PLAN ' + backends._select_where(('service',)), ('x', -1, 0)
+        ))
+        assert 'idx_passwords_service' in plan
+    finally:
+        conn.close()
+        backend.close()
+
+
+def test_open_backend_registry(tmp_path):
+    '''
+    open_backend() shares one instance per name and path and rejects unknown names.
+    '''
+    path = tmp_path / 'vault.db'
+    assert backends.open_backend('sqlite', path) is backends.open_backend('sqlite', path)
+
+    with pytest.raises(ValueError):
+        backends.open_backend('nope', path)
+
+
+def test_storage_api_with_sqlite(tmp_path, monkeypatch):
+    '''
+    With the SQLite backend selected, the public storage API works as before,
+    also from several threads, and a new database imports the JSON Lines vault.
+    '''
+    jsonl_file = tmp_path / 'passwords.jsonl'
+    monkeypatch.setattr(storage, 'PASSWORD_FILE', jsonl_file)
+    monkeypatch.setattr(storage, 'hash_password', lambda password: f'hash-{password}')
+
+    storage.add_password('Old', 'me', 'old-pw')
+
+    monkeypatch.setattr(storage, 'STORAGE_BACKEND', 'sqlite')
+    monkeypatch.setattr(storage, 'SQLITE_FILE', tmp_path / 'passwords.db')
+
+    threads = [
+        threading.Thread(target=storage.add_password, args=(f'svc{i}', 'user', f'pw{i}'))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    records = storage.list_passwords()
+    assert records[0]['service'] == 'Old'
+    assert sorted(record['service'] for record in records[1:]) == sorted(f'svc{i}' for i in range(8))
+
+    # the JSON Lines file is left untouched.
+    assert len(list(backends.JsonLinesBackend(jsonl_file).iter_records())) == 1
+
+
+def test_deferred_hashing_with_sqlite(tmp_path, monkeypatch):
+    '''
+    Deferred hashes are patched into the SQLite vault by record id.
+    '''
+    monkeypatch.setattr(storage, 'PASSWORD_FILE', tmp_path / 'passwords.jsonl')
+    monkeypatch.setattr(storage, 'STORAGE_BACKEND', 'sqlite')
+    monkeypatch.setattr(storage, 'SQLITE_FILE', tmp_path / 'passwords.db')
+
+    storage.add_password('Deferred', 'me', 'later!', defer_hash=True)
+    storage.flush_deferred_hashes()
+    [record] = storage.list_passwords()
+    assert verify_password('later!', record['password_hash']) is True
+
+
+def test_sqlite_cache_sees_other_connections(tmp_path, monkeypatch):
+    '''
+    Rows written by another connection (e.g. another process) change the
+    signature of the WAL file, so the cached vault is parsed again.
+    '''
+    monkeypatch.setattr(storage, 'PASSWORD_FILE', tmp_path / 'passwords.jsonl')
+    monkeypatch.setattr(storage, 'STORAGE_BACKEND', 'sqlite')
+    monkeypatch.setattr(storage, 'SQLITE_FILE', tmp_path / 'passwords.db')
+    monkeypatch.setattr(storage, 'hash_password', lambda password: 'hash')
+
+    storage.add_password('Gmail', 'a', 'pw')
+    assert len(storage.list_passwords()) == 1
+    assert len(storage.list_passwords()) == 1
+
+    other = backends.SqliteBackend(tmp_path / 'passwords.db')
+    other.append([{'service': 'Other'}])
+    other.close()
+
+    assert [record['service'] for record in storage.list_passwords()] == ['Gmail', 'Other']
@@ -0,0 +1,118 @@
+# tests/test_bloom.py
+
+'''
+Tests for the Bloom filter used by unique bulk generation.
+
+Focus:
+- BloomFilter: no false negatives, sizing, memory limit
+- generate_passwords(unique=True): no duplicates, even in tiny password spaces
+- stream_passwords(unique=True): uniqueness across chunks and worker processes
+'''
+
+import pytest
+
+from passgen import password_generator, streaming
+from passgen.bloom import BloomFilter
+from passgen.password_generator import compile_policy, generate_passwords
+
+
+def test_bloom_filter_remembers_added_items():
+    '''
+    Every added item must be reported as seen (no false negatives),
+    and adding it again must return False.
+    '''
+    seen = BloomFilter(1000, error_rate=1e-9)
+    items = [f'item-{i}' for i in range(1000)]
+
+    assert all(seen.add(item) for item in items)
+    assert all(item in seen for item in items)
+    assert not seen.add('item-5')
+    assert seen.count == 1000
+    assert seen.probable_hits == 1
+
+
+def test_bloom_filter_false_positive_rate_is_close_to_target():
+    '''
+    At full capacity the false-positive rate should be near the configured rate.
+    '''
+    seen = BloomFilter(5000, error_rate=0.01)
+    for i in range(5000):
+        seen.add(f'in-{i}')
+
+    false_positives = sum(f'out-{i}' in seen for i in range(20000))
+    assert false_positives / 20000 < 0.03
+
+
+def test_bloom_filter_memory_limit_and_arguments():
+    '''
+    A filter that would need more than max_memory bytes is refused up front.
+    '''
+    with pytest.raises(ValueError):
+        BloomFilter(10_000_000, error_rate=1e-6, max_memory=1024)
+
+    with pytest.raises(ValueError):
+        BloomFilter(0)
+
+    with pytest.raises(ValueError):
+        BloomFilter(100, error_rate=1.5)
+
+
+def test_generate_passwords_unique_in_small_space():
+    '''
+    With 3 characters and length 8 there are 6561 possible passwords;
+    3000 random ones would almost surely collide without unique=True.
+    '''
+    policy = compile_policy('abc')
+
+    passwords = generate_passwords(3000, 8, policy, unique=True)
+
+    assert len(passwords) == 3000
+    assert len(set(passwords)) == 3000
+
+
+def test_generate_passwords_unique_shares_filter_between_calls():
+    '''
+    Passing the same BloomFilter keeps several batches unique together.
+    '''
+    policy = compile_policy('abc')
+    seen = BloomFilter(3000)
+
+    first = generate_passwords(1500, 8, policy, unique=seen)
+    second = generate_passwords(1500, 8, policy, unique=seen)
+
+    assert len(set(first) | set(second)) == 3000
+
+
+def test_generate_passwords_unique_too_many_raises():
+    '''
+    Asking for more unique passwords than the space allows is an error.
+    '''
+    with pytest.raises(ValueError):
+        generate_passwords(100, 2, compile_policy('ab'), unique=True)
+
+
+def test_generate_passwords_unique_stops_when_no_progress(monkeypatch):
+    '''
+    A generator that only repeats itself raises ValueError instead of looping forever.
+    '''
+    monkeypatch.setattr(password_generator, '_generate_batch', lambda count, *args: ['same'] * count)
+
+    with pytest.raises(ValueError):
+        generate_passwords(5, 8, compile_policy('abc'), unique=True)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_stream_passwords_unique(tmp_path, workers):
+    '''
+    Uniqueness must hold across chunks, also when chunks come from workers.
+    '''
+    output = tmp_path / 'unique.txt'
+
+    stats = streaming.stream_passwords(
+        3000, 8, compile_policy('abc'), output=output,
+        chunk_size=250, workers=workers, unique=True,
+    )
+
+    lines = output.read_text(encoding='ascii').splitlines()
+    assert stats.count == 3000
+    assert len(set(lines)) == 3000
@@ -0,0 +1,175 @@
+# tests/test_breach.py
+
+'''
+Tests for the breach module (offline breached-password check) in PassGen.
+
+Focus:
+- build_breach_index(): parses HIBP-style lines, sorts across several runs, removes duplicates
+- BreachIndex: binary search finds every entry and nothing else, header validation
+- generate_password(reject_breached=...) never returns a breached password
+- bulk, unique and streaming generation, add_password() and add_passwords()
+  honour reject_breached as well
+- open_breach_index(): shared instances survive close() and follow rebuilds
+
+All corpus and index files are written to tmp_path.
+'''
+
+import hashlib
+from itertools import product
+from pathlib import Path
+
+import pytest
+
+from passgen import breach, storage, streaming
+from passgen import password_generator as pg
+
+
+def _sha1(password: str) -> str:
+    return hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
+
+
+def _write_corpus(tmp_path, passwords, name='pwned.txt') -> Path:
+    source = tmp_path / name
+    source.write_text(''.join(f'{_sha1(pwd)}:{i + 1}\n' for i, pwd in enumerate(passwords)), encoding='ascii')
+    return source
+
+
+def test_build_and_lookup(tmp_path):
+    '''
+    Entries from unsorted input (several sorted runs) can all be found,
+    duplicates are stored once, other passwords are not found.
+    '''
+    breached = [f'password{i}' for i in range(200)]
+    first = _write_corpus(tmp_path, breached[::-1], 'a.txt')
+    second = _write_corpus(tmp_path, breached[:50] + ['letmein'], 'b.txt')
+    with second.open('a', encoding='ascii') as f:
+        f.write('not a hash\n')
+
+    target = tmp_path / 'breached.idx'
+    count = breach.build_breach_index([first, second], target, width=8, chunk_size=7)
+
+    assert count == 201
+    assert target.stat().st_size == breach._HEADER.size + 201 * 8
+
+    with breach.BreachIndex(target) as index:
+        assert len(index) == 201
+        for pwd in breached + ['letmein']:
+            assert pwd in index
+        for pwd in ('password200', 'correct horse', ''):
+            assert pwd not in index
+
+
+def test_invalid_breach_file(tmp_path):
+    '''
+    Files with a wrong header or size are rejected with ValueError.
+    '''
+    bad = tmp_path / 'bad.idx'
+    bad.write_bytes(b'PGBR')
+    with pytest.raises(ValueError):
+        breach.BreachIndex(bad)
+
+    target = tmp_path / 'breached.idx'
+    breach.build_breach_index([_write_corpus(tmp_path, ['x', 'y'])], target)
+    target.write_bytes(target.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        breach.BreachIndex(target)
+
+    with pytest.raises(ValueError):
+        breach.build_breach_index([], target, width=2)
+
+
+def test_generate_password_rejects_breached(tmp_path):
+    '''
+    With 15 of the 16 possible passwords breached, only the last one is returned.
+    '''
+    policy = pg.compile_policy('ab', 'tiny')
+    everything = [''.join(chars) for chars in product('ab', repeat=4)]
+    safe = 'abba'
+
+    target = tmp_path / 'breached.idx'
+    breach.build_breach_index([_write_corpus(tmp_path, [pwd for pwd in everything if pwd != safe])], target)
+
+    with breach.BreachIndex(target) as index:
+        for _ in range(5):
+            assert pg.generate_password(4, policy, reject_breached=index) == safe
+
+    # everything breached -> give up with a clear error.
+    breach.build_breach_index([_write_corpus(tmp_path, everything)], target)
+    with breach.BreachIndex(target) as index:
+        with pytest.raises(ValueError):
+            pg.generate_password(4, policy, reject_breached=index)
+
+
+def test_shared_index_survives_close_and_follows_rebuild(tmp_path):
+    '''
+    Closing the shared instance does not break later lookups, and a rebuilt
+    file is picked up in the same process.
+    '''
+    target = tmp_path / 'breach.bin'
+    breach.build_breach_index([_write_corpus(tmp_path, ['first'])], target)
+
+    with breach.open_breach_index(target) as shared:
+        assert 'first' in shared
+    assert breach.is_breached('first', target)
+
+    breach.build_breach_index([_write_corpus(tmp_path, ['second'])], target)
+    assert breach.is_breached('second', target)
+    assert not breach.is_breached('first', target)
+
+    with pytest.raises(FileNotFoundError):
+        breach.open_breach_index(tmp_path / 'missing.bin')
+
+
+@pytest.fixture
+def tiny_corpus(tmp_path):
+    '''
+    A breach file with 15 of the 16 passwords of length 4 over "ab"; only "abba" is safe.
+    '''
+    everything = [''.join(chars) for chars in product('ab', repeat=4)]
+    target = tmp_path / 'breached.idx'
+    breach.build_breach_index([_write_corpus(tmp_path, [pwd for pwd in everything if pwd != 'abba'])], target)
+    with breach.BreachIndex(target) as index:
+        yield index
+
+
+def test_bulk_and_streaming_generation_reject_breached(tmp_path, tiny_corpus):
+    '''
+    generate_passwords() and stream_passwords() (also with worker processes)
+    replace every breached password; unique mode gives up once only
+    breached or repeated passwords are left.
+    '''
+    policy = pg.compile_policy('ab', 'tiny')
+
+    assert pg.generate_passwords(50, 4, policy, reject_breached=tiny_corpus) == ['abba'] * 50
+    assert pg.generate_passwords(1, 4, policy, unique=True, reject_breached=tiny_corpus) == ['abba']
+    with pytest.raises(ValueError):
+        pg.generate_passwords(2, 4, policy, unique=True, reject_breached=tiny_corpus)
+
+    for workers in (1, 2):
+        output = tmp_path / f'out{workers}.txt'
+        stats = streaming.stream_passwords(
+            40, 4, policy, output=output, chunk_size=8, workers=workers, reject_breached=tiny_corpus,
+        )
+        assert stats.count == 40
+        assert output.read_text(encoding='ascii').splitlines() == ['abba'] * 40
+
+
+def test_saving_rejects_breached(tmp_path, monkeypatch, tiny_corpus):
+    '''
+    add_password() and add_passwords() refuse breached passwords when asked
+    to; a rejected batch leaves the vault unchanged.
+    '''
+    monkeypatch.setattr(storage, 'PASSWORD_FILE', tmp_path / 'passwords.jsonl')
+    monkeypatch.setattr(storage, 'hash_password', lambda password: 'hash')
+
+    with pytest.raises(ValueError):
+        storage.add_password('Gmail', 'me', 'aaaa', reject_breached=tiny_corpus)
+    storage.add_password('Gmail', 'me', 'abba', reject_breached=tiny_corpus)
+    # the check is opt-in.
+    storage.add_password('Other', 'me', 'aaaa')
+
+    with pytest.raises(ValueError, match='Record 1'):
+        storage.add_passwords([('A', 'x', 'abba'), ('B', 'y', 'bbbb')], workers=1, reject_breached=tiny_corpus)
+    assert storage.add_passwords([('A', 'x', 'abba')], workers=1, reject_breached=tiny_corpus) == 1
+
+    assert [record['service'] for record in storage.list_passwords()] == ['Gmail', 'Other', 'A']
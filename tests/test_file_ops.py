@@ -4,26 +4,26 @@
 Tests for the file operations module in PassGen (io.file_ops).
 
 Focus:
-- backup_password_file(): creates a timestamped backup of passwords.json
-- reset_password_file(): resets the password storage to an empty list
+- backup_password_file(): creates a timestamped backup of passwords.jsonl
+- reset_password_file(): resets the password storage to an empty vault
 - backup_log_file(): creates a timestamped backup of the log file (if it exists)
 
 All tests use tmp_path + monkeypatch so no real files in the project are touched.
 '''
 
-import json
 from pathlib import Path
 
+from passgen import backends, storage
 from passgen.io import file_ops
-from passgen.io.module_io import write_json_file
+from passgen.io.module_io import iter_jsonl_file, write_jsonl_file
 
 
 def _setup_password_file_env(tmp_path, monkeypatch) -> Path:
     '''
-    Redirect file_ops.PASSWORD_FILE to a temporary location for each test.
+    Redirect storage.PASSWORD_FILE (the vault file_ops works on) to a temporary location.
     '''
-    temp_password_file = tmp_path / 'passwords.json'
-    monkeypatch.setattr(file_ops, 'PASSWORD_FILE', temp_password_file)
+    temp_password_file = tmp_path / 'passwords.jsonl'
+    monkeypatch.setattr(storage, 'PASSWORD_FILE', temp_password_file)
     return temp_password_file
 
 
@@ -43,7 +43,7 @@ def _setup_log_file_env(tmp_path, monkeypatch) -> Path:
 def test_backup_password_file_creates_backup_with_same_content(tmp_path, monkeypatch):
     '''
     backup_password_file() should create a backup file under 'backups/'
-    with the same JSON content as the original passwords.json.
+    with the same records as the original passwords.jsonl.
     '''
     temp_password_file = _setup_password_file_env(tmp_path, monkeypatch)
 
@@ -57,8 +57,8 @@ def test_backup_password_file_creates_backup_with_same_content(tmp_path, monkeyp
         }
     ]
 
-    # Write original data to the temporary passwords.json
-    write_json_file(temp_password_file, original_data)
+    # Write original data to the temporary passwords.jsonl
+    write_jsonl_file(temp_password_file, original_data)
 
     # Run backup
     backup_path = file_ops.backup_password_file()
@@ -68,14 +68,14 @@ def test_backup_password_file_creates_backup_with_same_content(tmp_path, monkeyp
     assert backup_path.parent == temp_password_file.parent / 'backups'
 
     # Backup content should match original content
-    backup_data = json.loads(backup_path.read_text(encoding='utf-8'))
-    assert backup_data == original_data
+    assert list(iter_jsonl_file(backup_path)) == original_data
+    assert backup_path.read_bytes() == temp_password_file.read_bytes()
 
 
 def test_backup_password_file_when_missing_creates_empty_backup(tmp_path, monkeypatch):
     '''
     If the password file does not exist, backup_password_file() should still
-    create a backup file containing an empty list.
+    create a backup file without any records.
     '''
     temp_password_file = _setup_password_file_env(tmp_path, monkeypatch)
 
@@ -85,28 +85,49 @@ def test_backup_password_file_when_missing_creates_empty_backup(tmp_path, monkey
     backup_path = file_ops.backup_password_file()
 
     assert backup_path.exists()
-    backup_data = json.loads(backup_path.read_text(encoding='utf-8'))
 
-    # Since there was no valid data, backup should contain an empty list
-    assert backup_data == []
+    # Since there was no password file, backup should contain no records
+    assert list(iter_jsonl_file(backup_path)) == []
 
 
-def test_reset_password_file_writes_empty_list(tmp_path, monkeypatch):
+def test_reset_password_file_writes_empty_vault(tmp_path, monkeypatch):
     '''
-    reset_password_file() should overwrite the password file with an empty list.
+    reset_password_file() should overwrite the password file with an empty vault.
     '''
     temp_password_file = _setup_password_file_env(tmp_path, monkeypatch)
 
     # Write some initial data
-    write_json_file(temp_password_file, [{'service': 'Test'}])
+    write_jsonl_file(temp_password_file, [{'service': 'Test'}])
     assert temp_password_file.exists()
 
     # Reset file
     file_ops.reset_password_file()
 
-    # File should still exist, but contain an empty JSON list
-    data = json.loads(temp_password_file.read_text(encoding='utf-8'))
-    assert data == []
+    # File should still exist, but contain no records
+    assert temp_password_file.exists()
+    assert list(iter_jsonl_file(temp_password_file)) == []
+
+
+def test_backup_with_sqlite_migrates_existing_records_first(tmp_path, monkeypatch):
+    '''
+    Regression: a backup before any other storage call must not create an
+    empty SQLite vault that hides the records of passwords.jsonl.
+    '''
+    temp_password_file = _setup_password_file_env(tmp_path, monkeypatch)
+    monkeypatch.setattr(storage, 'SQLITE_FILE', tmp_path / 'passwords.db')
+    monkeypatch.setattr(storage, 'STORAGE_BACKEND', 'sqlite')
+    write_jsonl_file(temp_password_file, [{'service': 'Gmail', 'username': 'me'}])
+
+    try:
+        backup_path = file_ops.backup_password_file()
+
+        assert backup_path.suffix == '.db'
+        assert [record['service'] for record in storage.list_passwords()] == ['Gmail']
+        copy = backends.SqliteBackend(backup_path)
+        assert [record['service'] for record in copy.iter_records()] == ['Gmail']
+        copy.close()
+    finally:
+        backends.close_backends()
 
 
 def test_backup_log_file_returns_none_when_log_missing(tmp_path, monkeypatch):
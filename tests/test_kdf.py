@@ -0,0 +1,107 @@
+# tests/test_kdf.py
+
+'''
+Tests for the kdf module (KDF registry and calibration) in PassGen.
+
+Focus:
+- The registry resolves algorithm prefixes and rejects unknown ones
+- hash_password()/verify_password() work with every registered KDF
+- Calibration picks parameters, persists them per host and reuses them
+
+The calibration file is redirected to tmp_path by tests/conftest.py.
+'''
+
+import pytest
+
+from passgen import kdf
+from passgen.security import hash_password, verify_many, verify_password
+
+
+def test_registry_and_param_parsing():
+    '''
+    Known algorithms are registered, unknown ones and bad parameters raise ValueError.
+    '''
+    assert 'pbkdf2_sha256' in kdf.available_kdfs()
+    assert kdf.get_kdf('pbkdf2_sha256').parse_params('1000') == (1000,)
+
+    with pytest.raises(ValueError):
+        kdf.get_kdf('md5')
+    with pytest.raises(ValueError):
+        kdf.get_kdf('pbkdf2_sha256').parse_params('0')
+    with pytest.raises(ValueError):
+        kdf.register_kdf(kdf.KdfBackend())
+
+
+@pytest.mark.skipif('scrypt' not in kdf.available_kdfs(), reason='hashlib.scrypt not available')
+def test_scrypt_hash_and_verify():
+    '''
+    scrypt hashes use the "scrypt$N,r,p$..." format and verify like PBKDF2 hashes.
+    '''
+    stored = hash_password('s3cret', algorithm='scrypt')
+
+    assert stored.startswith('scrypt$16384,8,1$')
+    assert verify_password('s3cret', stored) is True
+    assert verify_password('wrong', stored) is False
+    assert verify_password('s3cret', 'scrypt$1000,8,1$AAAA$AAAA') is False     # N not a power of two
+
+    pbkdf2 = hash_password('s3cret', iterations=1_000)
+    assert [(m.candidate, m.stored) for m in verify_many(['s3cret'], [stored, pbkdf2])] == [(0, 0), (0, 1)]
+
+
+def test_calibration_is_persisted_and_reused(monkeypatch):
+    '''
+    calibrate_kdf() stores the result for this host; later lookups read it
+    from the file instead of measuring again.
+    '''
+    params = kdf.calibrate_kdf('pbkdf2_sha256', target_ms=5)
+    assert params[0] >= kdf.PBKDF2_MIN_ITERATIONS
+
+    saved = kdf.read_json_file(kdf.KDF_PARAMS_FILE)
+    assert saved[kdf._host_name()]['pbkdf2_sha256']['params'] == list(params)
+
+    # a new process would only have the file: measuring again must not happen.
+    kdf.reset_kdf_params()
+    monkeypatch.setattr(kdf.Pbkdf2Sha256, 'calibrate', lambda self, target: pytest.fail('recalibrated'))
+    assert kdf.get_kdf_params('pbkdf2_sha256') == ('pbkdf2_sha256', params)
+
+
+def test_auto_calibration_on_first_use(monkeypatch):
+    '''
+    With auto calibration enabled, the first hash on a new host calibrates once.
+    '''
+    calls = []
+
+    def fake_calibrate(self, target):
+        calls.append(target)
+        return (123_000,)
+
+    monkeypatch.setattr(kdf, 'KDF_AUTO_CALIBRATE', True)
+    monkeypatch.setattr(kdf.Pbkdf2Sha256, 'calibrate', fake_calibrate)
+
+    first = hash_password('a')
+    second = hash_password('b')
+
+    assert first.startswith('pbkdf2_sha256$123000$')
+    assert second.startswith('pbkdf2_sha256$123000$')
+    assert calls == [kdf.KDF_TARGET_MS / 1000]
+
+
+@pytest.mark.parametrize('host_entry', [None, [], 'pbkdf2_sha256', 42])
+def test_malformed_host_entry_is_ignored(monkeypatch, host_entry):
+    '''
+    A calibration file whose entry for this host is not an object is treated
+    as "not calibrated"; auto calibration then replaces the broken entry.
+    '''
+    kdf.write_json_file(kdf.KDF_PARAMS_FILE, {kdf._host_name(): host_entry, 'other-host': host_entry})
+
+    assert kdf._load_saved_params('pbkdf2_sha256') is None
+
+    monkeypatch.setattr(kdf, 'KDF_AUTO_CALIBRATE', True)
+    monkeypatch.setattr(kdf.Pbkdf2Sha256, 'calibrate', lambda self, target: (123_000,))
+
+    assert hash_password('x').startswith('pbkdf2_sha256$123000$')
+
+    saved = kdf.read_json_file(kdf.KDF_PARAMS_FILE)
+    assert saved[kdf._host_name()]['pbkdf2_sha256']['params'] == [123_000]
+    assert saved['other-host'] == host_entry
+    assert kdf._load_saved_params('pbkdf2_sha256') == (123_000,)
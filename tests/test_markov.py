@@ -0,0 +1,131 @@
+# tests/test_markov.py
+
+'''
+Tests for the markov module (pronounceable passwords) in PassGen.
+
+Focus:
+- compile_model(): trains on a word list and writes a valid table file
+- MarkovModel: follows only transitions seen in training, reports exact entropy
+- the shipped model is used for Difficulty.PRONOUNCEABLE in the generator and scoring
+- count_passwords(): the exact number of reachable passwords bounds unique generation
+
+Custom models are written to tmp_path, so the shipped model file is never touched.
+'''
+
+import itertools
+import math
+import string
+
+import pytest
+
+from passgen import markov, streaming
+from passgen import password_generator as pg
+from passgen.strength import score_password
+
+
+def test_compiled_model_only_uses_seen_transitions(tmp_path):
+    '''
+    A model trained on one word can only ever produce that word (as a prefix).
+    '''
+    target = tmp_path / 'model.bin'
+    markov.compile_model(['banana'], target)
+    model = markov.load_model(target)
+
+    for password, bits in model.generate_many(20, 6):
+        assert password == 'banana'
+        # every context in "banana" has a single continuation, so each letter
+        # is certain and the whole word has zero surprisal.
+        assert bits == pytest.approx(0.0)
+
+
+def test_entropy_matches_generation(tmp_path):
+    '''
+    The entropy reported while generating equals the entropy computed later.
+    '''
+    target = tmp_path / 'model.bin'
+    markov.compile_model(['abc', 'abd', 'acd', 'bad'], target)
+    model = markov.load_model(target)
+
+    for password, bits in model.generate_many(50, 3):
+        assert model.entropy(password) == pytest.approx(bits)
+
+    # "a" and "b" start 3 and 1 of 4 words -> P("a") = 3/4 exactly in 2**16 units.
+    assert model.entropy('a') == pytest.approx(-math.log2(0.75))
+    # "z" was never seen as a first letter.
+    assert model.entropy('z') is None
+    assert model.entropy('A') is None
+
+
+def test_invalid_model_file(tmp_path):
+    '''
+    Files with a wrong header or size are rejected with ValueError.
+    '''
+    bad = tmp_path / 'bad.bin'
+    bad.write_bytes(b'nope')
+    with pytest.raises(ValueError):
+        markov.load_model(bad)
+
+    target = tmp_path / 'model.bin'
+    markov.compile_model(['word'], target)
+    target.write_bytes(target.read_bytes()[:-4])
+    with pytest.raises(ValueError):
+        markov._read_model(target)
+
+
+def test_pronounceable_level():
+    '''
+    The pronounceable level produces lowercase passwords of the right length
+    and is scored with the Markov entropy.
+    '''
+    passwords = pg.generate_passwords(200, 10, pg.Difficulty.PRONOUNCEABLE)
+
+    assert len(passwords) == 200
+    for pwd in passwords:
+        assert len(pwd) == 10
+        assert pwd.isalpha() and pwd.islower()
+
+        entropy = markov.pronounceable_entropy(pwd)
+        assert entropy is not None
+        # always less than a uniformly random lowercase password.
+        assert 0 < entropy < 10 * math.log2(26)
+        assert score_password(pwd, pg.Difficulty.PRONOUNCEABLE).score == pytest.approx(entropy)
+
+    unique = pg.generate_passwords(100, 12, pg.Difficulty.PRONOUNCEABLE, unique=True)
+    assert len(set(unique)) == 100
+
+
+def test_count_passwords_matches_reachable_strings(tmp_path):
+    '''
+    count_passwords() equals the number of strings the model can produce.
+    '''
+    target = tmp_path / 'model.bin'
+    markov.compile_model(['abc', 'abd', 'acd', 'bad'], target)
+    model = markov.load_model(target)
+
+    for length in (1, 2, 3):
+        reachable = sum(
+            1 for letters in itertools.product(string.ascii_lowercase, repeat=length)
+            if model.entropy(''.join(letters)) is not None
+        )
+        assert model.count_passwords(length) == reachable
+
+    markov.compile_model(['banana'], tmp_path / 'banana.bin')
+    assert markov.load_model(tmp_path / 'banana.bin').count_passwords(8) == 1
+
+
+def test_unique_pronounceable_respects_model_capacity(tmp_path):
+    '''
+    Regression: asking for more unique short pronounceable passwords than the
+    model can produce raises ValueError instead of looping forever.
+    '''
+    possible = pg.count_possible_passwords(4, pg.Difficulty.PRONOUNCEABLE)
+    assert possible == markov.load_model().count_passwords(4)
+    assert possible < 26 ** 4
+
+    with pytest.raises(ValueError):
+        pg.generate_passwords(50_000, 4, pg.Difficulty.PRONOUNCEABLE, unique=True)
+    with pytest.raises(ValueError):
+        streaming.stream_passwords(50_000, 4, pg.Difficulty.PRONOUNCEABLE, output=tmp_path / 'out.txt', unique=True)
+
+    passwords = pg.generate_passwords(possible // 4, 4, pg.Difficulty.PRONOUNCEABLE, unique=True)
+    assert len(set(passwords)) == possible // 4
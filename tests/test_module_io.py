@@ -1,8 +1,18 @@
 # tests/test_module_io.py
 
+import json
 from pathlib import Path
 
-from passgen.io.module_io import read_json_file, write_json_file
+import pytest
+
+from passgen.io.module_io import (
+    append_jsonl_file,
+    iter_json_array,
+    iter_jsonl_file,
+    read_json_file,
+    write_json_file,
+    write_jsonl_file,
+)
 
 
 def test_write_and_read_json_roundtrip(tmp_path):
@@ -35,3 +45,44 @@ def test_read_json_invalid_returns_none(tmp_path):
     path.write_text('this is not valid json', encoding='utf-8')
 
     assert read_json_file(path) is None
+
+
+def test_jsonl_append_and_stream(tmp_path):
+    '''
+    Appended JSON Lines records are streamed back in order; blank and
+    broken lines are skipped, a missing file yields nothing.
+    '''
+    path: Path = tmp_path / 'records.jsonl'
+    assert list(iter_jsonl_file(path)) == []
+
+    append_jsonl_file(path, [{'n': 1}, {'n': 2, 'text': 'åäö'}])
+    with path.open('a', encoding='utf-8') as f:
+        f.write('\nnot json\n[1, 2]\n')
+    append_jsonl_file(path, [{'n': 3}])
+
+    assert list(iter_jsonl_file(path)) == [{'n': 1}, {'n': 2, 'text': 'åäö'}, {'n': 3}]
+
+    write_jsonl_file(path, [{'n': 4}])
+    assert path.read_text(encoding='utf-8') == '{"n":4}\n'
+
+
+def test_json_array_streaming(tmp_path):
+    '''
+    iter_json_array() yields the items of a JSON array, also when items,
+    numbers and strings are split between chunks, and rejects broken files.
+    '''
+    path: Path = tmp_path / 'records.json'
+    assert list(iter_json_array(path)) == []
+
+    data = [{'service': 'a, [b]', 'n': 123456}, 1234567, 'åäö', [1, {'x': None}], True]
+    path.write_text(' \n' + json.dumps(data, indent=2), encoding='utf-8')
+    for chunk_size in (1, 3, 7, 1024):
+        assert list(iter_json_array(path, chunk_size=chunk_size)) == data
+
+    path.write_text('[]', encoding='utf-8')
+    assert list(iter_json_array(path, chunk_size=1)) == []
+
+    for broken in ('{"a": 1}', '[1, 2', '[1 2]', '[{"a": }]', ''):
+        path.write_text(broken, encoding='utf-8')
+        with pytest.raises(ValueError):
+            list(iter_json_array(path, chunk_size=2))
@@ -0,0 +1,71 @@
+# tests/test_parallel.py
+
+'''
+Tests for the parallel (multi-process) generation module in PassGen.
+
+Focus:
+- resolve_workers(): default and explicit worker counts
+- iter_parallel_chunks(): ordered and unordered chunk output
+- generate_passwords_parallel(): correct count, length and charset
+'''
+
+import os
+
+import pytest
+
+from passgen import parallel
+from passgen.password_generator import Difficulty, get_charset_by_difficulty
+
+
+def test_resolve_workers():
+    '''
+    0 means one worker per CPU core, positive values are used as-is,
+    negative values are rejected.
+    '''
+    assert parallel.resolve_workers(0) == (os.cpu_count() or 1)
+    assert parallel.resolve_workers(3) == 3
+
+    with pytest.raises(ValueError):
+        parallel.resolve_workers(-1)
+
+
+def test_iter_parallel_chunks_ordered_keeps_chunk_order():
+    '''
+    With ordered=True the chunk sizes must come back in submission order,
+    so the last (smaller) chunk is always last.
+    '''
+    chunks = list(parallel.iter_parallel_chunks(
+        2050, 12, Difficulty.MEDIUM, workers=2, chunk_size=500, ordered=True,
+    ))
+
+    assert [len(chunk) for chunk in chunks] == [500, 500, 500, 500, 50]
+
+
+def test_iter_parallel_chunks_unordered_returns_everything():
+    '''
+    With ordered=False the order may differ, but nothing may be lost.
+    '''
+    chunks = list(parallel.iter_parallel_chunks(
+        2050, 12, Difficulty.MEDIUM, workers=2, chunk_size=500, ordered=False,
+    ))
+
+    assert sorted(len(chunk) for chunk in chunks) == [50, 500, 500, 500, 500]
+
+
+def test_generate_passwords_parallel_uses_charset():
+    '''
+    The combined result should have the right size, length and characters.
+    '''
+    passwords = parallel.generate_passwords_parallel(1000, 20, Difficulty.HARD, workers=2, chunk_size=300)
+
+    assert len(passwords) == 1000
+    assert all(len(pwd) == 20 for pwd in passwords)
+    assert set(''.join(passwords)) <= set(get_charset_by_difficulty(Difficulty.HARD))
+
+
+def test_iter_parallel_chunks_invalid_level_raises_before_starting():
+    '''
+    Invalid arguments should raise ValueError in the calling process.
+    '''
+    with pytest.raises(ValueError):
+        list(parallel.iter_parallel_chunks(10, 12, '9', workers=2))
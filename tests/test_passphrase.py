@@ -0,0 +1,103 @@
+# tests/test_passphrase.py
+
+'''
+Tests for the passphrase module in PassGen.
+
+Focus:
+- compile_wordlist(): parses plain and diceware-style lists, removes duplicates
+- WordlistIndex: O(1) lookups through the memory-mapped index, header validation
+- generate_passphrase(): uses only words from the list, with separator/capitalization
+
+All wordlists are written to tmp_path, so no real files are touched.
+'''
+
+from pathlib import Path
+
+import pytest
+
+from passgen import passphrase
+
+
+def _write_wordlist(tmp_path, text: str) -> Path:
+    source = tmp_path / 'words.txt'
+    source.write_text(text, encoding='utf-8')
+    return source
+
+
+def test_compile_wordlist_and_lookup(tmp_path):
+    '''
+    Words should be stored in order, duplicates and comments skipped,
+    and diceware numbers removed.
+    '''
+    source = _write_wordlist(tmp_path, '# comment\n11111\tapple\n11112\tbanana\n\ncherry\napple\nsmörgås\n')
+    target = tmp_path / 'words.idx'
+
+    count = passphrase.compile_wordlist(source, target)
+
+    assert count == 4
+    with passphrase.WordlistIndex(target) as words:
+        assert len(words) == 4
+        assert [words[i] for i in range(4)] == ['apple', 'banana', 'cherry', 'smörgås']
+        assert words[-1] == 'smörgås'
+        assert words.bits_per_word == 2.0
+
+        with pytest.raises(IndexError):
+            words[4]
+
+
+def test_compile_empty_wordlist_raises(tmp_path):
+    '''
+    A wordlist without any words cannot be compiled.
+    '''
+    source = _write_wordlist(tmp_path, '# only a comment\n\n')
+
+    with pytest.raises(ValueError):
+        passphrase.compile_wordlist(source, tmp_path / 'words.idx')
+
+
+def test_wordlist_index_rejects_invalid_files(tmp_path):
+    '''
+    Files without the right header, or with missing data, are rejected.
+    '''
+    bad = tmp_path / 'bad.idx'
+    bad.write_bytes(b'not a wordlist at all')
+
+    with pytest.raises(ValueError):
+        passphrase.WordlistIndex(bad)
+
+    source = _write_wordlist(tmp_path, 'alpha\nbravo\n')
+    target = tmp_path / 'words.idx'
+    passphrase.compile_wordlist(source, target)
+    target.write_bytes(target.read_bytes()[:-3])
+
+    with pytest.raises(ValueError):
+        passphrase.WordlistIndex(target)
+
+
+def test_generate_passphrase_uses_wordlist(tmp_path):
+    '''
+    Every word of the passphrase must come from the wordlist.
+    '''
+    source = _write_wordlist(tmp_path, 'alpha\nbravo\ncharlie\ndelta\n')
+    target = tmp_path / 'words.idx'
+    passphrase.compile_wordlist(source, target)
+
+    with passphrase.WordlistIndex(target) as words:
+        phrase = passphrase.generate_passphrase(5, separator=' ', wordlist=words, capitalize=True)
+
+    parts = phrase.split(' ')
+    assert len(parts) == 5
+    assert {part.lower() for part in parts} <= {'alpha', 'bravo', 'charlie', 'delta'}
+    assert all(part[0].isupper() for part in parts)
+
+    # without a count, the configured default is used.
+    with passphrase.WordlistIndex(target) as words:
+        assert len(passphrase.generate_passphrase(wordlist=words).split('-')) == passphrase.DEFAULT_PASSPHRASE_WORDS
+
+
+def test_generate_passphrase_invalid_word_count_raises(tmp_path):
+    '''
+    Zero words is not a passphrase.
+    '''
+    with pytest.raises(ValueError):
+        passphrase.generate_passphrase(0)
@@ -3,7 +3,24 @@
 import string
 import pytest
 
-from passgen.password_generator import generate_password, Difficulty
+from passgen.password_generator import (
+    generate_password,
+    generate_passwords,
+    get_charset_by_difficulty,
+    get_policy,
+    compile_policy,
+    custom_policy,
+    CharsetPolicy,
+    Difficulty,
+    AMBIGUOUS_CHARS,
+    EntropyPool,
+    get_entropy_pool,
+)
+
+import math
+import os
+from collections import Counter
+from itertools import product
 
 
 def test_generate_password_has_correct_length():
@@ -54,4 +71,229 @@ def test_generate_password_invalid_length_raises():
     Length <= 0 should raise ValueError.
     '''
     with pytest.raises(ValueError):
-        generate_password(0, Difficulty.EASY)
\ No newline at end of file
+        generate_password(0, Difficulty.EASY)
+
+
+def test_generate_passwords_returns_requested_count_and_length():
+    '''
+    generate_passwords() should return exactly `count` passwords,
+    each with the requested length.
+    '''
+    passwords = generate_passwords(500, 12, Difficulty.MEDIUM)
+
+    assert len(passwords) == 500
+    assert all(len(pwd) == 12 for pwd in passwords)
+
+
+def test_generate_passwords_only_uses_charset():
+    '''
+    Every character in a batch must come from the charset of the level,
+    and over a large batch every charset character should show up.
+    '''
+    charset = get_charset_by_difficulty(Difficulty.HARD)
+    passwords = generate_passwords(200, 50, Difficulty.HARD)
+
+    used = set(''.join(passwords))
+    assert used <= set(charset)
+    assert used == set(charset)
+
+
+def test_generate_passwords_zero_count_returns_empty_list():
+    '''
+    A count of zero is valid and simply returns an empty list.
+    '''
+    assert generate_passwords(0, 12, Difficulty.EASY) == []
+
+
+def test_generate_passwords_invalid_arguments_raise():
+    '''
+    Negative counts, invalid lengths and unknown levels should raise ValueError.
+    '''
+    with pytest.raises(ValueError):
+        generate_passwords(-1, 12, Difficulty.EASY)
+
+    with pytest.raises(ValueError):
+        generate_passwords(10, 0, Difficulty.EASY)
+
+    with pytest.raises(ValueError):
+        generate_passwords(10, 12, '9')
+
+
+def test_get_policy_returns_same_compiled_object():
+    '''
+    Built-in policies are compiled once and reused, and their alphabet
+    matches get_charset_by_difficulty().
+    '''
+    policy = get_policy(Difficulty.MEDIUM)
+
+    assert isinstance(policy, CharsetPolicy)
+    assert get_policy(Difficulty.MEDIUM) is policy
+    assert policy.alphabet == get_charset_by_difficulty(Difficulty.MEDIUM)
+    assert len(policy.table) == 256
+    assert policy.threshold % policy.size == 0
+
+
+def test_compile_policy_is_cached_hashable_and_deduplicated():
+    '''
+    Compiling the same alphabet twice returns the same object,
+    duplicate characters are removed, and policies can be used as dict keys.
+    '''
+    policy = compile_policy('aabbcc')
+
+    assert policy.alphabet == 'abc'
+    assert compile_policy('aabbcc') is policy
+    assert {policy: 'ok'}[compile_policy('aabbcc')] == 'ok'
+
+
+def test_custom_policy_excludes_ambiguous_and_adds_symbols():
+    '''
+    custom_policy() should drop ambiguous characters, add extra symbols,
+    and generated passwords should respect the new alphabet.
+    '''
+    policy = custom_policy(Difficulty.EASY, exclude_ambiguous=True, extra_symbols='~')
+
+    assert not set(policy.alphabet) & set(AMBIGUOUS_CHARS)
+    assert '~' in policy.alphabet
+
+    passwords = generate_passwords(100, 30, policy)
+    assert set(''.join(passwords)) <= set(policy.alphabet)
+
+
+def test_custom_policy_without_characters_raises():
+    '''
+    Excluding every character leaves nothing to generate from.
+    '''
+    with pytest.raises(ValueError):
+        custom_policy(Difficulty.EASY, exclude=get_charset_by_difficulty(Difficulty.EASY))
+
+
+def test_policy_groups_split_character_classes():
+    '''
+    The HARD policy should be split into lowercase, uppercase, digits and symbols.
+    '''
+    groups = get_policy(Difficulty.HARD).groups
+
+    assert groups[0] == string.ascii_lowercase
+    assert groups[1] == string.ascii_uppercase
+    assert groups[2] == string.digits
+    assert len(groups) == 4
+
+
+def test_require_all_classes_always_contains_every_class():
+    '''
+    With require_all_classes=True, short and long HARD passwords must contain
+    at least one lowercase, uppercase, digit and symbol.
+    '''
+    groups = get_policy(Difficulty.HARD).groups
+    for length in (4, 32):
+        passwords = generate_passwords(2000, length, Difficulty.HARD, require_all_classes=True)
+
+        assert len(passwords) == 2000
+        assert all(len(pwd) == length for pwd in passwords)
+        for pwd in passwords:
+            assert all(set(pwd) & set(group) for group in groups)
+
+
+@pytest.mark.parametrize('length, draws', [(3, 24000), (5, 108000)])
+def test_require_all_classes_is_uniform_over_valid_passwords(length, draws):
+    '''
+    For a tiny alphabet we can list every valid password and check that
+    each one shows up roughly equally often (no bias from the construction).
+
+    Length 3 is built constructively; at length 5 more than half of all
+    random passwords are valid, so random batches are filtered instead.
+    '''
+    policy = compile_policy('abA1')
+    valid = {
+        ''.join(chars) for chars in product(policy.alphabet, repeat=length)
+        if all(set(chars) & set(group) for group in policy.groups)
+    }
+
+    counts = Counter(generate_passwords(draws, length, policy, require_all_classes=True))
+
+    assert set(counts) == valid
+    expected = draws / len(valid)
+    # five standard deviations: a fair generator practically never fails this.
+    tolerance = 5 * math.sqrt(expected)
+    assert all(abs(seen - expected) < tolerance for seen in counts.values())
+
+
+def test_require_all_classes_too_short_raises():
+    '''
+    Four classes cannot fit into three characters.
+    '''
+    with pytest.raises(ValueError):
+        generate_password(3, Difficulty.HARD, require_all_classes=True)
+
+
+def test_entropy_pool_hands_out_slices_and_counts():
+    '''
+    Small requests are served from one buffered block (one refill),
+    large requests bypass the buffer, and the counters add up.
+    '''
+    pool = EntropyPool(block_size=1024)
+
+    first = pool.take(100)
+    second = pool.take(100)
+
+    assert isinstance(first, memoryview)
+    assert len(first) == 100 and len(second) == 100
+    assert first.tobytes() != second.tobytes()
+    assert pool.stats()['refills'] == 1
+
+    pool.take(5000)
+    stats = pool.stats()
+    assert stats['direct_reads'] == 1
+    assert stats['bytes_consumed'] == 5200
+
+
+def test_entropy_pool_randbelow_stays_in_range():
+    '''
+    randbelow() must return values in [0, bound) and use every value.
+    '''
+    pool = EntropyPool()
+    values = [pool.randbelow(7) for _ in range(2000)]
+
+    assert set(values) == set(range(7))
+    assert pool.randbelow(1) == 0
+
+
+def test_entropy_pool_resets_when_process_id_changes(monkeypatch):
+    '''
+    If the pool notices a different process id, it must throw away the
+    buffer instead of handing out bytes the parent may also use.
+    '''
+    pool = EntropyPool(block_size=1024)
+    pool.take(10)
+
+    monkeypatch.setattr(pool, '_pid', -1)
+    pool.take(10)
+
+    stats = pool.stats()
+    assert stats['refills'] == 1
+    assert stats['bytes_consumed'] == 10
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork()')
+def test_entropy_pool_child_after_fork_gets_different_bytes():
+    '''
+    After a fork, parent and child must not return the same buffered bytes.
+    '''
+    pool = get_entropy_pool()
+    pool.take(1)   # make sure a block is buffered before the fork
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+
+    if pid == 0:   # child
+        os.close(read_fd)
+        os.write(write_fd, pool.take_bytes(32))
+        os._exit(0)
+
+    os.close(write_fd)
+    child_bytes = os.read(read_fd, 32)
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+
+    assert len(child_bytes) == 32
+    assert child_bytes != pool.take_bytes(32)
@@ -1,6 +1,11 @@
 # tests/test_security.py
 
-from passgen.security import hash_password, verify_password, mask_password
+import pytest
+
+from passgen.security import (
+    HashMatch, clear_hash_cache, get_fingerprint_key, password_fingerprint, hash_cache_info, hash_password, hash_passwords,
+    mask_password, needs_rehash, set_rehash_callback, verify_many, verify_password,
+)
 
 
 def test_hash_and_verify_password_match():
@@ -44,4 +49,119 @@ def test_mask_password_long():
     assert len(masked) == len(password)
     
     # the rest after the visible part should be '*'
-    assert set(masked[3:]) == {'*'}
\ No newline at end of file
+    assert set(masked[3:]) == {'*'}
+
+
+@pytest.mark.parametrize('workers, use_processes', [(1, False), (3, False), (2, True)])
+def test_hash_passwords_keeps_order(workers, use_processes):
+    '''
+    Batch hashing returns one hash per password, in input order,
+    each verifying against its own password and with its own salt.
+    '''
+    passwords = [f'password-{i}' for i in range(6)]
+    hashes = hash_passwords(passwords, iterations=1_000, workers=workers, use_processes=use_processes)
+
+    assert len(hashes) == len(passwords)
+    assert len({stored.split('$')[2] for stored in hashes}) == len(passwords)
+    for password, stored in zip(passwords, hashes):
+        assert stored.startswith('pbkdf2_sha256$1000$')
+        assert verify_password(password, stored) is True
+
+
+def test_hash_passwords_invalid_workers():
+    '''
+    A negative worker count is rejected.
+    '''
+    with pytest.raises(ValueError):
+        hash_passwords(['a', 'b'], workers=-1)
+
+
+def test_verify_many_finds_all_matches():
+    '''
+    Every (candidate, hash) pair is checked across different iteration counts,
+    invalid hashes never match.
+    '''
+    stored = [
+        hash_password('alpha', iterations=1_000),
+        'not-a-hash',
+        hash_password('beta', iterations=2_000),
+        hash_password('alpha', iterations=2_000),
+    ]
+
+    matches = verify_many(['beta', 'alpha', 'gamma'], stored, workers=2)
+
+    assert matches == [HashMatch(0, 2), HashMatch(1, 0), HashMatch(1, 3)]
+    assert verify_many([], stored) == []
+
+
+def test_verify_many_stop_on_first():
+    '''
+    With stop_on_first, at least one match is returned and the search stops.
+    '''
+    stored = [hash_password(f'pw{i}', iterations=1_000) for i in range(5)]
+
+    matches = verify_many(['pw0'], stored, workers=1, stop_on_first=True)
+    assert matches == [HashMatch(0, 0)]
+
+
+def test_verify_password_caches_parsed_hash():
+    '''
+    Repeated verification of the same stored hash parses it only once;
+    wrong passwords are still rejected and invalid hashes are never cached.
+    '''
+    stored = hash_password('cached', iterations=1_000)
+    clear_hash_cache()
+
+    assert verify_password('cached', stored) is True
+    assert verify_password('wrong', stored) is False
+    assert verify_password('cached', 'garbage') is False
+
+    info = hash_cache_info()
+    assert info['misses'] == 2
+    assert info['hits'] == 1
+    assert info['size'] == 1
+    assert info['maxsize'] > 0
+
+    clear_hash_cache()
+    assert hash_cache_info()['size'] == 0
+
+
+def test_rehash_callback_only_for_outdated_matches():
+    '''
+    The rehash callback is called after a successful verification of an
+    outdated hash - not for current hashes and not for wrong passwords.
+    '''
+    old = hash_password('pw', iterations=1_000)
+    current = hash_password('pw')
+    calls = []
+
+    assert needs_rehash(old) is True
+    assert needs_rehash(current) is False
+    assert needs_rehash('garbage') is False
+
+    set_rehash_callback(lambda password, stored: calls.append((password, stored)))
+    try:
+        verify_password('wrong', old)
+        verify_password('pw', current)
+        verify_password('pw', old)
+    finally:
+        set_rehash_callback(None)
+
+    assert calls == [('pw', old)]
+
+
+def test_password_fingerprint_is_keyed(tmp_path):
+    '''
+    Fingerprints are stable for one key, differ between keys, and the key
+    file is created once and reused.
+    '''
+    key_file = tmp_path / 'keys' / 'fp.key'
+    key = get_fingerprint_key(key_file)
+
+    assert len(key) == 32
+    assert key_file.read_bytes() == key
+    assert get_fingerprint_key(key_file) == key
+
+    assert password_fingerprint('pw', key) == password_fingerprint('pw', key)
+    assert password_fingerprint('pw', key) != password_fingerprint('pw2', key)
+    assert password_fingerprint('pw', key) != password_fingerprint('pw', b'x' * 32)
@@ -5,28 +5,57 @@ Tests for the storage module in PassGen.
 
 Focus:
 - Using a temporary PASSWORD_FILE path per test (via monkeypatch + tmp_path)
-- Verifying that add_password() writes correct data to JSON
+- Verifying that add_password() writes correct data to JSON Lines
 - Verifying that list_passwords() returns expected records
+- Migrating the old JSON array format
+- Streaming records with iter_passwords() (filters, pages, bounded memory)
 '''
 
 import json
+import subprocess
+import sys
+import textwrap
+import threading
+import tracemalloc
 from pathlib import Path
 
+import pytest
+
 from passgen import storage
-from passgen.security import verify_password
+from passgen.io.module_io import append_jsonl_file, iter_jsonl_file, write_jsonl_file
+from passgen.security import hash_password, needs_rehash, verify_password
 
 
 def _setup_temp_password_file(tmp_path, monkeypatch) -> Path:
     '''
     Helper to redirect storage.PASSWORD_FILE to a temporary file for each test.
 
-    This ensures that tests do not touch the real passwords.json file.
+    This ensures that tests do not touch the real passwords.jsonl file.
     '''
-    temp_file = tmp_path / 'passwords.json'
+    temp_file = tmp_path / 'passwords.jsonl'
     monkeypatch.setattr(storage, 'PASSWORD_FILE', temp_file)
     return temp_file
 
 
+def _run_and_exit(tmp_path, body: str) -> None:
+    '''
+    Run body in a new Python process that uses tmp_path for all its files
+    and hashes with two threads, then let that process exit normally.
+
+    Used to check what the background workers still do at exit.
+    '''
+    setup = textwrap.dedent(f'''
+        from pathlib import Path
+        from passgen import kdf, security, storage
+        kdf.KDF_PARAMS_FILE = Path({str(tmp_path / 'kdf_params.json')!r})
+        kdf.KDF_AUTO_CALIBRATE = False
+        security.FINGERPRINT_KEY_FILE = Path({str(tmp_path / 'fingerprint.key')!r})
+        security.HASH_WORKERS = 2
+        storage.PASSWORD_FILE = Path({str(tmp_path / 'passwords.jsonl')!r})
+    ''')
+    subprocess.run([sys.executable, '-c', setup + textwrap.dedent(body)], check=True, timeout=60)
+
+
 def test_list_passwords_empty_when_file_missing(tmp_path, monkeypatch):
     '''
     If the password file does not exist, list_passwords() should return an empty list
@@ -42,7 +71,7 @@ def test_list_passwords_empty_when_file_missing(tmp_path, monkeypatch):
 
 def test_add_password_creates_file_and_record(tmp_path, monkeypatch):
     '''
-    add_password() should create the JSON file and store a single record
+    add_password() should create the JSON Lines file and store a single record
     with the expected fields.
     '''
     temp_file = _setup_temp_password_file(tmp_path, monkeypatch)
@@ -56,14 +85,11 @@ def test_add_password_creates_file_and_record(tmp_path, monkeypatch):
     # the file should now exist
     assert temp_file.exists()
 
-    # read raw JSON to inspect the stored structure
-    with temp_file.open('r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    assert isinstance(data, list)
-    assert len(data) == 1
+    # read the raw line to inspect the stored structure
+    lines = temp_file.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 1
 
-    record = data[0]
+    record = json.loads(lines[0])
     
     # check that expected keys exist
     assert record['service'] == service
@@ -86,10 +112,7 @@ def test_add_password_stores_hash_that_verifies(tmp_path, monkeypatch):
 
     storage.add_password(service, username, password)
 
-    with temp_file.open('r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    record = data[0]
+    record = list(iter_jsonl_file(temp_file))[0]
     stored_hash = record['password_hash']
 
     # hash should not be the same as the plain password
@@ -120,3 +143,477 @@ def test_list_passwords_returns_all_records(tmp_path, monkeypatch):
     assert ('Gmail', 'user1@example.com') in pairs
     assert ('Spotify', 'user2@example.com') in pairs
     assert ('GitHub', 'kalle') in pairs
+
+
+def test_audit_passwords_matches_hashes(tmp_path, monkeypatch):
+    '''
+    audit_passwords() should return the records whose hash matches a candidate.
+    '''
+    _setup_temp_password_file(tmp_path, monkeypatch)
+
+    storage.add_password('Gmail', 'a@example.com', 'hunter2')
+    storage.add_password('Spotify', 'b@example.com', 'correct-horse')
+
+    found = storage.audit_passwords(['correct-horse', 'nope'], workers=1)
+
+    assert [(pwd, record['service']) for pwd, record in found] == [('correct-horse', 'Spotify')]
+
+
+def test_rehash_on_verify_batches_upgrades(tmp_path, monkeypatch):
+    '''
+    Verifying passwords with outdated hashes should upgrade all of them
+    in a single write of the password file.
+    '''
+    temp_file = _setup_temp_password_file(tmp_path, monkeypatch)
+
+    old_hashes = [hash_password(f'pw{i}', iterations=1_000) for i in range(3)]
+    records = [{'service': f's{i}', 'username': 'u', 'password_hash': h} for i, h in enumerate(old_hashes)]
+    write_jsonl_file(temp_file, records)
+
+    writes = []
+    original_update = storage._update_hashes
+    monkeypatch.setattr(storage, '_update_hashes', lambda *args: (writes.append(1), original_update(*args))[1])
+
+    storage.enable_rehash_on_verify()
+    try:
+        for i, stored in enumerate(old_hashes):
+            assert verify_password(f'pw{i}', stored) is True
+        # a hash that is not in the vault is counted as skipped.
+        verify_password('other', hash_password('other', iterations=1_000))
+
+        assert storage._rehash_worker.flush(timeout=10)
+        stats = storage.rehash_stats()
+    finally:
+        storage.disable_rehash_on_verify()
+
+    assert stats == {'pending': 0, 'migrated': 3, 'skipped': 1, 'failed': 0, 'batches': 1}
+    assert len(writes) == 1
+
+    data = list(iter_jsonl_file(temp_file))
+    for i, record in enumerate(data):
+        assert record['password_hash'] != old_hashes[i]
+        assert not needs_rehash(record['password_hash'])
+        assert verify_password(f'pw{i}', record['password_hash']) is True
+
+
+def test_rehash_upgrades_are_written_at_exit(tmp_path):
+    '''
+    Upgrades still queued when the program ends are written before it
+    exits, also when hashing uses a thread pool.
+    '''
+    _run_and_exit(tmp_path, '''
+        from passgen.io.module_io import write_jsonl_file
+        from passgen.security import hash_password, verify_password
+        write_jsonl_file(storage.PASSWORD_FILE, [
+            {'id': f'r{i}', 'service': f'svc{i}', 'username': 'u', 'password': f'pw{i}',
+             'password_hash': hash_password(f'pw{i}', iterations=1_000)}
+            for i in range(2)
+        ])
+
+        storage.enable_rehash_on_verify()
+        for record in storage.list_passwords():
+            assert verify_password(record['password'], record['password_hash'])
+    ''')
+
+    data = list(iter_jsonl_file(tmp_path / 'passwords.jsonl'))
+    assert len(data) == 2
+    for i, record in enumerate(data):
+        assert not needs_rehash(record['password_hash'])
+        assert verify_password(f'pw{i}', record['password_hash']) is True
+
+
+def test_rehash_batches_count_every_storage_update(tmp_path, monkeypatch):
+    '''
+    Batches whose hashes were stale or failed still cost a storage update
+    and are counted in "batches".
+    '''
+    _setup_temp_password_file(tmp_path, monkeypatch)
+    stale = hash_password('stale', iterations=1_000)
+
+    storage.enable_rehash_on_verify()
+    try:
+        verify_password('stale', stale)
+        assert storage._rehash_worker.flush(timeout=10)
+        assert storage.rehash_stats() == {'pending': 0, 'migrated': 0, 'skipped': 1, 'failed': 0, 'batches': 1}
+
+        def broken_update(*args):
+            raise OSError('disk full')
+
+        monkeypatch.setattr(storage, '_update_hashes', broken_update)
+        verify_password('broken', hash_password('broken', iterations=1_000))
+        assert storage._rehash_worker.flush(timeout=10)
+        assert storage.rehash_stats() == {'pending': 0, 'migrated': 0, 'skipped': 1, 'failed': 1, 'batches': 2}
+    finally:
+        storage.disable_rehash_on_verify()
+
+
+def test_add_password_deferred_hash(tmp_path, monkeypatch):
+    '''
+    With defer_hash=True the record is written at once with the pending
+    marker, and the background worker patches in the real hash.
+    '''
+    temp_file = _setup_temp_password_file(tmp_path, monkeypatch)
+
+    release = threading.Event()
+    original_hash_passwords = storage.hash_passwords
+
+    def slow_hash_passwords(passwords):
+        release.wait(10)
+        return original_hash_passwords(passwords)
+
+    monkeypatch.setattr(storage, 'hash_passwords', slow_hash_passwords)
+
+    storage.add_password('Gmail', 'me@example.com', 'later!')
+
+    storage.add_password('Spotify', 'me@example.com', 'deferred!', defer_hash=True)
+    pending = list(iter_jsonl_file(temp_file))[1]
+    assert pending['password_hash'] == storage.PENDING_HASH
+    assert verify_password('deferred!', pending['password_hash']) is False
+
+    release.set()
+    storage.flush_deferred_hashes()
+
+    data = list(iter_jsonl_file(temp_file))
+    assert data[1]['id'] == pending['id']
+    assert verify_password('deferred!', data[1]['password_hash']) is True
+    assert verify_password('later!', data[0]['password_hash']) is True
+
+
+def test_deferred_hashes_are_written_at_exit(tmp_path):
+    '''
+    Records still queued for hashing when the program ends are hashed
+    before it exits, also when hashing uses a thread pool.
+    '''
+    _run_and_exit(tmp_path, '''
+        for i in range(4):
+            storage.add_password(f'svc{i}', 'u', f'pw{i}', defer_hash=True)
+    ''')
+
+    data = list(iter_jsonl_file(tmp_path / 'passwords.jsonl'))
+    assert len(data) == 4
+    for i, record in enumerate(data):
+        assert verify_password(f'pw{i}', record['password_hash']) is True
+
+
+def test_recover_pending_hashes(tmp_path, monkeypatch):
+    '''
+    Records left pending by a crash are hashed by recover_pending_hashes().
+    '''
+    temp_file = _setup_temp_password_file(tmp_path, monkeypatch)
+    records = [
+        {'id': 'a', 'service': 'x', 'username': 'u', 'password': 'pw-a', 'password_hash': storage.PENDING_HASH},
+        {'id': 'b', 'service': 'y', 'username': 'u', 'password': 'pw-b', 'password_hash': hash_password('pw-b')},
+    ]
+    write_jsonl_file(temp_file, records)
+
+    assert storage.recover_pending_hashes() == 1
+    assert storage.recover_pending_hashes() == 0
+
+    data = list(iter_jsonl_file(temp_file))
+    assert verify_password('pw-a', data[0]['password_hash']) is True
+    assert data[1]['password_hash'] == records[1]['password_hash']
+
+
+def test_find_reused_passwords_with_fingerprints(tmp_path, monkeypatch):
+    '''
+    Records with the same password share a fingerprint and are grouped,
+    including old records that only have the plain text password.
+    '''
+    temp_file = _setup_temp_password_file(tmp_path, monkeypatch)
+
+    storage.add_password('Gmail', 'a', 'same-password')
+    storage.add_password('Spotify', 'b', 'other-password')
+    storage.add_password('Netflix', 'c', 'same-password')
+
+    # an old record without id and fingerprint.
+    data = list(iter_jsonl_file(temp_file))
+    data.append({'service': 'Legacy', 'username': 'd', 'password': 'same-password'})
+    write_jsonl_file(temp_file, data)
+
+    assert data[0]['fingerprint'] == data[2]['fingerprint'] != data[1]['fingerprint']
+    assert 'same-password' not in data[0]['fingerprint']
+
+    index = storage.build_fingerprint_index(data)
+    assert index[data[0]['fingerprint']] == [data[0]['id'], data[2]['id'], '#3']
+
+    groups = storage.find_reused_passwords()
+    assert [[record['service'] for record in group] for group in groups] == [['Gmail', 'Netflix', 'Legacy']]
+
+
+def test_add_password_appends_without_rewriting(tmp_path, monkeypatch):
+    '''
+    Saving a record appends one line: the existing lines are never rewritten,
+    and a half-written last line (crash) only loses that line.
+    '''
+    temp_file = _setup_temp_password_file(tmp_path, monkeypatch)
+    monkeypatch.setattr(storage, 'hash_password', lambda password: 'hash')
+
+    def fail(data):
+        raise AssertionError('the whole file must not be rewritten')
+
+    monkeypatch.setattr(storage, '_save_raw', fail)
+
+    storage.add_password('Gmail', 'a', 'pw1')
+    first_line = temp_file.read_bytes()
+
+    # simulate a crash in the middle of the next append.
+    with temp_file.open('ab') as f:
+        f.write(b'{"service": "Bro')
+
+    storage.add_password('Spotify', 'b', 'pw2')
+
+    assert temp_file.read_bytes().startswith(first_line)
+    assert [record['service'] for record in storage.list_passwords()] == ['Gmail', 'Spotify']
+
+
+def test_migrate_json_vault(tmp_path, monkeypatch):
+    '''
+    An old passwords.json (one JSON array) is moved into the JSON Lines
+    file on first use, exactly once.
+    '''
+    temp_file = _setup_temp_password_file(tmp_path, monkeypatch)
+    legacy = tmp_path / 'passwords.json'
+    old_records = [
+        {'service': 'Gmail', 'username': 'a', 'password': 'pw1', 'created_at': '2025-12-10T22:30:00'},
+        {'service': 'Spotify', 'username': 'b', 'password': 'pw2', 'created_at': '2025-12-11T09:00:00'},
+    ]
+    legacy.write_text(json.dumps(old_records, indent=2), encoding='utf-8')
+
+    assert storage.list_passwords() == old_records
+    assert not legacy.exists()
+    assert (tmp_path / 'passwords.json.migrated').exists()
+    assert list(iter_jsonl_file(temp_file)) == old_records
+
+    # a new passwords.json is not picked up again automatically...
+    legacy.write_text(json.dumps(old_records), encoding='utf-8')
+    assert len(storage.list_passwords()) == 2
+
+    # ...but can be imported explicitly.
+    assert storage.migrate_json_vault(legacy) == 2
+    assert len(storage.list_passwords()) == 4
+
+    legacy.write_text('{"not": "a list"}', encoding='utf-8')
+    with pytest.raises(ValueError):
+        storage.migrate_json_vault(legacy)
+
+
+def test_find_password_and_prefix(tmp_path, monkeypatch):
+    '''
+    find_password() and find_by_prefix() return the matching records,
+    ignoring upper/lower case.
+    '''
+    _setup_temp_password_file(tmp_path, monkeypatch)
+    monkeypatch.setattr(storage, 'hash_password', lambda password: 'hash')
+
+    for service, username in [('Gmail', 'a'), ('GitHub', 'a'), ('gmail', 'b'), ('Spotify', 'a'), ('Git', 'c')]:
+        storage.add_password(service, username, f'{service}-{username}')
+
+    assert [r['password'] for r in storage.find_password('GMAIL')] == ['Gmail-a', 'gmail-b']
+    assert [r['password'] for r in storage.find_password('gmail', 'B')] == ['gmail-b']
+    assert storage.find_password('Gmail', 'nobody') == []
+    assert storage.find_password('Netflix') == []
+
+    assert [r['password'] for r in storage.find_by_prefix('git')] == ['Git-c', 'GitHub-a']
+    assert [r['password'] for r in storage.find_by_prefix('g')] == ['Git-c', 'GitHub-a', 'Gmail-a', 'gmail-b']
+    assert len(storage.find_by_prefix('')) == 5
+    assert storage.find_by_prefix('x') == []
+
+    # results are copies: changing them does not change the index.
+    storage.find_password('Spotify')[0]['password'] = 'changed'
+    assert storage.find_password('Spotify')[0]['password'] == 'Spotify-a'
+
+
+def test_find_index_updates_incrementally(tmp_path, monkeypatch):
+    '''
+    Once built, the index follows add_password() and hash updates without
+    being rebuilt; writes that bypass storage trigger a rebuild.
+    '''
+    _setup_temp_password_file(tmp_path, monkeypatch)
+    monkeypatch.setattr(storage, 'hash_password', lambda password: 'hash')
+
+    storage.add_password('Gmail', 'a', 'pw1')
+    assert len(storage.find_password('Gmail')) == 1
+
+    index = storage._index
+    assert index is not None
+
+    storage.add_password('Gmail', 'b', 'pw2')
+    storage._append_records([storage._build_record(f'svc{i}', 'u', 'pw', 'hash') for i in range(100)])
+    storage._set_pending_hashes({storage.find_password('Gmail', 'b')[0]['id']: 'not-updated'})
+    storage._update_hashes('id', {storage.find_password('Gmail', 'a')[0]['id']: 'new-hash'})
+
+    assert [r['password_hash'] for r in storage.find_password('gmail')] == ['new-hash', 'hash']
+    assert len(storage.find_by_prefix('svc')) == 100
+    assert storage.find_by_prefix('svc9')[0]['service'] == 'svc9'
+    assert storage._index is index
+
+    # a reset through io.file_ops goes around storage, so the index is rebuilt.
+    storage.get_backend().replace_all([])
+    assert storage.find_password('Gmail') == []
+    assert storage._index is not index
+
+
+def test_add_passwords_bulk(tmp_path, monkeypatch):
+    '''
+    add_passwords() validates the whole batch first, reports progress while
+    hashing and saves everything with a single append.
+    '''
+    _setup_temp_password_file(tmp_path, monkeypatch)
+
+    appends = []
+    original_append = storage._append_records
+    monkeypatch.setattr(storage, '_append_records', lambda records: (appends.append(len(records)), original_append(records)))
+
+    # one bad entry: nothing is hashed or written.
+    with pytest.raises(ValueError, match='Record 1'):
+        storage.add_passwords([('Gmail', 'a', 'pw'), ('Spotify', 'b', '')])
+    assert appends == []
+    assert storage.list_passwords() == []
+
+    calls = []
+    batch = [
+        ('Gmail', 'a', 'pw-0'),
+        {'service': 'Spotify', 'username': 'b', 'password': 'pw-1'},
+        {'service': 'GitHub', 'password': 'pw-2', 'created_at': 'ignored'},
+    ]
+    assert storage.add_passwords(batch, workers=2, progress=lambda done, total: calls.append((done, total))) == 3
+
+    assert appends == [3]
+    assert calls == [(1, 3), (2, 3), (3, 3)]
+
+    records = storage.list_passwords()
+    assert [(r['service'], r['username']) for r in records] == [('Gmail', 'a'), ('Spotify', 'b'), ('GitHub', '')]
+    for i, record in enumerate(records):
+        assert verify_password(f'pw-{i}', record['password_hash']) is True
+    assert storage.find_password('github')[0]['password'] == 'pw-2'
+
+    assert storage.add_passwords([]) == 0
+
+
+def test_append_hashed_passwords_writes_once(tmp_path, monkeypatch):
+    '''
+    append_hashed_passwords() saves already hashed entries in one append
+    and keeps the lookup index up to date.
+    '''
+    _setup_temp_password_file(tmp_path, monkeypatch)
+    storage.find_password('Gmail')    # build the index first
+
+    appends = []
+    original_append = storage._append_records
+    monkeypatch.setattr(storage, '_append_records', lambda records: (appends.append(len(records)), original_append(records)))
+
+    entries = [('Gmail', 'a', 'pw-0', 'hash-0'), ('Spotify', 'b', 'pw-1', 'hash-1')]
+    assert storage.append_hashed_passwords(iter(entries)) == 2
+    assert storage.append_hashed_passwords([]) == 0
+
+    assert appends == [2]
+    assert [(r['service'], r['password_hash']) for r in storage.list_passwords()] == [('Gmail', 'hash-0'), ('Spotify', 'hash-1')]
+    assert storage.find_password('spotify')[0]['username'] == 'b'
+
+
+def test_vault_cache_hits_and_invalidation(tmp_path, monkeypatch):
+    '''
+    An unchanged vault is parsed once; writes by this process, writes that
+    bypass storage (another process) and explicit invalidation are noticed.
+    '''
+    temp_file = _setup_temp_password_file(tmp_path, monkeypatch)
+    monkeypatch.setattr(storage, 'hash_password', lambda password: 'hash')
+    storage.add_password('Gmail', 'a', 'pw1')
+
+    def parses():
+        return storage.vault_cache_info()['misses']
+
+    first = parses()
+    records = storage.list_passwords()
+    assert storage.list_passwords() == records
+    assert storage.find_password('gmail') == records
+    assert parses() == first + 1
+    assert storage.vault_cache_info()['size'] == 1
+
+    # callers get copies.
+    records[0]['service'] = 'changed'
+    assert storage.list_passwords()[0]['service'] == 'Gmail'
+
+    # an append by "another process" changes the size.
+    append_jsonl_file(temp_file, [{'service': 'Other', 'username': 'x'}])
+    assert [r['service'] for r in storage.list_passwords()] == ['Gmail', 'Other']
+    assert [r['service'] for r in storage.find_by_prefix('oth')] == ['Other']
+    assert parses() == first + 2
+
+    # a rewrite with the same size is a new file (new inode).
+    data = list(iter_jsonl_file(temp_file))
+    data[1]['username'] = 'y'
+    write_jsonl_file(temp_file, data)
+    assert storage.list_passwords()[1]['username'] == 'y'
+    assert parses() == first + 3
+
+    storage.invalidate_vault_cache()
+    storage.list_passwords()
+    assert parses() == first + 4
+
+    monkeypatch.setattr(storage, 'VAULT_CACHE', False)
+    hits = storage.vault_cache_info()['hits']
+    storage.list_passwords()
+    assert storage.vault_cache_info()['hits'] == hits
+
+
+def test_iter_passwords_filters_and_pages(tmp_path, monkeypatch):
+    '''
+    iter_passwords() filters by fields or a function and pages the result,
+    with and without a cached vault, and returns copies.
+    '''
+    temp_file = _setup_temp_password_file(tmp_path, monkeypatch)
+    write_jsonl_file(temp_file, [
+        {'service': service, 'username': f'user{n}', 'password': 'pw'}
+        for n, service in enumerate(['Gmail', 'Spotify', 'Gmail', 'GitHub', 'Gmail'])
+    ])
+
+    def usernames(**kwargs):
+        return [record['username'] for record in storage.iter_passwords(**kwargs)]
+
+    for cached in (False, True):
+        if cached:
+            storage.list_passwords()
+            hits = storage.vault_cache_info()['hits']
+
+        assert usernames() == [f'user{n}' for n in range(5)]
+        assert usernames(where={'service': 'Gmail'}) == ['user0', 'user2', 'user4']
+        assert usernames(where={'service': 'gmail'}) == []
+        assert usernames(where={'service': 'Gmail'}, offset=1, limit=1) == ['user2']
+        assert usernames(offset=3) == ['user3', 'user4']
+        assert usernames(limit=2, where=lambda record: record['service'].startswith('G')) == ['user0', 'user2']
+
+    # the last round was answered from the cache.
+    assert storage.vault_cache_info()['hits'] == hits + 6
+
+    record = next(storage.iter_passwords())
+    record['service'] = 'changed'
+    assert next(storage.iter_passwords())['service'] == 'Gmail'
+
+    with pytest.raises(ValueError):
+        storage.iter_passwords(offset=-1)
+    with pytest.raises(ValueError):
+        storage.iter_passwords(limit=-1)
+
+
+def test_iter_passwords_memory_does_not_grow_with_vault(tmp_path, monkeypatch):
+    '''
+    Streaming a vault keeps about one record in memory: the peak for a vault
+    ten times larger is about the same.
+    '''
+    temp_file = _setup_temp_password_file(tmp_path, monkeypatch)
+    record = {'service': 'Service', 'username': 'user@example.com', 'password': 'x' * 40, 'password_hash': 'h' * 100}
+
+    def peak(size):
+        write_jsonl_file(temp_file, [record] * size)
+        tracemalloc.start()
+        try:
+            assert sum(1 for _ in storage.iter_passwords()) == size
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small, large = peak(1_000), peak(10_000)
+    # the records alone would need several MB for the large vault.
+    assert large < 256 * 1024
+    assert large < small * 2
@@ -0,0 +1,83 @@
+# tests/test_streaming.py
+
+'''
+Tests for the streaming module in PassGen.
+
+Focus:
+- iter_password_chunks(): yields chunks of the right size until count is reached
+- write_password_chunks(): writes one password per line and returns statistics
+- stream_passwords(): streams directly to a file (tmp_path, no real files touched)
+'''
+
+import io
+
+import pytest
+
+from passgen import streaming
+from passgen.password_generator import Difficulty
+
+
+def test_iter_password_chunks_respects_chunk_size():
+    '''
+    2500 passwords with chunk_size=1000 should arrive as chunks of 1000, 1000, 500.
+    '''
+    chunks = list(streaming.iter_password_chunks(2500, 10, Difficulty.EASY, chunk_size=1000))
+
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    assert all(len(pwd) == 10 for chunk in chunks for pwd in chunk)
+
+
+def test_iter_password_chunks_invalid_arguments_raise():
+    '''
+    Negative counts and non-positive chunk sizes should raise ValueError.
+    '''
+    with pytest.raises(ValueError):
+        list(streaming.iter_password_chunks(-1, 10, Difficulty.EASY))
+
+    with pytest.raises(ValueError):
+        list(streaming.iter_password_chunks(10, 10, Difficulty.EASY, chunk_size=0))
+
+
+def test_write_password_chunks_writes_lines_and_stats():
+    '''
+    Every password should end up on its own line, and the returned stats
+    should match what was written.
+    '''
+    out = io.StringIO()
+    chunks = [['aaaa', 'bbbb'], [], ['cccc']]
+
+    stats = streaming.write_password_chunks(chunks, out)
+
+    assert out.getvalue() == 'aaaa\nbbbb\ncccc\n'
+    assert stats.count == 3
+    assert stats.bytes_written == len(out.getvalue())
+    assert stats.rate > 0
+
+
+def test_stream_passwords_to_file(tmp_path):
+    '''
+    stream_passwords() with an output path should write exactly `count` lines,
+    creating parent directories if needed.
+    '''
+    output = tmp_path / 'out' / 'passwords.txt'
+
+    stats = streaming.stream_passwords(1234, 16, Difficulty.HARD, output=output, chunk_size=100)
+
+    lines = output.read_text(encoding='ascii').splitlines()
+    assert stats.count == 1234
+    assert len(lines) == 1234
+    assert all(len(line) == 16 for line in lines)
+
+
+def test_stream_passwords_with_strength_column(tmp_path):
+    '''
+    with_strength=True should append a tab-separated score in bits to every line.
+    '''
+    output = tmp_path / 'scored.txt'
+
+    streaming.stream_passwords(50, 12, Difficulty.EASY, output=output, with_strength=True)
+
+    for line in output.read_text(encoding='ascii').splitlines():
+        password, bits = line.split('\t')
+        assert len(password) == 12
+        assert 0 <= float(bits) <= 12 * 6
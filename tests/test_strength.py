@@ -0,0 +1,86 @@
+# tests/test_strength.py
+
+'''
+Tests for the strength scoring module in PassGen.
+
+Focus:
+- entropy from the charset size (known level or guessed from character classes)
+- penalties for repeated characters and straight sequences
+- the NumPy (vectorized) path and the pure-Python fallback give the same results
+'''
+
+import math
+
+import pytest
+
+from passgen import strength
+from passgen.password_generator import Difficulty, generate_passwords, get_policy
+
+
+SAMPLES = [
+    '',
+    'a',
+    'aaaa',
+    'abcdef',
+    '987654',
+    'Password1!',
+    'xK9#mQ2$vL',
+    'aab',
+    'åäö',
+]
+
+
+def test_entropy_uses_level_charset():
+    '''
+    With a known level, entropy is length * log2(charset size).
+    '''
+    score = strength.score_password('xK9mQ2vL', Difficulty.EASY)
+
+    assert score.entropy == pytest.approx(8 * math.log2(get_policy(Difficulty.EASY).size))
+    assert score.penalty == 0
+
+
+def test_entropy_guesses_charset_from_classes():
+    '''
+    Without a level, only the classes that occur count: digits only -> 10 symbols.
+    '''
+    score = strength.score_password('5820')
+
+    assert score.entropy == pytest.approx(4 * math.log2(10))
+
+
+def test_repeats_and_sequences_are_penalized():
+    '''
+    "aaaa" has 3 repeated characters, "abcdef" has 4 characters continuing a run.
+    '''
+    bits = math.log2(26)
+
+    assert strength.score_password('aaaa').penalty == pytest.approx(3 * bits)
+    assert strength.score_password('abcdef').penalty == pytest.approx(4 * bits)
+    assert strength.score_password('abcdef').score < strength.score_password('qzmxwe').score
+
+
+def test_labels_follow_score():
+    '''
+    Short, patterned passwords are weak; long random ones are strong.
+    '''
+    assert strength.score_password('aaaa').label == 'very weak'
+    assert strength.score_password('xK9#mQ2$vLp7&wR3').label in ('strong', 'very strong')
+
+
+def test_python_fallback_matches_batch_scoring(monkeypatch):
+    '''
+    score_passwords() must give the same result with and without NumPy.
+    '''
+    batch = SAMPLES + generate_passwords(200, 12, Difficulty.HARD)
+    expected = strength.score_passwords(batch)
+
+    monkeypatch.setattr(strength, 'np', None)
+    fallback = strength.score_passwords(batch)
+
+    assert len(fallback) == len(batch)
+    for left, right in zip(expected, fallback):
+        assert left.entropy == pytest.approx(right.entropy)
+        assert left.penalty == pytest.approx(right.penalty)
+
+    assert [strength.score_password(pwd) for pwd in SAMPLES] == fallback[:len(SAMPLES)]
@@ -0,0 +1,50 @@
+# tools/build_markov_model.py
+
+"""
+Build the Markov model used for pronounceable passwords.
+
+The model is compiled once, at development time, and the resulting binary
+file is shipped inside the package, so PassGen never trains anything at
+runtime.
+
+Usage:
+    python tools/build_markov_model.py
+    python tools/build_markov_model.py --corpus words.txt --output model.bin
+"""
+
+
+import argparse
+from pathlib import Path
+
+from passgen.config import MARKOV_MODEL_FILE
+from passgen.markov import compile_model
+
+
+CORPUS_FILE = Path(__file__).resolve().parent / 'markov_corpus.txt'
+
+
+def read_corpus(path: Path) -> list:
+    '''
+    Read whitespace separated words, skipping comment lines starting with "#".
+    '''
+    words = []
+    with path.open('r', encoding='utf-8') as f:
+        for line in f:
+            if not line.lstrip().startswith('#'):
+                words.extend(line.split())
+    return words
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compile the pronounceable-password model.')
+    parser.add_argument('--corpus', type=Path, default=CORPUS_FILE, help='Training words.')
+    parser.add_argument('--output', type=Path, default=MARKOV_MODEL_FILE, help='Model file to write.')
+    args = parser.parse_args()
+
+    words = read_corpus(args.corpus)
+    contexts = compile_model(words, args.output)
+    print(f'{len(words):,} words, {contexts:,} contexts -> {args.output}')
+
+
+if __name__ == '__main__':
+    main()